@@ -0,0 +1,165 @@
+import calendar
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+STATES = ('pending', 'fetched', 'parsed', 'written', 'failed')
+RETRY_BACKOFF = 60  # seconds before a failed page is retried, doubled per failed attempt
+MAX_RETRY_BACKOFF = 24 * 60 * 60
+
+
+class CrawlFrontier:
+    def __init__(self, conn, backoff=RETRY_BACKOFF, max_backoff=MAX_RETRY_BACKOFF):
+        """
+        Per-page crawl state of the schedule backfill, kept in the crawl_frontier
+        table of the SQLite DB so an interrupted run resumes where it stopped.
+        Each (season, month) page moves pending -> fetched -> parsed -> written,
+        or to failed with its last error; failed pages are retried once their
+        backoff (backoff * 2 ** (attempts - 1), capped) has elapsed.
+        ---
+        Parameters:
+            conn: sqlite3 Connection.
+            backoff: seconds before the first retry of a failed page.
+            max_backoff: upper bound on the retry delay, in seconds.
+        """
+        self.conn = conn
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS crawl_frontier (
+                season      INTEGER NOT NULL,
+                month       TEXT NOT NULL,
+                url         TEXT NOT NULL,
+                state       TEXT NOT NULL DEFAULT 'pending',
+                attempts    INTEGER NOT NULL DEFAULT 0,
+                last_error  TEXT,
+                updated_at  TEXT NOT NULL,
+                PRIMARY KEY (season, month)
+            )
+        """)
+        conn.commit()
+
+
+    def add_season(self, season, pages):
+        """
+        Starts tracking a season's month pages; pages already tracked are left
+        as they are. A month the games table already has games for (scraped
+        before the frontier existed, or migrated from CSV) starts as written.
+        ---
+        Parameters:
+            season: season start year.
+            pages: dict of month name -> page URL.
+        """
+        months_in_db = {
+            calendar.month_name[month].lower()
+            for (month,) in self.conn.execute(
+                "SELECT DISTINCT CAST(strftime('%m', date) AS INTEGER) FROM games WHERE season = ?", (season,))
+        }
+        now = datetime.now().isoformat(timespec='seconds')
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO crawl_frontier (season, month, url, state, updated_at) VALUES (?, ?, ?, ?, ?)",
+            [(season, month, url, 'written' if month in months_in_db else 'pending', now)
+             for month, url in pages.items()],
+        )
+        self.conn.commit()
+
+
+    def mark(self, season, month, state, error=None, attempts=0, commit=True):
+        """
+        Moves a page to a new state.
+        ---
+        Parameters:
+            season: season start year.
+            month: month name, as in NBAScraper.MONTHS.
+            state: one of STATES.
+            error: message stored as last_error (None clears it).
+            attempts: fetch attempts to add to the page's count.
+            commit: if False, the update joins the caller's transaction (e.g.
+                marking pages written together with the insert of their rows).
+        """
+        if state not in STATES:
+            raise ValueError(f"Unknown crawl state: {state}")
+        self.conn.execute(
+            "UPDATE crawl_frontier SET state = ?, last_error = ?, attempts = attempts + ?, updated_at = ? "
+            "WHERE season = ? AND month = ?",
+            (state, error, attempts, datetime.now().isoformat(timespec='seconds'), season, month),
+        )
+        if commit:
+            self.conn.commit()
+
+
+    def states(self, season):
+        """Returns a dict of month name -> state for a season's tracked pages."""
+        rows = self.conn.execute("SELECT month, state FROM crawl_frontier WHERE season = ?", (season,))
+        return dict(rows.fetchall())
+
+
+    def retry_at(self, updated_at, attempts):
+        """Time a page that failed at updated_at after `attempts` attempts may be fetched again."""
+        delay = min(self.backoff * 2 ** max(attempts - 1, 0), self.max_backoff)
+        return datetime.fromisoformat(updated_at) + timedelta(seconds=delay)
+
+
+    def due(self, season, force=False):
+        """
+        Pages of a season that still need fetching: everything not written,
+        except failed pages whose backoff has not elapsed yet. With force, all
+        of the season's pages.
+        ---
+        Returns a dict of month name -> URL.
+        """
+        now = datetime.now()
+        rows = self.conn.execute(
+            "SELECT month, url, state, attempts, updated_at FROM crawl_frontier WHERE season = ?", (season,))
+        return {
+            month: url for month, url, state, attempts, updated_at in rows
+            if force or (state != 'written' and (state != 'failed' or self.retry_at(updated_at, attempts) <= now))
+        }
+
+
+    def gaps(self, seasons):
+        """Returns a dict of season -> month names not yet written, for the given seasons."""
+        gaps = {}
+        for season in seasons:
+            rows = self.conn.execute(
+                "SELECT month FROM crawl_frontier WHERE season = ? AND state != 'written' ORDER BY rowid", (season,))
+            months = [month for (month,) in rows]
+            if months:
+                gaps[season] = months
+        return gaps
+
+
+    def completeness(self, seasons, months):
+        """
+        Per-month page counts over the given seasons.
+        ---
+        Parameters:
+            seasons: season start years.
+            months: month names, in display order.
+        ---
+        Returns a DataFrame indexed by month with a column per state plus total.
+        """
+        seasons = list(seasons)
+        placeholders = ', '.join('?' * len(seasons))
+        counts = pd.read_sql_query(
+            f"SELECT month, state, COUNT(*) AS pages FROM crawl_frontier "
+            f"WHERE season IN ({placeholders}) GROUP BY month, state",
+            self.conn, params=seasons,
+        )
+        table = (counts.pivot(index='month', columns='state', values='pages')
+                 .reindex(index=months, columns=list(STATES)).fillna(0).astype(int))
+        table['total'] = table.sum(axis=1)
+        return table
+
+
+    def failures(self, seasons):
+        """Returns (season, month, attempts, last_error, retry_at) of the failed pages among seasons."""
+        seasons = list(seasons)
+        placeholders = ', '.join('?' * len(seasons))
+        rows = self.conn.execute(
+            f"SELECT season, month, attempts, last_error, updated_at FROM crawl_frontier "
+            f"WHERE state = 'failed' AND season IN ({placeholders}) ORDER BY season, rowid",
+            seasons,
+        )
+        return [(season, month, attempts, error, self.retry_at(updated_at, attempts))
+                for season, month, attempts, error, updated_at in rows]
@@ -1,30 +1,424 @@
+import json
+
 import pandas as pd
 import numpy as np
 
+from .teams import FRANCHISES, canonical_name
+
 HOME_ADVANTAGE = 100  # Elo points added to home team's effective rating
 REVERSION_FACTOR = 1 / 3  # Fraction to pull toward mean between seasons
+K_REGULAR = 32  # Elo K factor for regular-season games
+K_PLAYOFF = 48  # Elo K factor for playoff games
+STREAK_BASE = 1.1  # Base of the win-streak bonus, STREAK_BASE ** (streak - 2) - 1 from three wins on
+
+
+def _encode_teams(names, team_index):
+    """
+    Maps a column of (possibly historical) team names to integer team IDs.
+    Name normalization runs once per unique name rather than once per game.
+    ---
+    Parameters:
+        names: pandas Series of team names.
+        team_index: dict of current team name -> integer ID.
+    ---
+    Returns a numpy int64 array of team IDs.
+    """
+    codes, uniques = pd.factorize(names, use_na_sentinel=False)
+    # KeyError on an unknown franchise, as the per-row lookup did
+    lookup = np.array([team_index[canonical_name(name)] for name in uniques], dtype=np.int64)
+    return lookup[codes]
+
+
+def _encode_games(df, team_index, after=None):
+    """
+    Vectorized pre-encoding of a games DataFrame for the Elo kernels.
+    ---
+    Parameters:
+        df: pandas DataFrame with columns: Date, Visitor, Home, Win, Notes.
+        team_index: dict of current team name -> integer ID.
+        after: optional 'YYYY-MM-DD'; games on or before this date are dropped.
+    ---
+    Returns a dict of numpy arrays: dates ('YYYY-MM-DD' strings), seasons,
+    visitor_ids, home_ids, results, notes and playoffs (bool).
+    """
+    dates = pd.to_datetime(df['Date'])
+    date_strs = dates.dt.strftime('%Y-%m-%d').to_numpy()
+    if after is not None:
+        keep = date_strs > after
+        df, dates, date_strs = df[keep], dates[keep], date_strs[keep]
+    notes = df['Notes'].to_numpy()
+    return {
+        'dates': date_strs,
+        'seasons': np.where(dates.dt.month >= 10, dates.dt.year, dates.dt.year - 1).astype(np.int64),
+        'visitor_ids': _encode_teams(df['Visitor'], team_index),
+        'home_ids': _encode_teams(df['Home'], team_index),
+        'results': df['Win'].to_numpy(dtype=np.float64),
+        'notes': notes,
+        'playoffs': notes == 'Playoffs',
+    }
+
+
+def _elo_kernel(visitor_ids, home_ids, results, seasons, k_factors, ratings, streaks,
+                current_season=None, boundaries=None):
+    """
+    Runs the sequential Elo update over pre-encoded game arrays.
+    Arithmetic mirrors NBARater.expectedResult / win_streak_bonus operation for
+    operation, so the output is bit-identical to the per-row implementation.
+    ---
+    Parameters:
+        visitor_ids, home_ids: int arrays of team IDs, one entry per game.
+        results: float array, 1 for a visitor win, 0 for a home win, anything else a tie.
+        seasons: int array of season start years.
+        k_factors: float array of K values per game.
+        ratings: list of current ratings indexed by team ID; updated in place.
+        streaks: list of current win streaks indexed by team ID; updated in place.
+        current_season: season of the last game already applied to ratings, if any.
+        boundaries: optional list; at each season boundary (before mean reversion)
+            a (game index, finished season, ratings copy, streaks copy) tuple is appended.
+    ---
+    Returns a dict of preallocated float64 columns (visitor_before, home_before,
+    visitor_after, home_after, win_prob_visitor) and the last season processed.
+    """
+    n = len(visitor_ids)
+    out = {
+        'visitor_before': np.empty(n, dtype=np.float64),
+        'home_before': np.empty(n, dtype=np.float64),
+        'visitor_after': np.empty(n, dtype=np.float64),
+        'home_after': np.empty(n, dtype=np.float64),
+        'win_prob_visitor': np.empty(n, dtype=np.float64),
+    }
+    visitor_before, home_before = out['visitor_before'], out['home_before']
+    visitor_after, home_after = out['visitor_after'], out['home_after']
+    win_prob_visitor = out['win_prob_visitor']
+
+    # Plain Python lists index far faster than numpy scalars in a tight loop
+    visitor_ids = visitor_ids.tolist()
+    home_ids = home_ids.tolist()
+    results = results.tolist()
+    seasons = seasons.tolist()
+    k_factors = k_factors.tolist()
+    n_teams = len(ratings)
+
+    for i in range(n):
+        season = seasons[i]
+        if current_season is not None and season != current_season:
+            if boundaries is not None:
+                boundaries.append((i, current_season, list(ratings), list(streaks)))
+            for t in range(n_teams):
+                current = ratings[t]
+                ratings[t] = current + REVERSION_FACTOR * (1200 - current)
+        current_season = season
+
+        visitor = visitor_ids[i]
+        home = home_ids[i]
+        visitor_result = results[i]
+        home_result = 1 - visitor_result
+
+        if visitor_result == 1:
+            streaks[visitor] += 1
+            streaks[home] = 0
+            win_streak = streaks[visitor]
+            streak_bonus = (STREAK_BASE ** (win_streak - 2)) - 1 if win_streak >= 3 else 0
+        elif visitor_result == 0:
+            streaks[home] += 1
+            streaks[visitor] = 0
+            win_streak = streaks[home]
+            streak_bonus = (STREAK_BASE ** (win_streak - 2)) - 1 if win_streak >= 3 else 0
+        else:  # tie
+            streaks[visitor] = 0
+            streaks[home] = 0
+            streak_bonus = 0
+
+        old_visitor_rating = ratings[visitor]
+        old_home_rating = ratings[home]
+        adjusted_home = old_home_rating + HOME_ADVANTAGE
+        visitor_expected = 10**(old_visitor_rating / 400) / (
+            10**(old_visitor_rating / 400) + 10**(adjusted_home / 400))
+        home_expected = 1 - visitor_expected
+
+        k = k_factors[i]
+        visitor_new = old_visitor_rating + k * (visitor_result - visitor_expected)
+        home_new = old_home_rating + k * (home_result - home_expected)
+
+        if visitor_result == 1:
+            visitor_new += streak_bonus
+            home_new -= streak_bonus
+        elif visitor_result == 0:
+            home_new += streak_bonus
+            visitor_new -= streak_bonus
+
+        if visitor_new < 0:
+            visitor_new = 0
+        if home_new < 0:
+            home_new = 0
+
+        ratings[visitor] = visitor_new
+        ratings[home] = home_new
+
+        visitor_before[i] = old_visitor_rating
+        home_before[i] = old_home_rating
+        visitor_after[i] = visitor_new
+        home_after[i] = home_new
+        win_prob_visitor[i] = visitor_expected
+
+    out['current_season'] = current_season
+    return out
+
+
+def _sweep_kernel(games, params, ratings, streaks, current_season=None):
+    """
+    Advances C Elo configurations together over one pass of pre-encoded games.
+    Win streaks depend only on results, so they are shared by every configuration;
+    ratings are a (teams, C) matrix so each team's row is contiguous.
+    ---
+    Parameters:
+        games: dict from _encode_games().
+        params: dict of float arrays of shape (C,): home_advantage, reversion_factor,
+            k_regular, k_playoff, streak_base.
+        ratings: float64 array of shape (teams, C); updated in place.
+        streaks: list of current win streaks indexed by team ID; updated in place.
+        current_season: season of the last game already applied to ratings, if any.
+    ---
+    Returns a dict with seasons (list), log_loss and brier (per-season sums of
+    shape (S, C)), games (per-season counts) and current_season.
+    """
+    home_advantage = params['home_advantage']
+    reversion_factor = params['reversion_factor'][None, :]
+    k_regular, k_playoff = params['k_regular'], params['k_playoff']
+    streak_base = params['streak_base']
+    n_configs = ratings.shape[1]
+
+    visitor_ids = games['visitor_ids'].tolist()
+    home_ids = games['home_ids'].tolist()
+    results = games['results'].tolist()
+    seasons = games['seasons'].tolist()
+    playoffs = games['playoffs'].tolist()
+
+    # Pre-game expectations are buffered in small cache-resident blocks and
+    # scored in bulk, keeping the per-game work to a handful of in-place ufuncs
+    block = 64
+    expected = np.empty((block, n_configs))
+    outcomes = np.empty((block, 1))
+    change = np.empty(n_configs)
+    scale = np.log(10) / 400
+
+    season_list, log_loss, brier, counts = [], [], [], []
+    loss_sum = np.zeros(n_configs)
+    brier_sum = np.zeros(n_configs)
+    season_count = 0
+
+    def flush(count):
+        p = np.clip(expected[:count], 1e-15, 1 - 1e-15)
+        y = outcomes[:count]
+        np.subtract(loss_sum, (y * np.log(p) + (1 - y) * np.log1p(-p)).sum(axis=0), out=loss_sum)
+        np.add(brier_sum, ((expected[:count] - y) ** 2).sum(axis=0), out=brier_sum)
+
+    count = 0
+    for i in range(len(visitor_ids)):
+        season = seasons[i]
+        if season != current_season:
+            if count:
+                flush(count)
+                season_count += count
+                count = 0
+            if season_count:
+                season_list.append(current_season)
+                log_loss.append(loss_sum.copy())
+                brier.append(brier_sum.copy())
+                counts.append(season_count)
+                loss_sum[:] = 0
+                brier_sum[:] = 0
+                season_count = 0
+            if current_season is not None:
+                ratings += reversion_factor * (1200 - ratings)
+        current_season = season
+        if count == block:
+            flush(count)
+            season_count += count
+            count = 0
+
+        visitor = visitor_ids[i]
+        home = home_ids[i]
+        visitor_result = results[i]
+
+        if visitor_result == 1:
+            streaks[visitor] += 1
+            streaks[home] = 0
+            win_streak = streaks[visitor]
+        elif visitor_result == 0:
+            streaks[home] += 1
+            streaks[visitor] = 0
+            win_streak = streaks[home]
+        else:  # tie
+            streaks[visitor] = 0
+            streaks[home] = 0
+            win_streak = 0
+
+        # visitor_expected = 1 / (1 + 10 ** ((home + home_advantage - visitor) / 400))
+        visitor_expected = expected[count]
+        np.subtract(ratings[home], ratings[visitor], out=visitor_expected)
+        visitor_expected += home_advantage
+        visitor_expected *= scale
+        np.exp(visitor_expected, out=visitor_expected)
+        visitor_expected += 1
+        np.reciprocal(visitor_expected, out=visitor_expected)
+        outcomes[count] = visitor_result
+        count += 1
+
+        np.subtract(visitor_result, visitor_expected, out=change)
+        change *= k_playoff if playoffs[i] else k_regular
+        if win_streak >= 3:
+            bonus = streak_base ** (win_streak - 2) - 1
+            if visitor_result == 1:
+                change += bonus
+            else:
+                change -= bonus
+
+        visitor_row = ratings[visitor]
+        home_row = ratings[home]
+        visitor_row += change
+        home_row -= change
+        np.maximum(visitor_row, 0, out=visitor_row)
+        np.maximum(home_row, 0, out=home_row)
+
+    if count:
+        flush(count)
+        season_count += count
+    if season_count:
+        season_list.append(current_season)
+        log_loss.append(loss_sum)
+        brier.append(brier_sum)
+        counts.append(season_count)
+
+    return {
+        'seasons': season_list,
+        'log_loss': np.array(log_loss).reshape(len(season_list), n_configs),
+        'brier': np.array(brier).reshape(len(season_list), n_configs),
+        'games': np.array(counts, dtype=np.int64),
+        'current_season': current_season,
+    }
+
+
+def elo_sweep(df, home_advantage=HOME_ADVANTAGE, reversion_factor=REVERSION_FACTOR,
+              k_regular=K_REGULAR, k_playoff=K_PLAYOFF, streak_base=STREAK_BASE, score_from=None):
+    """
+    Simulates many Elo configurations together in a single pass over the games.
+    Each parameter is a scalar or array; they are broadcast against each other so
+    that configuration c uses element c of every parameter.
+    ---
+    Parameters:
+        df: pandas DataFrame with columns: Date, Visitor, Home, Win, Notes.
+        home_advantage: Elo points added to the home team's effective rating.
+        reversion_factor: fraction pulled toward the mean between seasons.
+        k_regular, k_playoff: K values for regular-season and playoff games.
+        streak_base: base of the win-streak bonus (see NBARater.win_streak_bonus).
+        score_from: optional season; earlier seasons update ratings but are not scored.
+    ---
+    Returns a DataFrame with one row per configuration: the parameters, log_loss
+    and brier (means over scored games), games_scored, and each team's final rating.
+    """
+    columns = np.broadcast_arrays(*(np.atleast_1d(np.asarray(p, dtype=np.float64)) for p in (
+        home_advantage, reversion_factor, k_regular, k_playoff, streak_base)))
+    names = ['home_advantage', 'reversion_factor', 'k_regular', 'k_playoff', 'streak_base']
+    params = {name: np.ascontiguousarray(col) for name, col in zip(names, columns)}
+    n_configs = len(params['home_advantage'])
+
+    team_names = list(NBARater().teams)
+    games = _encode_games(df, {team: i for i, team in enumerate(team_names)})
+    ratings = np.full((len(team_names), n_configs), 1200.0)
+    out = _sweep_kernel(games, params, ratings, [0] * len(team_names))
+
+    scored = np.array([score_from is None or s >= score_from for s in out['seasons']], dtype=bool)
+    games_scored = int(out['games'][scored].sum())
+    result = pd.DataFrame(params)
+    result['log_loss'] = out['log_loss'][scored].sum(axis=0) / max(games_scored, 1)
+    result['brier'] = out['brier'][scored].sum(axis=0) / max(games_scored, 1)
+    result['games_scored'] = games_scored
+    return pd.concat([result, pd.DataFrame(ratings.T, columns=team_names)], axis=1)
+
+
+def save_checkpoints(conn, states, clear_from=None):
+    """
+    Persists rater states to the rater_checkpoints table of a SQLite DB.
+    ---
+    Parameters:
+        conn: sqlite3 Connection.
+        states: iterable of dicts as returned by NBARater.getState().
+        clear_from: optional 'YYYY-MM-DD'; existing checkpoints on or after this
+            date are deleted first (they were computed from data being replaced).
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS rater_checkpoints (
+            last_date       TEXT PRIMARY KEY,
+            season          INTEGER NOT NULL,
+            state           TEXT NOT NULL
+        )
+    """)
+    if clear_from is not None:
+        conn.execute("DELETE FROM rater_checkpoints WHERE last_date >= ?", (clear_from,))
+    conn.executemany(
+        "INSERT OR REPLACE INTO rater_checkpoints (last_date, season, state) VALUES (?, ?, ?)",
+        [(st['last_date'], st['current_season'], json.dumps(st))
+         for st in states if st['last_date'] is not None],
+    )
+    conn.commit()
+
+
+def load_checkpoint(conn, before=None):
+    """
+    Loads the latest persisted rater state, optionally restricted to states whose
+    last game falls strictly before a date.
+    ---
+    Parameters:
+        conn: sqlite3 Connection.
+        before: optional 'YYYY-MM-DD'.
+    ---
+    Returns a state dict, or None if no usable checkpoint exists.
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rater_checkpoints'"
+    ).fetchone()
+    if not exists:
+        return None
+    query = "SELECT state FROM rater_checkpoints"
+    params = ()
+    if before is not None:
+        query += " WHERE last_date < ?"
+        params = (before,)
+    for (state,) in conn.execute(query + " ORDER BY last_date DESC", params):
+        state = json.loads(state)
+        # Checkpoints computed under different model constants are stale
+        if state.get('params') == _model_params():
+            return state
+    return None
+
+
+def _model_params():
+    """Returns the model constants a checkpoint was computed under."""
+    return {'home_advantage': HOME_ADVANTAGE, 'reversion_factor': REVERSION_FACTOR,
+            'k_regular': K_REGULAR, 'k_playoff': K_PLAYOFF, 'streak_base': STREAK_BASE}
 
 
 class NBARater:
-    def __init__(self):
+    def __init__(self, teams=None):
         """
         Initializes the NBARater object by using a default Elo rating of 1200 for all teams.
+        ---
+        Parameters:
+            teams: optional iterable of team names (default: the NBA franchises),
+                e.g. for synthetic leagues.
         """
-        team_names = [
-            'Atlanta Hawks', 'Boston Celtics', 'Brooklyn Nets', 'Charlotte Hornets',
-            'Chicago Bulls', 'Cleveland Cavaliers', 'Dallas Mavericks', 'Denver Nuggets',
-            'Detroit Pistons', 'Golden State Warriors', 'Houston Rockets', 'Indiana Pacers',
-            'Los Angeles Clippers', 'Los Angeles Lakers', 'Memphis Grizzlies', 'Miami Heat',
-            'Milwaukee Bucks', 'Minnesota Timberwolves', 'New Orleans Pelicans', 'New York Knicks',
-            'Oklahoma City Thunder', 'Orlando Magic', 'Philadelphia 76ers', 'Phoenix Suns',
-            'Portland Trail Blazers', 'Sacramento Kings', 'San Antonio Spurs', 'Toronto Raptors',
-            'Utah Jazz', 'Washington Wizards',
-        ]
-
+        teams = FRANCHISES if teams is None else list(teams)
         # Use lists for O(1) appends; converted to numpy arrays in getTeams()
-        self.teams = {team: [1200] for team in team_names}
-        self.win_streaks = {team: 0 for team in team_names}
+        self.teams = {team: [1200] for team in teams}
+        self.win_streaks = {team: 0 for team in teams}
+        # One columnar DataFrame per eloSimulator() call; concatenated in getGameLog()
         self.game_log = []
+        # Resume point: season and date of the last game applied to the ratings
+        self.current_season = None
+        self.last_date = None
+        # States captured at each season boundary and at the end of each run
+        self.checkpoints = []
 
 
     @staticmethod
@@ -37,42 +431,7 @@ class NBARater:
         ---
         Returns the current name of the team.
         """
-        name_changes = {
-            'Charlotte Bobcats': 'Charlotte Hornets',
-            'New Orleans Hornets': 'New Orleans Pelicans',
-            'New Jersey Americans': 'Brooklyn Nets',
-            'New York Nets': 'Brooklyn Nets',
-            'New Jersey Nets': 'Brooklyn Nets',
-            'Seattle SuperSonics': 'Oklahoma City Thunder',
-            'Vancouver Grizzlies': 'Memphis Grizzlies',
-            'Washington Bullets': 'Washington Wizards',
-            'Chicago Zephyrs': 'Washington Wizards',
-            'Capital Bullets': 'Washington Wizards',
-            'Baltimore Bullets': 'Washington Wizards',
-            'Chicago Packers': 'Washington Wizards',
-            'New Orleans/Oklahoma City Hornets': 'New Orleans Pelicans',
-            'New Orleans/OKC Hornets': 'New Orleans Pelicans',
-            'Philadelphia Warriors': 'Golden State Warriors',
-            'San Francisco Warriors': 'Golden State Warriors',
-            'Fort Wayne Pistons': 'Detroit Pistons',
-            'Minneapolis Lakers': 'Los Angeles Lakers',
-            'Rochester Royals': 'Sacramento Kings',
-            'Syracuse Nationals': 'Philadelphia 76ers',
-            'Tri-Cities Blackhawks': 'Atlanta Hawks',
-            'St. Louis Hawks': 'Atlanta Hawks',
-            'Milwaukee Hawks': 'Atlanta Hawks',
-            'Buffalo Braves': 'Los Angeles Clippers',
-            'San Diego Clippers': 'Los Angeles Clippers',
-            'Cincinnati Royals': 'Sacramento Kings',
-            'Kansas City-Omaha Kings': 'Sacramento Kings',
-            'Kansas City Kings': 'Sacramento Kings',
-            'Denver Rockets': 'Denver Nuggets',
-            'San Diego Rockets': 'Houston Rockets',
-            'Dallas Chaparrals': 'San Antonio Spurs',
-            'Texas Chapparals': 'San Antonio Spurs',
-            'New Orleans Jazz': 'Utah Jazz',
-        }
-        return name_changes.get(team_name, team_name)
+        return canonical_name(team_name)
 
 
     @staticmethod
@@ -91,7 +450,25 @@ class NBARater:
         return 10**(visitor_rating / 400) / (10**(visitor_rating / 400) + 10**(adjusted_home / 400))
 
 
-    def win_streak_bonus(self, team, base=1.1):
+    @staticmethod
+    def expectedResults(visitor_ratings, home_ratings):
+        """
+        Vectorized expectedResult for numpy arrays. Inputs broadcast, so a column of
+        visitor ratings against a row of home ratings yields the full matrix.
+        ---
+        Parameters:
+            visitor_ratings: array-like of visiting-team Elo ratings.
+            home_ratings: array-like of home-team Elo ratings.
+        ---
+        Returns a float64 array of the visitor's win probabilities.
+        """
+        visitor = np.asarray(visitor_ratings, dtype=np.float64)
+        home = np.asarray(home_ratings, dtype=np.float64)
+        # Single-power form of expectedResult; avoids overflow for extreme ratings
+        return 1 / (1 + np.power(10.0, (home + HOME_ADVANTAGE - visitor) / 400))
+
+
+    def win_streak_bonus(self, team, base=STREAK_BASE):
         """
         Computes a win streak bonus using a logarithmic approach.
         Requires a minimum streak of 3 to activate.
@@ -123,88 +500,132 @@ class NBARater:
     def eloSimulator(self, df):
         """
         Simulates Elo ratings across all games in the DataFrame.
+        Games on or before the rater's last_date (e.g. after fromState()) are
+        already reflected in the ratings and are skipped.
         ---
         Parameters:
             df: pandas DataFrame with columns: Date, Visitor, Home, Win, Notes.
         """
-        current_season = None
-
-        for _, row in df.iterrows():
-            date = pd.to_datetime(row['Date'])
-            season = self._get_season(date)
-
-            # Apply mean reversion at each season boundary
-            if current_season is not None and season != current_season:
-                self._apply_mean_reversion()
-            current_season = season
-
-            visitor_result = row['Win']
-            home_result = 1 - visitor_result
-
-            visitor = self.map_team_names(row['Visitor'])
-            home = self.map_team_names(row['Home'])
+        batch_log = self.rateBatch(df)
+        self.game_log.append(batch_log)
+        if len(batch_log):
+            self.checkpoints.append(self.getState())
+        return self
 
-            # Update win streaks and compute streak bonus for the winner (zero-sum)
-            if visitor_result == 1:
-                self.win_streaks[visitor] += 1
-                self.win_streaks[home] = 0
-                streak_bonus = self.win_streak_bonus(visitor)
-            elif visitor_result == 0:
-                self.win_streaks[home] += 1
-                self.win_streaks[visitor] = 0
-                streak_bonus = self.win_streak_bonus(home)
-            else:  # tie
-                self.win_streaks[visitor] = 0
-                self.win_streaks[home] = 0
-                streak_bonus = 0
-
-            # Expected results (home court advantage baked into expectedResult)
-            old_visitor_rating = self.teams[visitor][-1]
-            old_home_rating = self.teams[home][-1]
-            visitor_expected = self.expectedResult(old_visitor_rating, old_home_rating)
-            home_expected = 1 - visitor_expected
-
-            k = 48 if row['Notes'] == 'Playoffs' else 32
-
-            # Base Elo update (zero-sum: home_expected = 1 - visitor_expected)
-            visitor_new = old_visitor_rating + k * (visitor_result - visitor_expected)
-            home_new = old_home_rating + k * (home_result - home_expected)
-
-            # Apply streak bonus zero-sum: winner gains, loser loses the same amount
-            if visitor_result == 1:
-                visitor_new += streak_bonus
-                home_new -= streak_bonus
-            elif visitor_result == 0:
-                home_new += streak_bonus
-                visitor_new -= streak_bonus
-
-            # Floor at 0
-            if visitor_new < 0:
-                visitor_new = 0
-            if home_new < 0:
-                home_new = 0
-
-            self.teams[visitor].append(visitor_new)
-            self.teams[home].append(home_new)
-
-            self.game_log.append({
-                'date': date.strftime('%Y-%m-%d'),
-                'season': season,
-                'visitor': visitor,
-                'home': home,
-                'visitor_before': old_visitor_rating,
-                'home_before': old_home_rating,
-                'visitor_after': visitor_new,
-                'home_after': home_new,
-                'visitor_delta': visitor_new - old_visitor_rating,
-                'home_delta': home_new - old_home_rating,
-                'win_prob_visitor': visitor_expected,
-                'result': 'visitor' if visitor_result == 1 else 'home',
-                'notes': row['Notes'],
-            })
 
-        return self
+    def rateBatch(self, df, keep_history=True):
+        """
+        Applies one batch of games to the ratings and returns its game log instead
+        of accumulating it, so callers can stream games through the rater in date
+        order. Batches must not split a date (games on or before last_date are
+        skipped); season-boundary checkpoints are still appended to self.checkpoints.
+        ---
+        Parameters:
+            df: pandas DataFrame with columns: Date, Visitor, Home, Win, Notes.
+            keep_history: if False, team histories keep only the current rating.
+        ---
+        Returns the batch's game log as a DataFrame (see getGameLog()).
+        """
+        team_names = list(self.teams)
+        team_index = {team: i for i, team in enumerate(team_names)}
+
+        # Encode everything the kernel needs up front with vectorized operations
+        games = _encode_games(df, team_index, after=self.last_date)
+        date_strs, seasons = games['dates'], games['seasons']
+        visitor_ids, home_ids = games['visitor_ids'], games['home_ids']
+        results, notes = games['results'], games['notes']
+        k_factors = np.where(games['playoffs'], K_PLAYOFF, K_REGULAR).astype(np.float64)
+
+        ratings = [history[-1] for history in self.teams.values()]
+        streaks = [self.win_streaks[team] for team in team_names]
+        boundaries = []
+        out = _elo_kernel(visitor_ids, home_ids, results, seasons, k_factors, ratings, streaks,
+                          current_season=self.current_season, boundaries=boundaries)
+
+        for i, season, season_ratings, season_streaks in boundaries:
+            self.checkpoints.append(self._state(
+                season_ratings, season_streaks, season,
+                date_strs[i - 1] if i > 0 else self.last_date,
+            ))
+
+        # Rebuild per-team histories: each entry is the rating a team carried into
+        # its next game (mean reversion rewrites the last entry in place)
+        n = len(visitor_ids)
+        if keep_history:
+            appearances = np.concatenate([visitor_ids, home_ids])
+            befores = np.concatenate([out['visitor_before'], out['home_before']])
+            order = np.lexsort((np.tile(np.arange(n), 2), appearances))
+            bounds = np.searchsorted(appearances[order], np.arange(len(team_names) + 1))
+            befores = befores[order]
+        for i, team in enumerate(team_names):
+            if keep_history:
+                played = befores[bounds[i]:bounds[i + 1]].tolist()
+                self.teams[team] = self.teams[team][:-1] + played + [ratings[i]]
+            else:
+                self.teams[team] = [ratings[i]]
+            self.win_streaks[team] = streaks[i]
+        if n:
+            self.current_season = out['current_season']
+            self.last_date = date_strs.max()
+
+        return pd.DataFrame({
+            'date': date_strs,
+            'season': seasons,
+            'visitor': np.array(team_names, dtype=object)[visitor_ids],
+            'home': np.array(team_names, dtype=object)[home_ids],
+            'visitor_before': out['visitor_before'],
+            'home_before': out['home_before'],
+            'visitor_after': out['visitor_after'],
+            'home_after': out['home_after'],
+            'visitor_delta': out['visitor_after'] - out['visitor_before'],
+            'home_delta': out['home_after'] - out['home_before'],
+            'win_prob_visitor': out['win_prob_visitor'],
+            'result': np.where(results == 1, 'visitor', 'home').astype(object),
+            'notes': notes,
+        })
+
+
+    def _state(self, ratings, streaks, season, last_date):
+        """Builds a JSON-serializable state dict from per-team rating/streak lists."""
+        return {
+            'ratings': {team: float(r) for team, r in zip(self.teams, ratings)},
+            'win_streaks': {team: int(st) for team, st in zip(self.teams, streaks)},
+            'current_season': None if season is None else int(season),
+            'last_date': None if last_date is None else str(last_date),
+            'params': _model_params(),
+        }
 
+    def getState(self):
+        """
+        Snapshot of everything needed to continue the simulation.
+        ---
+        Returns a JSON-serializable dict with ratings, win_streaks,
+        current_season and last_date.
+        """
+        return self._state(
+            [history[-1] for history in self.teams.values()],
+            [self.win_streaks[team] for team in self.teams],
+            self.current_season,
+            self.last_date,
+        )
+
+    @classmethod
+    def fromState(cls, state):
+        """
+        Creates a rater that resumes from a getState() snapshot.
+        ---
+        Parameters:
+            state: dict as returned by getState() or load_checkpoint().
+        ---
+        Returns an NBARater whose next eloSimulator() call only processes
+        games after state['last_date'].
+        """
+        rater = cls()
+        rater.teams = {team: [rating] for team, rating in state['ratings'].items()}
+        rater.win_streaks = dict(state['win_streaks'])
+        rater.current_season = state['current_season']
+        rater.last_date = state['last_date']
+        return rater
 
     def getTeams(self):
         """
@@ -218,4 +639,6 @@ class NBARater:
         """
         Returns a DataFrame of per-game ELO changes recorded during eloSimulator().
         """
-        return pd.DataFrame(self.game_log)
+        if not self.game_log:
+            return pd.DataFrame()
+        return pd.concat(self.game_log, ignore_index=True)
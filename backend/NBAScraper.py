@@ -1,16 +1,77 @@
+import calendar
+import hashlib
+import numpy as np
 import pandas as pd
-import requests
-import bs4
-import time
-import threading
 import sqlite3
+from lxml import html as lxml_html
 from datetime import datetime
 from pathlib import Path
 from tqdm import tqdm
 import argparse
+from .CrawlFrontier import CrawlFrontier
 from .PlayoffScraper import PlayoffScraper
+from .teams import unknown_names
+from .fetch import fetcher, robots, ARCHIVE_PATH, IMMUTABLE, ResponseArchive
 
 DB_PATH = Path('data') / 'nba.db'
+UPCOMING_MAX_AGE = 10 * 60  # seconds a cached month page serves upcoming-game lookups
+MONTHS = ['october', 'november', 'december', 'january', 'february', 'march', 'april', 'may', 'june']
+
+# basketball-reference.com crawler policy: at most one request every 5 seconds,
+# until its robots.txt is loaded and its Crawl-delay (if any) takes over
+BBALL_REF_HOST = 'www.basketball-reference.com'
+BBALL_REF_INTERVAL = 5.0
+fetcher.limit(BBALL_REF_HOST, BBALL_REF_INTERVAL)
+robots.default_intervals[BBALL_REF_HOST] = BBALL_REF_INTERVAL
+
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+}
+
+
+# Columns of a games row as written by upsert_season; (date, visitor, home) identifies a game
+GAME_COLUMNS = ('season', 'date', 'start_time', 'visitor', 'visitor_points', 'home', 'home_points',
+                'box_score', 'overtime', 'attendance', 'arena', 'notes')
+_UPSERT_GAME = f"""
+    INSERT INTO games ({', '.join(GAME_COLUMNS)}, row_hash, updated_at)
+    VALUES ({', '.join('?' * (len(GAME_COLUMNS) + 2))})
+    ON CONFLICT (date, visitor, home) DO UPDATE SET
+        {', '.join(f'{name} = excluded.{name}' for name in GAME_COLUMNS + ('row_hash', 'updated_at'))}
+"""
+
+
+def _now():
+    """Timestamp stored in updated_at columns; ISO strings sort chronologically."""
+    return datetime.now().isoformat(timespec='microseconds')
+
+
+def _row_hash(record):
+    """Content hash of a games row given as a tuple in GAME_COLUMNS order."""
+    text = '\x1f'.join('' if value is None else str(value) for value in record)
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def _add_game_keys(conn):
+    """
+    Brings a games table created before rows were keyed up to date: adds the
+    row_hash and updated_at columns, removes duplicate (date, visitor, home)
+    rows (keeping the latest insert) and hashes the remaining rows.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(games)")}
+    if 'row_hash' in columns:
+        return
+    conn.execute("ALTER TABLE games ADD COLUMN row_hash TEXT")
+    conn.execute("ALTER TABLE games ADD COLUMN updated_at TEXT")
+    removed = conn.execute(
+        "DELETE FROM games WHERE id NOT IN (SELECT MAX(id) FROM games GROUP BY date, visitor, home)").rowcount
+    now = _now()
+    rows = conn.execute(f"SELECT id, {', '.join(GAME_COLUMNS)} FROM games").fetchall()
+    conn.executemany("UPDATE games SET row_hash = ?, updated_at = ? WHERE id = ?",
+                     [(_row_hash(row[1:]), now, row[0]) for row in rows])
+    if removed:
+        tqdm.write(f"  Removed {removed} duplicate game row(s) from the games table")
 
 
 def init_db(db_path=DB_PATH):
@@ -31,11 +92,23 @@ def init_db(db_path=DB_PATH):
             overtime        TEXT,
             attendance      TEXT,
             arena           TEXT,
-            notes           TEXT
+            notes           TEXT,
+            row_hash        TEXT,
+            updated_at      TEXT
         )
     """)
+    _add_game_keys(conn)
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_game_key ON games(date, visitor, home)")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_season ON games(season)")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_date ON games(date)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS playoff_windows (
+            season      INTEGER PRIMARY KEY,
+            start_date  TEXT NOT NULL,
+            end_date    TEXT NOT NULL,
+            source      TEXT NOT NULL
+        )
+    """)
     conn.commit()
     return conn
 
@@ -46,155 +119,402 @@ def season_exists(conn, season):
     return cursor.fetchone()[0] > 0
 
 
-def find_gaps(beginning: int, end: int, db_path: Path = DB_PATH) -> list:
-    """Return seasons in [beginning, end] not present in the DB."""
-    conn = sqlite3.connect(str(db_path))
-    cursor = conn.execute("SELECT DISTINCT season FROM games")
-    present = {row[0] for row in cursor.fetchall()}
+def season_closed(year):
+    """Returns True once a season (by end year) is over: its Finals end by July."""
+    now = datetime.now()
+    return (now.year, now.month) >= (year, 7)
+
+
+def load_playoff_window(conn, season):
+    """Returns the stored (start, end) playoff datetimes of a season, or None."""
+    row = conn.execute("SELECT start_date, end_date FROM playoff_windows WHERE season = ?",
+                       (season,)).fetchone()
+    return (datetime.fromisoformat(row[0]), datetime.fromisoformat(row[1])) if row else None
+
+
+def save_playoff_window(conn, season, start_playoff, end_playoff, source):
+    """Stores a season's playoff window; source records where it came from ('schedule' or 'wikipedia')."""
+    conn.execute("INSERT OR REPLACE INTO playoff_windows (season, start_date, end_date, source) VALUES (?, ?, ?, ?)",
+                 (season, start_playoff.strftime('%Y-%m-%d'), end_playoff.strftime('%Y-%m-%d'), source))
+    conn.commit()
+
+
+def find_playoff_window(conn, season, df, save=True):
+    """
+    Determines the playoff window of a season that has none stored. The
+    schedule pages are tried first: parse_schedule notes the games after a
+    month's "Playoffs" separator row, so the window runs from the first of
+    them to the season's last game. Wikipedia is only asked when the pages
+    have no separator. Windows of closed seasons are saved, so later scrapes
+    of the season need neither.
+    ---
+    Parameters:
+        conn: SQLite connection
+        season: season start year
+        df: the season's games, parsed without a playoff window
+        save: False when df lacks some of the season's pages, so a window
+            derived from an incomplete schedule is not stored
+    ---
+    Returns start and end datetime objects, or (None, None).
+    """
+    if df.empty:
+        return None, None
+    dates = pd.to_datetime(df['Date'])
+    playoff_dates = dates[df['Notes'] == 'Playoffs']
+    if not playoff_dates.empty:
+        window, source = (playoff_dates.min().to_pydatetime(), dates.max().to_pydatetime()), 'schedule'
+    elif season + 1 <= datetime.now().year:
+        window, source = PlayoffScraper().get_data(season + 1), 'wikipedia'
+    else:
+        return None, None
+
+    if save and window[0] and season_closed(season + 1):
+        save_playoff_window(conn, season, *window, source)
+    return window
+
+
+def mark_playoffs(df, start_playoff, end_playoff):
+    """Notes every game of df within [start_playoff, end_playoff] as 'Playoffs', in place."""
+    if start_playoff is None or df.empty:
+        return df
+    in_playoffs = pd.to_datetime(df['Date']).between(start_playoff, end_playoff)
+    df['Notes'] = df['Notes'].where(~in_playoffs, 'Playoffs')
+    return df
+
+
+def track_seasons(frontier, seasons):
+    """Adds the month pages of the given seasons (start years) to the crawl frontier."""
+    for season in seasons:
+        urls, _ = NBAScraper._season_pages(season + 1)
+        frontier.add_season(season, dict(zip(MONTHS, urls)))
+
+
+def find_gaps(beginning: int, end: int, db_path: Path = DB_PATH) -> dict:
+    """Return {season: [month pages not yet written]} for seasons in [beginning, end]."""
+    conn = init_db(db_path)
+    frontier = CrawlFrontier(conn)
+    track_seasons(frontier, range(beginning, end + 1))
+    gaps = frontier.gaps(range(beginning, end + 1))
+    conn.close()
+    return gaps
+
+
+def report_frontier(beginning: int, end: int, db_path: Path = DB_PATH):
+    """Prints how many month pages of seasons in [beginning, end] are written, per month, and the failed ones."""
+    conn = init_db(db_path)
+    frontier = CrawlFrontier(conn)
+    seasons = range(beginning, end + 1)
+    table = frontier.completeness(seasons, MONTHS)
+    print(f"Pages written per month, seasons {beginning}–{end}:")
+    for month, row in table.iterrows():
+        in_flight = row['total'] - row['written'] - row['failed']
+        line = f"  {month:<9} {row['written']:>3}/{row['total']}"
+        if row['failed']:
+            line += f", {row['failed']} failed"
+        if in_flight:
+            line += f", {in_flight} pending"
+        print(line)
+    for season, month, attempts, error, retry_at in frontier.failures(seasons):
+        print(f"  Failed: {season}-{season + 1} {month} after {attempts} attempt(s): {error} "
+              f"(retry after {retry_at:%Y-%m-%d %H:%M})")
     conn.close()
-    return [s for s in range(beginning, end + 1) if s not in present]
 
 
-def insert_season(conn, season, df):
-    """Bulk-inserts a season's DataFrame rows into the games table."""
-    dates = pd.to_datetime(df['Date']).dt.strftime('%Y-%m-%d')
-    visitor_pts = pd.to_numeric(df['Visitor Points'], errors='coerce')
-    home_pts = pd.to_numeric(df['Home Points'], errors='coerce')
-
-    def _s(v):
-        if v is None:
-            return None
-        try:
-            if pd.isna(v):
-                return None
-        except (TypeError, ValueError):
-            pass
-        s = str(v).strip()
-        return s if s else None
-
-    records = [
-        (
-            season,
-            dates.iloc[i],
-            _s(df['Start Time (ET)'].iloc[i]),
-            _s(df['Visitor'].iloc[i]),
-            None if pd.isna(visitor_pts.iloc[i]) else int(visitor_pts.iloc[i]),
-            _s(df['Home'].iloc[i]),
-            None if pd.isna(home_pts.iloc[i]) else int(home_pts.iloc[i]),
-            _s(df['Box Score'].iloc[i]),
-            _s(df['Overtime'].iloc[i]),
-            _s(df['Attendance'].iloc[i]),
-            _s(df['Arena'].iloc[i]),
-            _s(df['Notes'].iloc[i]),
-        )
-        for i in range(len(df))
-    ]
-    conn.executemany("""
-        INSERT INTO games (season, date, start_time, visitor, visitor_points, home, home_points,
-                           box_score, overtime, attendance, arena, notes)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, records)
+CSV_CHUNK = 50_000  # rows per chunk when reading CSV archives
+
+
+def _text_column(series):
+    """Stripped strings, with missing or blank values as None."""
+    text = series.astype(str).str.strip().to_numpy(dtype=object)
+    return np.where(series.isna().to_numpy() | (text == ''), None, text)
+
+
+def _points_column(series):
+    """Integer scores as Python ints, with missing or unparseable values as None."""
+    points = np.trunc(pd.to_numeric(series, errors='coerce')).astype('Int64')
+    return points.to_numpy(dtype=object, na_value=None)
+
+
+def _season_frame(season, df):
+    """
+    Cleans a season DataFrame column by column into GAME_COLUMNS, one row per
+    (date, visitor, home) with the last listing of a game winning. Values are
+    Python objects (str, int or None) ready to be bound by sqlite3.
+    """
+    unknown = unknown_names(pd.concat([df['Visitor'], df['Home']]))
+    if unknown:
+        tqdm.write(f"  Warning: season {season} has team names missing from the registry: {unknown}")
+    frame = pd.DataFrame({
+        'season': np.full(len(df), season, dtype=object),
+        'date': pd.to_datetime(df['Date']).dt.strftime('%Y-%m-%d').to_numpy(dtype=object),
+        'start_time': _text_column(df['Start Time (ET)']),
+        'visitor': _text_column(df['Visitor']),
+        'visitor_points': _points_column(df['Visitor Points']),
+        'home': _text_column(df['Home']),
+        'home_points': _points_column(df['Home Points']),
+        'box_score': _text_column(df['Box Score']),
+        'overtime': _text_column(df['Overtime']),
+        'attendance': _text_column(df['Attendance']),
+        'arena': _text_column(df['Arena']),
+        'notes': _text_column(df['Notes']),
+    }, columns=list(GAME_COLUMNS), dtype=object)
+    return frame.drop_duplicates(['date', 'visitor', 'home'], keep='last')
+
+
+def _records(frame):
+    """Iterates a frame's rows as tuples straight from its object columns, without materializing them."""
+    return zip(*(frame[name].to_numpy(dtype=object) for name in GAME_COLUMNS))
+
+
+def upsert_season(conn, season, df, prune=False):
+    """
+    Writes a season's DataFrame rows into the games table, keyed on (date,
+    visitor, home). New games are inserted, games whose content hash changed
+    are updated in place, and unchanged games are not written at all, so a
+    re-scrape touches only the rows that differ. All in one transaction.
+    ---
+    Parameters:
+        conn: SQLite connection
+        season: season start year
+        df: the season's games, as returned by nba_season
+        prune: if True, df is the whole season and the season's stored games
+            missing from it (e.g. postponed and rescheduled) are deleted
+    ---
+    Returns a dict of inserted / updated / unchanged / deleted row counts.
+    """
+    frame = _season_frame(season, df)
+    stored = {(date, visitor, home): row_hash for date, visitor, home, row_hash in conn.execute(
+        "SELECT date, visitor, home, row_hash FROM games WHERE season = ?", (season,))}
+
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+    now = _now()
+
+    def changed():
+        # Counted as executemany consumes the rows
+        for record in _records(frame):
+            row_hash = _row_hash(record)
+            old = stored.get((record[1], record[3], record[5]))
+            if old is None:
+                counts['inserted'] += 1
+            elif old != row_hash:
+                counts['updated'] += 1
+            else:
+                counts['unchanged'] += 1
+                continue
+            yield record + (row_hash, now)
+
+    conn.executemany(_UPSERT_GAME, changed())
+
+    if prune:
+        stale = stored.keys() - set(zip(frame['date'], frame['visitor'], frame['home']))
+        conn.executemany("DELETE FROM games WHERE date = ? AND visitor = ? AND home = ?", stale)
+        counts['deleted'] = len(stale)
     conn.commit()
+    return counts
+
+
+def insert_season(conn, season, df):
+    """Writes a season's DataFrame rows into the games table (see upsert_season); returns the row counts."""
+    return upsert_season(conn, season, df)
+
 
+def replace_season(conn, season, df):
+    """Makes df the season's complete set of games in a single transaction; returns the row counts."""
+    return upsert_season(conn, season, df, prune=True)
 
-def migrate_csv(conn, csv_dir=Path('data')):
-    """Reads CSVs in csv_dir, derives season per row, and inserts missing seasons into the DB."""
+
+def migrate_csv(conn, csv_dir=Path('data'), chunksize=CSV_CHUNK):
+    """
+    Reads CSVs in csv_dir in chunks, derives season per row, and inserts
+    seasons missing from the DB. A season split across chunks is written
+    chunk by chunk.
+    """
     csv_dir = Path(csv_dir)
+    present = {season for (season,) in conn.execute("SELECT DISTINCT season FROM games")}
     total = 0
     for csv_file in sorted(csv_dir.glob('*.csv')):
-        df = pd.read_csv(csv_file)
-        df['Date'] = pd.to_datetime(df['Date'])
-        # Season starting year: Oct+ of year Y → season Y; earlier months → season Y-1
-        df['_season'] = df['Date'].apply(lambda d: d.year if d.month >= 9 else d.year - 1)
-        for season, sdf in df.groupby('_season'):
-            if season_exists(conn, season):
-                tqdm.write(f"  Season {season}-{season+1} already in DB, skipping migration")
-                continue
-            insert_season(conn, season, sdf.drop(columns=['_season']).reset_index(drop=True))
-            total += len(sdf)
-            tqdm.write(f"  Migrated season {season}-{season+1}: {len(sdf)} games")
+        migrated, skipped = {}, set()
+        for chunk in pd.read_csv(csv_file, chunksize=chunksize):
+            dates = pd.to_datetime(chunk['Date'])
+            # Season starting year: Oct+ of year Y → season Y; earlier months → season Y-1
+            seasons = np.where(dates.dt.month >= 9, dates.dt.year, dates.dt.year - 1)
+            chunk = chunk.assign(Date=dates)
+            for season, sdf in chunk.groupby(seasons, sort=False):
+                season = int(season)
+                if season in present:
+                    skipped.add(season)
+                    continue
+                counts = insert_season(conn, season, sdf)
+                migrated[season] = migrated.get(season, 0) + counts['inserted']
+        for season in sorted(skipped):
+            tqdm.write(f"  Season {season}-{season+1} already in DB, skipping migration")
+        for season, rows in sorted(migrated.items()):
+            tqdm.write(f"  Migrated season {season}-{season+1}: {rows} games")
+        total += sum(migrated.values())
+        present |= migrated.keys()
     print(f"Migration complete: {total} rows inserted.")
 
 
-class NBAScraper:
-    # Class-level rate limiter: serializes requests to basketball-reference.com
-    # with a minimum interval to comply with their crawler policy.
-    _bball_ref_lock = threading.Lock()
-    _last_bball_ref_request = 0.0
-    _min_bball_ref_interval = 5.0  # seconds between requests
-    _db_write_lock = threading.Lock()
+SCHEDULE_COLUMNS = ['Date', 'Start Time (ET)', 'Visitor', 'Visitor Points', 'Home', 'Home Points',
+                    'Box Score', 'Overtime', 'Attendance', 'Arena', 'Notes']
+# td index of each column after the date th: modern pages (2008+) have 11 TDs
+# with start time at TD[0]; old pages (pre-2008) have 10 TDs with visitor at TD[0]
+_MODERN_TDS = {'Start Time (ET)': 0, 'Visitor': 1, 'Visitor Points': 2, 'Home': 3, 'Home Points': 4,
+               'Box Score': 5, 'Overtime': 6, 'Attendance': 7, 'Arena': 8, 'Notes': 9}
+_OLD_TDS = {'Start Time (ET)': None, 'Visitor': 0, 'Visitor Points': 1, 'Home': 2, 'Home Points': 3,
+            'Box Score': 4, 'Overtime': 5, 'Attendance': 6, 'Arena': 7, 'Notes': 8}
+
+
+def _schedule_rows(html_content):
+    """
+    Returns the <tr> elements of a page's schedule table body. Only the
+    #schedule table's markup is handed to lxml when it can be located in the
+    raw HTML; otherwise the whole page is parsed and the first table used.
+    """
+    if isinstance(html_content, bytes):
+        html_content = html_content.decode('utf-8', errors='replace')
+    marker = html_content.find('id="schedule"')
+    start = html_content.rfind('<table', 0, marker) if marker >= 0 else -1
+    end = html_content.find('</table>', marker) if start >= 0 else -1
+    if end >= 0:
+        table = lxml_html.fragment_fromstring(html_content[start:end + len('</table>')])
+    else:
+        tables = lxml_html.document_fromstring(html_content).xpath('//table')
+        if not tables:
+            return []
+        table = tables[0]
+    return table.xpath('./tbody/tr')
+
+
+def schedule_columns(html_content):
+    """
+    Extracts the schedule table of a basketball-reference month page as columns.
+    Handles both the modern 11-column and the pre-2008 10-column layouts; header
+    and separator rows (no date th, no tds or an unparseable date) are skipped.
+    ---
+    Parameters:
+        html_content: string or bytes, the page HTML
+    ---
+    Returns a dict of column name -> numpy array, keyed like SCHEDULE_COLUMNS
+    (Date as datetime64; other cells as raw text, Box Score as a full URL),
+    plus 'After Playoffs Row': True for games below the page's "Playoffs"
+    separator row.
+    """
+    dates, cells = [], {name: [] for name in SCHEDULE_COLUMNS[1:]}
+    after_separator, playoffs = False, []
+    for row in _schedule_rows(html_content):
+        ths = row.findall('th')
+        tds = row.findall('td')
+        if ths and not tds and ths[0].text_content().strip() == 'Playoffs':
+            after_separator = True
+        if not ths or not tds:
+            continue
+        dates.append(ths[0].text_content().strip())
+        playoffs.append(after_separator)
+        layout = _MODERN_TDS if len(tds) >= 11 else _OLD_TDS
+        for name, i in layout.items():
+            if name == 'Box Score':
+                link = tds[i].find('.//a')
+                href = link.get('href') if link is not None else None
+                cells[name].append('https://www.basketball-reference.com/' + href if href else '')
+            else:
+                cells[name].append(tds[i].text_content() if i is not None and i < len(tds) else '')
+
+    parsed = pd.to_datetime(pd.Series(dates, dtype=object), format='%a, %b %d, %Y', errors='coerce')
+    keep = parsed.notna().to_numpy()
+    columns = {'Date': parsed.to_numpy()[keep]}
+    columns.update({name: np.array(values, dtype=object)[keep] for name, values in cells.items()})
+    columns['After Playoffs Row'] = np.array(playoffs, dtype=bool)[keep]
+    return columns
+
+
+def upcoming_games(games, start, end):
+    """
+    Unplayed games (both score cells empty) dated within [start, end].
+    ---
+    Parameters:
+        games: DataFrame with SCHEDULE_COLUMNS, e.g. from parse_schedule.
+        start, end: datetime.date bounds (inclusive).
+    ---
+    Returns a DataFrame with columns: date ('YYYY-MM-DD'), visitor, home.
+    """
+    if games.empty:
+        return pd.DataFrame(columns=['date', 'visitor', 'home'])
+    game_dates = pd.to_datetime(games['Date']).dt.date
+    # Skip already-played games (score columns populated)
+    unplayed = (games['Visitor Points'].str.strip() == '') & (games['Home Points'].str.strip() == '')
+    games = games[(game_dates >= start) & (game_dates <= end) & unplayed]
+    return pd.DataFrame({
+        'date': pd.to_datetime(games['Date']).dt.strftime('%Y-%m-%d'),
+        'visitor': games['Visitor'].str.strip(),
+        'home': games['Home'].str.strip(),
+    }).reset_index(drop=True)
+
+
+def parse_schedule(html_content, start_playoff=None, end_playoff=None):
+    """
+    Parses a basketball-reference month schedule page.
+    Module-level and side-effect free so it can run off the fetching thread.
+    Without a playoff window, the games after the page's "Playoffs" separator
+    row are noted 'Playoffs' instead (see find_playoff_window).
+    ---
+    Parameters:
+        html_content: string, the page HTML
+        start_playoff: datetime, start of playoffs
+        end_playoff: datetime, end of playoffs
+    ---
+    Returns a DataFrame containing the data.
+    """
+    columns = schedule_columns(html_content)
+    # change note to 'Playoffs' if playoffs have started
+    if start_playoff:
+        dates = columns['Date']
+        in_playoffs = (dates >= np.datetime64(start_playoff)) & (dates <= np.datetime64(end_playoff))
+    else:
+        in_playoffs = columns['After Playoffs Row']
+    columns['Notes'] = np.where(in_playoffs, 'Playoffs', columns['Notes']).astype(object)
+    return pd.DataFrame(columns, columns=SCHEDULE_COLUMNS)
+
+
+class ScheduleUnavailable(Exception):
+    """Some month pages of a schedule could not be fetched or parsed."""
+    def __init__(self, failures):
+        super().__init__(f"{len(failures)} schedule page(s) unavailable: " + "; ".join(failures))
+        self.failures = failures
 
+
+class NBAScraper:
     def __init__(self):
         """
         Initializes the NBAScraper object.
         """
         pass
 
-    def _rate_limited_get(self, url, retries=3):
+    def _rate_limited_get(self, url, retries=3, max_age=None):
         """
-        Makes a GET request to basketball-reference.com, blocking until the
-        minimum interval since the last request has elapsed. Retries on 429.
+        Makes a GET request to basketball-reference.com once the host's token
+        bucket allows it (BBALL_REF_INTERVAL or the robots.txt Crawl-delay).
+        Retries on 429.
+        Pages fresh in the response cache (see max_age) are returned without a
+        request and without waiting on the rate limiter.
         """
-        for attempt in range(retries):
-            with NBAScraper._bball_ref_lock:
-                elapsed = time.time() - NBAScraper._last_bball_ref_request
-                if elapsed < NBAScraper._min_bball_ref_interval:
-                    time.sleep(NBAScraper._min_bball_ref_interval - elapsed)
-                response = requests.get(url, headers={
-                    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                })
-                NBAScraper._last_bball_ref_request = time.time()
-
-            if response.status_code == 429:
-                wait = 10 * (attempt + 1)
-                tqdm.write(f"  Rate limited (429), waiting {wait}s before retry...")
-                time.sleep(wait)
-                continue
-            return response
-
-        response.raise_for_status()
-        return response
+        return fetcher.fetch(url, headers=BROWSER_HEADERS, max_age=max_age, retries=retries)
 
     @staticmethod
     def allowed_by_robots_txt(url):
         """
         Returns a boolean value representing if a url is allowed
         to be scraped, according to the site's robots.txt
+        (parsed once per host and cached; see fetch.RobotsPolicy).
         ---
         Parameters:
             url: string representing url to scrape
         ---
         Returns a boolean value.
         """
-        # Get robots.txt
-        url_split = url.split("/")
-        robots_txt_url = url_split[0] + '//' + url_split[2] + '/robots.txt'
-
-        response = requests.get(robots_txt_url)
-        response.raise_for_status()
-
-        lines = response.text.split('\n')
+        return robots.allowed(url)
 
-        user_agent_reached = False
-
-        for line in lines:
-            if line.strip() == 'User-agent: *':
-                user_agent_reached = True
-
-            if line.lower().startswith('disallow') and user_agent_reached:
-                # Check if the URL is disallowed
-                disallowed_path = line.split(':', 1)[1].strip()
-                if disallowed_path == '/':
-                    break
-                if disallowed_path in url:
-                    return False
-
-        # If no specific rule is found, the URL is allowed
-        return True
-
-    def get_data(self, url, start_playoff, end_playoff):
+    def get_data(self, url, start_playoff, end_playoff, max_age=None):
         """
         Creates DataFrame containing a month's amount of data from url.
         ---
@@ -202,235 +522,223 @@ class NBAScraper:
             url: string representing url to scrape
             start_playoff: datetime, start of playoffs
             end_playoff: datetime, end of playoffs
+            max_age: seconds a cached copy of the page is used without revalidation
         ---
-        Returns a DataFrame containing the data.
+        Returns a DataFrame containing the data (empty if the month has no
+        page, e.g. no games during a lockout).
         """
-        response = self._rate_limited_get(url)
+        response = self._rate_limited_get(url, max_age=max_age)
 
+        if response.status_code == 404:
+            return pd.DataFrame(columns=SCHEDULE_COLUMNS)
         if response.status_code == 200:
             html_content = response.text
         else:
             raise Exception(f"Error: Unable to fetch content. Status code: {response.status_code}.")
 
-        # create soup object and get only 'tr' tags
-        page = bs4.BeautifulSoup(html_content, features='lxml')
+        return parse_schedule(html_content, start_playoff, end_playoff)
 
-        # Try modern div chain first; fall back to any schedule table for older pages
-        try:
-            rows = (page
-                    .find('body', class_='bbr')
-                    .find('div', {'id': 'wrap'})
-                    .find('div', {'id': 'content'})
-                    .find('div', {'id': 'all_schedule'})
-                    .find('div', {'id': 'div_schedule'})
-                    .find('tbody')
-                    .find_all('tr'))
-        except AttributeError:
-            table = page.find('table', {'id': 'schedule'}) or page.find('table')
-            rows = table.find('tbody').find_all('tr') if table else []
-
-        # collect data
-        date, start, visitor, visitor_pts, home, home_pts, box_score, ot, attend, arena, notes = [], [], [], [], [], [], [], [], [], [], []
-        for game in rows:
-            ths = game.find_all('th')
-            tds = game.find_all('td')
-
-            # Skip header/separator rows (no date th or no tds)
-            if not ths or not tds:
-                continue
-            try:
-                game_date = datetime.strptime(ths[0].text.strip(), '%a, %b %d, %Y')
-            except ValueError:
-                continue
+    @staticmethod
+    def _season_pages(year):
+        """Month page URLs of a season (by end year) and the cache max_age to fetch them with."""
+        # A season is closed once its Finals are over; its pages never change again
+        max_age = IMMUTABLE if season_closed(year) else None
+        urls = [f'https://www.basketball-reference.com/leagues/NBA_{year}_games-{month}.html'
+                for month in MONTHS]
+        return urls, max_age
 
-            # Detect format: modern pages (2008+) have 11 TDs with start time at TD[0];
-            # old pages (pre-2008) have 10 TDs with visitor team at TD[0].
-            is_modern = len(tds) >= 11
-
-            if is_modern:
-                start_time   = tds[0].text
-                visitor_team = tds[1].text
-                v_pts        = tds[2].text
-                home_team    = tds[3].text
-                h_pts        = tds[4].text
-                box_td       = tds[5]
-                ot_val       = tds[6].text
-                attend_val   = tds[7].text
-                arena_val    = tds[8].text
-                note_val     = tds[9].text
-            else:
-                start_time   = ''
-                visitor_team = tds[0].text
-                v_pts        = tds[1].text
-                home_team    = tds[2].text
-                h_pts        = tds[3].text
-                box_td       = tds[4]
-                ot_val       = tds[5].text
-                attend_val   = tds[6].text
-                arena_val    = tds[7].text if len(tds) > 7 else ''
-                note_val     = tds[8].text if len(tds) > 8 else ''
-
-            box_a = box_td.find('a')
-            box_url = ('https://www.basketball-reference.com/' + box_a.get('href')) if box_a else ''
-
-            # change note to 'Playoffs' if playoffs have started
-            if start_playoff and start_playoff <= game_date <= end_playoff:
-                note_val = 'Playoffs'
-
-            date.append(game_date)
-            start.append(start_time)
-            visitor.append(visitor_team)
-            visitor_pts.append(v_pts)
-            home.append(home_team)
-            home_pts.append(h_pts)
-            box_score.append(box_url)
-            ot.append(ot_val)
-            attend.append(attend_val)
-            arena.append(arena_val)
-            notes.append(note_val)
-
-        # create DataFrame
-        data = {'Date': date,
-                'Start Time (ET)': start,
-                'Visitor': visitor,
-                'Visitor Points': visitor_pts,
-                'Home': home,
-                'Home Points': home_pts,
-                'Box Score': box_score,
-                'Overtime': ot,
-                'Attendance': attend,
-                'Arena': arena,
-                'Notes': notes}
-        return pd.DataFrame(data)
-
-    def nba_season(self, year):
+    @staticmethod
+    def _log_season(year, df, start_playoff, end_playoff):
+        playoff_str = (f", playoffs {start_playoff.strftime('%b %d')}–{end_playoff.strftime('%b %d')}"
+                       if start_playoff else "")
+        tqdm.write(f"  [{year - 1}-{year}] {len(df)} games{playoff_str}")
+
+    def nba_season(self, year, db_path=DB_PATH):
         """
         Creates DataFrame for a specific year.
+        The playoff window comes from the playoff_windows table when stored,
+        otherwise from the pages themselves (see find_playoff_window). Each
+        page's outcome is recorded in the crawl frontier; failed pages are
+        reported rather than dropped silently.
         ---
         Parameters:
             year: integer, representing what year to scrape
+            db_path: path to the SQLite database holding playoff windows
         ---
         Returns a DataFrame containing the data.
         """
-        season_label = f"{year - 1}-{year}"
         df = pd.DataFrame()
-        months = ['october', 'november', 'december', 'january', 'february', 'march', 'april', 'may', 'june']
 
-        playoff_scraper = PlayoffScraper()
-        start_playoff, end_playoff = None, None
-        if year <= datetime.now().year:
-            start_playoff, end_playoff = playoff_scraper.get_data(year)
+        season = year - 1
+        conn = init_db(db_path)
+        frontier = CrawlFrontier(conn)
+        try:
+            start_playoff, end_playoff = load_playoff_window(conn, season) or (None, None)
 
-        for month in months:
-            url = f'https://www.basketball-reference.com/leagues/NBA_{year}_games-{month}.html'
-            try:
-                month_df = self.get_data(url, start_playoff, end_playoff)
+            urls, max_age = self._season_pages(year)
+            track_seasons(frontier, [season])
+            failed = 0
+            for month, url in zip(MONTHS, urls):
+                try:
+                    if not self.allowed_by_robots_txt(url):
+                        raise PermissionError("disallowed by robots.txt")
+                    month_df = self.get_data(url, start_playoff, end_playoff, max_age=max_age)
+                except Exception as e:
+                    frontier.mark(season, month, 'failed', str(e) or type(e).__name__, attempts=1)
+                    tqdm.write(f"  Warning: failed to scrape {url}: {e}")
+                    failed += 1
+                    continue
+                frontier.mark(season, month, 'parsed', attempts=1)
                 df = pd.concat([df, month_df], ignore_index=True)
-            except Exception:
-                pass
 
-        playoff_str = (f", playoffs {start_playoff.strftime('%b %d')}–{end_playoff.strftime('%b %d')}"
-                       if start_playoff else "")
-        tqdm.write(f"  [{season_label}] {len(df)} games{playoff_str}")
-        return df
-
-    def _scrape_season(self, year, db_path, force):
-        """Fetches a single season; returns (year, df) or (year, None) if already in DB."""
-        # Open a per-thread read connection just for the existence check
-        conn_read = sqlite3.connect(db_path)
-        exists = season_exists(conn_read, year)
-        conn_read.close()
+            if start_playoff is None:
+                start_playoff, end_playoff = find_playoff_window(conn, season, df, save=not failed)
+                mark_playoffs(df, start_playoff, end_playoff)
+        finally:
+            conn.close()
 
-        if exists and not force:
-            tqdm.write(f"  Season {year}-{year + 1} already in DB, skipping")
-            return year, None
-
-        return year, self.nba_season(year + 1)
+        self._log_season(year, df, start_playoff, end_playoff)
+        return df
 
-    def data_years(self, beginning=2013, end=2023, db_path=DB_PATH, force=False):
+    def data_years(self, beginning=2013, end=2023, db_path=DB_PATH, force=False, concurrency=2):
         """
         Scrapes seasons in [beginning, end] and writes each to the SQLite DB.
-        Skips seasons already present unless --force is set.
-        Seasons are fetched concurrently; requests to basketball-reference.com
-        are serialized via a rate limiter to comply with their crawler policy.
+        Resumes from the crawl frontier: only month pages not yet written (and
+        failed pages whose retry backoff has elapsed) are fetched, unless
+        --force is set.
+        Runs a ScrapePipeline: seasons are fetched concurrently (requests to
+        basketball-reference.com share one token bucket to comply with their
+        crawler policy), pages are parsed in a process pool and a single writer
+        thread inserts each finished season.
         ---
         Parameters:
             beginning: first season start year to include (inclusive)
             end: last season start year to include (inclusive)
             db_path: path to the SQLite database
             force: if True, re-scrape and replace seasons already in the DB
+            concurrency: seasons being fetched at once
+        ---
+        Returns the pipeline's per-stage throughput report.
         """
-        conn = init_db(db_path)
-        years = list(range(beginning, end + 1))
-        seasons_added = 0
-
-        with tqdm(total=len(years), desc='Scraping seasons') as pbar:
-            for year in years:
-                try:
-                    year_out, df = self._scrape_season(year, db_path, force)
-                    if df is not None and not df.empty:
-                        if force:
-                            conn.execute("DELETE FROM games WHERE season = ?", (year_out,))
-                            conn.commit()
-                        insert_season(conn, year_out, df)
-                        seasons_added += 1
-                except Exception as e:
-                    tqdm.write(f"Warning: failed to scrape {year}-{year + 1}: {e}")
-                pbar.update(1)
-
-        conn.close()
-        print(f"Done. {seasons_added} season(s) added to {db_path}")
-
+        from .ScrapePipeline import ScrapePipeline
+
+        pipeline = ScrapePipeline(db_path, force=force, concurrency=concurrency)
+        report = pipeline.run(range(beginning, end + 1))
+
+        print(f"Done. {report['seasons_added']} season(s) added to {db_path} in {report['wall_s']:.1f}s")
+        rows = report['rows']
+        print(f"  rows   {rows['inserted']} inserted, {rows['updated']} updated, "
+              f"{rows['unchanged']} unchanged, {rows['deleted']} deleted")
+        for stage, unit in (('fetch', 'pages'), ('parse', 'pages'), ('write', 'seasons')):
+            stats = report[stage]
+            rate = f"{stats['items_per_s']:.2f} {unit}/s" if stats['items_per_s'] else "-"
+            rows = f", {stats['rows']} rows" if stats['rows'] else ""
+            print(f"  {stage:<6} {stats['items']:>5} {unit}{rows}, busy {stats['busy_s']:.1f}s, {rate}")
+        stats = fetcher.stats
+        print(f"HTTP: {stats['network']} request(s), {stats['not_modified']} not modified, "
+              f"{stats['cache_hits']} page(s) served from cache, {stats['rate_limited']} rate limited")
+        return report
+
+
+    def refresh_season(self, season, days=7, db_path=DB_PATH):
+        """
+        Re-scrapes a season and derives the upcoming games from the same pages:
+        every month page is fetched and parsed once, completed and scheduled
+        games replace the season in the DB, and the unplayed ones within the
+        next `days` days are returned for the upcoming_games table.
+        ---
+        Parameters:
+            season: season start year
+            days: upcoming-games window, from today
+            db_path: path to the SQLite database
+        ---
+        Returns a DataFrame with columns: date, visitor, home (see scrape_upcoming).
+        """
+        from datetime import date, timedelta
+        df = self.nba_season(season + 1, db_path=db_path)
+        if not df.empty:
+            conn = init_db(db_path)
+            frontier = CrawlFrontier(conn)
+            states = frontier.states(season)
+            for month, state in states.items():
+                if state == 'parsed':
+                    frontier.mark(season, month, 'written', commit=False)
+            # Games missing from the pages are only dropped when every page came through
+            if 'failed' in states.values():
+                counts = insert_season(conn, season, df)
+            else:
+                counts = replace_season(conn, season, df)
+            conn.close()
+            tqdm.write(f"  [{season}-{season + 1}] {counts['inserted']} inserted, {counts['updated']} updated, "
+                       f"{counts['unchanged']} unchanged, {counts['deleted']} deleted")
+        today = date.today()
+        return upcoming_games(df, today, today + timedelta(days=days))
 
-    def scrape_upcoming(self, days=7):
+    @staticmethod
+    def _window_pages(start, end):
+        """Month schedule page URLs whose calendar month overlaps [start, end], in date order."""
+        urls = []
+        year, month = start.year, start.month
+        while (year, month) <= (end.year, end.month):
+            name = calendar.month_name[month].lower()
+            if name in MONTHS:  # no schedule pages for July-September
+                season_end_year = year + 1 if month >= 10 else year
+                urls.append(f'https://www.basketball-reference.com/leagues/NBA_{season_end_year}_games-{name}.html')
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return urls
+
+    def scrape_upcoming(self, days=7, max_age=UPCOMING_MAX_AGE, season=None):
         """
         Fetches games not yet played within the next `days` days.
+        Only the month pages overlapping the window are requested (usually one
+        or two), and a page fetched less than max_age seconds ago is reused.
+        With season (start year), only that season's remaining regular season
+        is returned: pages of the next season are not requested, and games
+        from the first one below a "Playoffs" separator row on are dropped.
+        Since a partial schedule would then pass for the whole remainder of the
+        season, any page that fails raises ScheduleUnavailable instead of
+        being skipped.
         Returns a DataFrame with columns: date, visitor, home.
         """
         from datetime import date, timedelta
         today = date.today()
         cutoff = today + timedelta(days=days)
-        season_end_year = today.year + 1 if today.month >= 10 else today.year
+        pages = self._window_pages(today, cutoff)
+        if season is not None:
+            cutoff = min(cutoff, date(season + 1, 9, 30))
+            pages = [url for url in pages if f'/NBA_{season + 1}_games-' in url]
 
-        months = ['october', 'november', 'december', 'january', 'february', 'march', 'april', 'may', 'june']
         upcoming = []
+        playoff_start = None
+        failed = []
 
-        for month in months:
-            url = f'https://www.basketball-reference.com/leagues/NBA_{season_end_year}_games-{month}.html'
+        for url in pages:
             try:
-                response = self._rate_limited_get(url)
-                if response.status_code != 200:
-                    continue
-                soup = bs4.BeautifulSoup(response.text, features='lxml')
-                div = soup.find('div', {'id': 'div_schedule'})
-                if div is None:
+                if not self.allowed_by_robots_txt(url):
+                    raise PermissionError("disallowed by robots.txt")
+                response = self._rate_limited_get(url, max_age=max_age)
+                if response.status_code == 404:  # a month without games has no page
                     continue
-                tbody = div.find('tbody')
-                if tbody is None:
+                if response.status_code != 200:
+                    failed.append(f"{url}: HTTP {response.status_code}")
                     continue
-                for game in tbody.find_all('tr'):
-                    ths = game.find_all('th')
-                    tds = game.find_all('td')
-                    if not ths or len(tds) < 5:
-                        continue
-                    try:
-                        game_date = datetime.strptime(ths[0].text.strip(), '%a, %b %d, %Y').date()
-                    except ValueError:
-                        continue
-                    if game_date < today or game_date > cutoff:
-                        continue
-                    # Skip already-played games (score columns populated)
-                    if tds[2].text.strip() or tds[4].text.strip():
-                        continue
-                    upcoming.append({
-                        'date': game_date.strftime('%Y-%m-%d'),
-                        'visitor': tds[1].text.strip(),
-                        'home': tds[3].text.strip(),
-                    })
-            except Exception:
-                pass
-
-        return pd.DataFrame(upcoming) if upcoming else pd.DataFrame(columns=['date', 'visitor', 'home'])
+                columns = schedule_columns(response.text)
+                games = pd.DataFrame(columns, columns=SCHEDULE_COLUMNS)
+                if columns['After Playoffs Row'].any():
+                    first = pd.Timestamp(columns['Date'][columns['After Playoffs Row']].min()).date()
+                    playoff_start = first if playoff_start is None else min(playoff_start, first)
+                upcoming.append(upcoming_games(games, today, cutoff))
+            except Exception as e:
+                failed.append(f"{url}: {e}")
+
+        if failed and season is not None:
+            raise ScheduleUnavailable(failed)
+        if not upcoming:
+            return pd.DataFrame(columns=['date', 'visitor', 'home'])
+        upcoming = pd.concat(upcoming, ignore_index=True)
+        if season is not None and playoff_start is not None:
+            upcoming = upcoming[upcoming['date'] < playoff_start.isoformat()].reset_index(drop=True)
+        return upcoming
 
 
 def main():
@@ -440,11 +748,21 @@ def main():
     parser.add_argument("--force", action="store_true", help="Re-scrape and replace seasons already in the DB")
     parser.add_argument("--migrate-only", action="store_true", help="Migrate existing CSVs in data/ into the DB and exit")
     parser.add_argument("--fill-gaps", action="store_true",
-                        help="Detect and scrape all missing seasons in --beginning..--end range")
+                        help="Detect and scrape only the month pages missing in --beginning..--end range")
     parser.add_argument("--report-gaps", action="store_true",
-                        help="Print missing seasons in range and exit without scraping")
+                        help="Print per-month completeness and missing pages in range and exit without scraping")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Bypass the on-disk HTTP cache in data/http_cache")
+    parser.add_argument("--record", nargs="?", type=Path, const=ARCHIVE_PATH, metavar="ARCHIVE",
+                        help=f"Record every response to a compressed archive (default {ARCHIVE_PATH}) "
+                             "for offline replay with backend.bench.replay")
     args = parser.parse_args()
 
+    if args.no_cache:
+        fetcher.cache = None
+    if args.record:
+        fetcher.archive = ResponseArchive(args.record)
+
     if args.migrate_only:
         conn = init_db(DB_PATH)
         migrate_csv(conn, Path('data'))
@@ -453,15 +771,20 @@ def main():
 
     if args.report_gaps or args.fill_gaps:
         gaps = find_gaps(args.beginning, args.end)
+        report_frontier(args.beginning, args.end)
         if not gaps:
-            print("No gaps found — all seasons present.")
+            print("No gaps found — all pages written.")
         else:
-            print(f"Missing seasons ({len(gaps)}): {gaps}")
+            print(f"Missing pages in {len(gaps)} season(s):")
+            for season, months in gaps.items():
+                print(f"  {season}-{season + 1}: {', '.join(months)}")
         if args.report_gaps:
             return
         if gaps:
+            # The pipeline only fetches pages not yet written (see CrawlFrontier.due)
             scraper = NBAScraper()
             scraper.data_years(beginning=min(gaps), end=max(gaps), db_path=DB_PATH)
+            report_frontier(min(gaps), max(gaps))
         return
 
     # Migrate any existing CSVs into the DB if the DB is new/empty
@@ -478,6 +801,7 @@ def main():
     nba_scraper = NBAScraper()
     print(f"Scraping seasons {args.beginning}–{args.end} into {DB_PATH} ...")
     nba_scraper.data_years(beginning=args.beginning, end=args.end, db_path=DB_PATH, force=args.force)
+    report_frontier(args.beginning, args.end)
 
 if __name__ == "__main__":
     main()
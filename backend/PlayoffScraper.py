@@ -1,7 +1,7 @@
 import re
-import requests
 import bs4
 from datetime import datetime
+from .fetch import fetcher, IMMUTABLE
 
 class PlayoffScraper:
     def __init__(self):
@@ -22,7 +22,9 @@ class PlayoffScraper:
 
         url = f'https://en.wikipedia.org/wiki/{year}_NBA_playoffs'
         headers = {'User-Agent': 'Mozilla/5.0 (compatible; nba-elo-scraper/1.0)'}
-        response = requests.get(url, headers=headers)
+        # Past playoffs are settled; only the current year's page is revalidated
+        max_age = IMMUTABLE if year < datetime.now().year else None
+        response = fetcher.fetch(url, headers=headers, max_age=max_age)
         response.raise_for_status()
 
         soup = bs4.BeautifulSoup(response.text, 'lxml')
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+
+class RatingIndex:
+    def __init__(self, series):
+        """
+        In-memory as-of index of rating histories.
+        ---
+        Parameters:
+            series: dict of team name -> (dates, ratings), where dates is a sorted
+                numpy datetime64[D] array and ratings the rating after each date.
+        """
+        self.series = series
+
+
+    @classmethod
+    def from_rows(cls, teams, dates, ratings):
+        """
+        Builds the index from parallel columns, e.g. an elo_history table scan.
+        Rows sharing a team and date keep their input order, so the last one wins.
+        ---
+        Parameters:
+            teams: array-like of team names.
+            dates: array-like of 'YYYY-MM-DD' strings or datetimes.
+            ratings: array-like of ratings after that date's game.
+        ---
+        Returns a RatingIndex.
+        """
+        teams = pd.Series(teams, dtype=object).to_numpy()
+        dates = pd.to_datetime(pd.Series(dates)).to_numpy().astype('datetime64[D]')
+        ratings = np.asarray(ratings, dtype=np.float64)
+
+        codes, names = pd.factorize(teams)
+        order = np.lexsort((np.arange(len(codes)), dates, codes))
+        bounds = np.searchsorted(codes[order], np.arange(len(names) + 1))
+        dates, ratings = dates[order], ratings[order]
+        return cls({
+            name: (dates[bounds[i]:bounds[i + 1]], ratings[bounds[i]:bounds[i + 1]])
+            for i, name in enumerate(names)
+        })
+
+
+    @classmethod
+    def from_game_log(cls, game_log):
+        """
+        Builds the index straight from NBARater.getGameLog() output.
+        ---
+        Parameters:
+            game_log: DataFrame with date, visitor, home, visitor_after, home_after.
+        ---
+        Returns a RatingIndex.
+        """
+        # Interleave visitor/home rows so same-date entries keep game order
+        def interleave(visitor_col, home_col):
+            return np.column_stack([game_log[visitor_col].to_numpy(), game_log[home_col].to_numpy()]).ravel()
+
+        return cls.from_rows(
+            interleave('visitor', 'home'),
+            interleave('date', 'date'),
+            interleave('visitor_after', 'home_after').astype(np.float64),
+        )
+
+
+    def rating(self, team, as_of, default=None):
+        """
+        Rating of a team after all of its games on or before a date, via binary search.
+        ---
+        Parameters:
+            team: str, name of the team.
+            as_of: date, datetime or 'YYYY-MM-DD' string.
+            default: returned when the team has no games on or before as_of.
+        ---
+        Returns the rating as a float (or default).
+        """
+        if team not in self.series:
+            return default
+        dates, ratings = self.series[team]
+        i = np.searchsorted(dates, np.datetime64(as_of, 'D'), side='right') - 1
+        return float(ratings[i]) if i >= 0 else default
+
+
+    def ratings_on(self, as_of):
+        """
+        Every team's rating as of a date.
+        ---
+        Parameters:
+            as_of: date, datetime or 'YYYY-MM-DD' string.
+        ---
+        Returns a dict of team name -> rating, omitting teams with no games yet.
+        """
+        ratings = {}
+        for team in self.series:
+            rating = self.rating(team, as_of)
+            if rating is not None:
+                ratings[team] = rating
+        return ratings
+
+
+    def history(self, team, until=None):
+        """
+        A team's (dates, ratings) arrays, optionally truncated after a date.
+        """
+        dates, ratings = self.series.get(team, (np.array([], dtype='datetime64[D]'), np.array([])))
+        if until is not None:
+            end = np.searchsorted(dates, np.datetime64(until, 'D'), side='right')
+            dates, ratings = dates[:end], ratings[:end]
+        return dates, ratings
@@ -0,0 +1,297 @@
+import asyncio
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from tqdm import tqdm
+
+from .CrawlFrontier import CrawlFrontier
+from .NBAScraper import (BROWSER_HEADERS, DB_PATH, NBAScraper, find_playoff_window, init_db, insert_season,
+                         load_playoff_window, mark_playoffs, parse_schedule, replace_season, track_seasons)
+from .fetch import fetcher, robots
+
+
+def _timed_parse(html_content, start_playoff, end_playoff):
+    """Process-pool task: parse_schedule plus the time it took in the worker."""
+    t0 = time.perf_counter()
+    df = parse_schedule(html_content, start_playoff, end_playoff)
+    return df, time.perf_counter() - t0
+
+
+def _stored_games(conn, season):
+    """Dates and notes of a season's games already in the DB, shaped like parse_schedule output."""
+    return pd.read_sql_query("SELECT date AS Date, notes AS Notes FROM games WHERE season = ?",
+                             conn, params=(season,))
+
+
+class _StageStats:
+    """Item/row counters and busy time for one pipeline stage."""
+    def __init__(self):
+        self.items = 0
+        self.rows = 0
+        self.busy = 0.0
+        self.first = None
+        self.last = None
+
+    def record(self, started, finished, rows=0, busy=None):
+        self.items += 1
+        self.rows += rows
+        self.busy += finished - started if busy is None else busy
+        self.first = started if self.first is None else min(self.first, started)
+        self.last = finished if self.last is None else max(self.last, finished)
+
+    def summary(self):
+        active = (self.last - self.first) if self.items else 0.0
+        return {
+            'items': self.items,
+            'rows': self.rows,
+            'busy_s': round(self.busy, 3),
+            'active_s': round(active, 3),
+            'items_per_s': round(self.items / active, 2) if active else None,
+            'rows_per_s': round(self.rows / active, 1) if active else None,
+        }
+
+
+class ScrapePipeline:
+    def __init__(self, db_path=DB_PATH, force=False, concurrency=2, parse_workers=None, queue_size=8,
+                 retries=3, retry_backoff=5.0):
+        """
+        Three-stage season scraper: asyncio fetchers produce raw HTML, a process
+        pool parses pages into row batches, and a single writer thread inserts
+        finished seasons into SQLite in WAL mode. Stages are joined by bounded
+        queues, so parsing and writing overlap with basketball-reference
+        rate-limit waits while memory stays bounded.
+        Work is planned per month page from the crawl frontier (see
+        CrawlFrontier): pages already written are not fetched again, so an
+        interrupted backfill resumes where it stopped.
+        ---
+        Parameters:
+            db_path: path to the SQLite database.
+            force: if True, re-scrape and replace seasons already in the DB.
+            concurrency: seasons being fetched at once.
+            parse_workers: parser processes (default: CPU count, at most 4).
+            queue_size: capacity of each inter-stage queue, in pages.
+            retries: fetch attempts per page on network errors and 5xx responses.
+            retry_backoff: seconds before the second attempt, doubled for each further one.
+        """
+        self.db_path = db_path
+        self.force = force
+        self.concurrency = concurrency
+        self.parse_workers = parse_workers or min(os.cpu_count() or 1, 4)
+        self.queue_size = queue_size
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.stats = {stage: _StageStats() for stage in ('fetch', 'parse', 'write')}
+        self.seasons_added = 0
+        self.rows = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+
+
+    def run(self, years):
+        """
+        Scrapes the given season start years.
+        ---
+        Returns a dict of per-stage throughput (see report()).
+        """
+        t0 = time.perf_counter()
+        asyncio.run(self._run(list(years)))
+        return self.report(time.perf_counter() - t0)
+
+
+    def report(self, wall_s):
+        """Per-stage counters: items (pages or seasons), rows, busy/active seconds and rates, plus row changes."""
+        return {
+            'wall_s': round(wall_s, 3),
+            'seasons_added': self.seasons_added,
+            'rows': dict(self.rows),
+            **{stage: stats.summary() for stage, stats in self.stats.items()},
+        }
+
+
+    async def _run(self, years):
+        conn = init_db(self.db_path)
+        frontier = CrawlFrontier(conn)
+        track_seasons(frontier, years)
+        plan = {}
+        for year in years:
+            due = frontier.due(year, force=self.force)
+            if due:
+                plan[year] = due
+            elif frontier.gaps([year]):
+                tqdm.write(f"  Season {year}-{year + 1}: failed pages are waiting for their retry backoff")
+            else:
+                tqdm.write(f"  Season {year}-{year + 1} already in DB, skipping")
+        windows = {year: load_playoff_window(conn, year) for year in plan}
+        conn.close()
+
+        pages = asyncio.Queue(maxsize=self.queue_size)
+        rows = queue.Queue(maxsize=self.queue_size)
+        writer = threading.Thread(target=self._writer, args=(rows, plan, windows, len(years), len(years) - len(plan)),
+                                  name='sqlite-writer', daemon=True)
+        writer.start()
+        slots = asyncio.Semaphore(self.concurrency)
+
+        pool = ProcessPoolExecutor(max_workers=self.parse_workers,
+                                   mp_context=multiprocessing.get_context('spawn'))
+        try:
+            parsers = [asyncio.create_task(self._parser(pool, pages, rows))
+                       for _ in range(self.parse_workers)]
+            await asyncio.gather(*(self._fetch_season(year, due, windows[year], pages, rows, slots)
+                                   for year, due in plan.items()))
+            for _ in parsers:
+                await pages.put(None)
+            await asyncio.gather(*parsers)
+        finally:
+            pool.shutdown()
+            await asyncio.to_thread(rows.put, None)
+            await asyncio.to_thread(writer.join)
+
+
+    async def _fetch_page(self, url, max_age):
+        """
+        Fetches one page, retrying network errors and 5xx responses with
+        exponential backoff. Returns (response, error, attempts); error is
+        None for a 200 or a 404 (a month without games has no page).
+        """
+        for attempt in range(1, self.retries + 1):
+            started = time.perf_counter()
+            response, error = None, None
+            try:
+                response = await fetcher.fetch_async(url, headers=BROWSER_HEADERS, max_age=max_age)
+                if response.status_code not in (200, 404):
+                    error = f"HTTP {response.status_code}"
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            self.stats['fetch'].record(started, time.perf_counter())
+            retryable = error is not None and (response is None or response.status_code >= 500)
+            if not retryable or attempt == self.retries:
+                return response, error, attempt
+            await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+
+
+    async def _fetch_season(self, year, due, window, pages, rows, slots):
+        """
+        Stage 1: fetches a season's due month pages onto the parse queue, with
+        its stored playoff window. Fetch outcomes go straight to the writer,
+        which records them in the crawl frontier.
+        """
+        _, max_age = NBAScraper._season_pages(year + 1)
+
+        async def fetch(month, url):
+            return month, *await self._fetch_page(url, max_age)
+
+        async with slots:
+            # Check robots.txt before queuing; the first check per host also
+            # publishes its Crawl-delay to the rate limiter
+            allowed = await asyncio.to_thread(lambda: {month for month, url in due.items() if robots.allowed(url)})
+            for month in due.keys() - allowed:
+                await asyncio.to_thread(rows.put, ('failed', year, month, "disallowed by robots.txt", 0))
+            months = [asyncio.create_task(fetch(month, due[month])) for month in allowed]
+
+            # Hand pages to the parsers as they arrive
+            for next_done in asyncio.as_completed(months):
+                month, response, error, attempts = await next_done
+                if error is not None:
+                    await asyncio.to_thread(rows.put, ('failed', year, month, error, attempts))
+                    continue
+                await asyncio.to_thread(rows.put, ('fetched', year, month, None, attempts))
+                if response.status_code == 404:
+                    await asyncio.to_thread(rows.put, ('page', year, month, None, 0))
+                else:
+                    await pages.put((year, month, response.text, window))
+
+
+    async def _parser(self, pool, pages, rows):
+        """Stage 2: parses pages in the process pool and forwards row batches to the writer."""
+        loop = asyncio.get_running_loop()
+        while (item := await pages.get()) is not None:
+            year, month, html, window = item
+            start_playoff, end_playoff = window or (None, None)
+            started = time.perf_counter()
+            try:
+                df, seconds = await loop.run_in_executor(pool, _timed_parse, html, start_playoff, end_playoff)
+            except Exception as e:
+                tqdm.write(f"  Warning: failed to parse {year}-{year + 1} {month}: {e}")
+                await asyncio.to_thread(rows.put, ('failed', year, month, f"parse error: {e}", 0))
+                continue
+            # Busy time is measured in the worker, excluding queueing and transfer
+            self.stats['parse'].record(started, time.perf_counter(), len(df), busy=seconds)
+            await asyncio.to_thread(rows.put, ('page', year, month, df, 0))
+
+
+    def _writer(self, rows, plan, windows, total, skipped):
+        """
+        Stage 3: the only thread touching the DB. Records every page outcome in
+        the crawl frontier and inserts each season's new pages once all its due
+        pages are in; they are marked written in the same transaction. Seasons
+        without a stored playoff window get one here, from their own pages or
+        (rarely, blocking the writer) from Wikipedia.
+        """
+        conn = init_db(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        frontier = CrawlFrontier(conn)
+        parsed, failed = {}, {}
+        with tqdm(total=total, initial=skipped, desc='Scraping seasons') as pbar:
+            while (item := rows.get()) is not None:
+                kind, year, month, payload, attempts = item
+                if kind == 'fetched':
+                    frontier.mark(year, month, 'fetched', attempts=attempts)
+                    continue
+                if kind == 'failed':
+                    frontier.mark(year, month, 'failed', payload, attempts=attempts)
+                    tqdm.write(f"  Warning: failed to scrape {year}-{year + 1} {month}: {payload}")
+                    failed.setdefault(year, []).append(month)
+                else:
+                    frontier.mark(year, month, 'parsed')
+                    parsed.setdefault(year, {})[month] = payload
+                if len(parsed.get(year, {})) + len(failed.get(year, [])) < len(plan[year]):
+                    continue
+
+                self._write_season(conn, frontier, year, parsed.pop(year, {}), not failed.pop(year, None),
+                                   windows[year])
+                pbar.update(1)
+        conn.close()
+
+
+    def _write_season(self, conn, frontier, year, pages, all_fetched, window):
+        """Upserts a season's parsed pages and marks them written; with force, stale games are pruned."""
+        frames = [df for df in pages.values() if df is not None and not df.empty]
+        season_df = (pd.concat(frames, ignore_index=True).sort_values('Date', kind='stable', ignore_index=True)
+                     if frames else pd.DataFrame())
+        start_playoff, end_playoff = window or (None, None)
+        if window is None:
+            # Pages written by earlier runs take part in deriving the window;
+            # it is only stored once the whole season is in
+            states = frontier.states(year)
+            complete = all_fetched and all(state == 'written' for month, state in states.items() if month not in pages)
+            games = season_df if self.force else pd.concat([_stored_games(conn, year), season_df], ignore_index=True)
+            try:
+                start_playoff, end_playoff = find_playoff_window(conn, year, games, save=complete)
+            except Exception as e:
+                tqdm.write(f"  Warning: no playoff dates for {year}-{year + 1}: {e}")
+            mark_playoffs(season_df, start_playoff, end_playoff)
+
+        started = time.perf_counter()
+        try:
+            for month, df in pages.items():
+                frontier.mark(year, month, 'written', None if df is not None else "HTTP 404: no page", commit=False)
+            if season_df.empty:
+                conn.commit()
+            else:
+                # Pruning needs the whole season; with failed months it would drop their games
+                if self.force and all_fetched:
+                    counts = replace_season(conn, year, season_df)
+                else:
+                    counts = insert_season(conn, year, season_df)
+                for key, count in counts.items():
+                    self.rows[key] += count
+                self.seasons_added += 1
+                self.stats['write'].record(started, time.perf_counter(), counts['inserted'] + counts['updated'])
+        except Exception as e:
+            conn.rollback()
+            tqdm.write(f"Warning: failed to save {year}-{year + 1}: {e}")
+        NBAScraper._log_season(year + 1, season_df, start_playoff, end_playoff)
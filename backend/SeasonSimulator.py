@@ -0,0 +1,241 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .NBARater import NBARater, HOME_ADVANTAGE, K_REGULAR, K_PLAYOFF
+
+PLAYOFF_ROUNDS = ['playoffs', 'second_round', 'conf_finals', 'finals', 'champion']
+
+
+class SeasonSimulator:
+    def __init__(self, ratings, win_streaks, records, schedule, conferences, streak_base=1.1):
+        """
+        Initializes a Monte Carlo simulator for the rest of a season.
+        Simulations are vectorized: every quantity is an array over the N simulated
+        seasons, and only the (inherently sequential) walk over games is a Python loop.
+        ---
+        Parameters:
+            ratings: dict of team name -> current Elo rating.
+            win_streaks: dict of team name -> current win streak.
+            records: dict of team name -> (wins, losses) so far this season.
+            schedule: pandas DataFrame of remaining games with columns visitor, home
+                (current team names), in date order.
+            conferences: dict of conference name -> list of 15 team names.
+            streak_base: base of the win-streak bonus (see NBARater.win_streak_bonus).
+        """
+        self.teams = [team for members in conferences.values() for team in members]
+        self.conferences = {
+            conf: np.array([self.teams.index(team) for team in members])
+            for conf, members in conferences.items()
+        }
+        team_index = {team: i for i, team in enumerate(self.teams)}
+        self.ratings = np.array([ratings.get(team, 1200.0) for team in self.teams], dtype=np.float64)
+        self.win_streaks = np.array([win_streaks.get(team, 0) for team in self.teams], dtype=np.int32)
+        self.wins = np.array([records.get(team, (0, 0))[0] for team in self.teams], dtype=np.int32)
+        self.losses = np.array([records.get(team, (0, 0))[1] for team in self.teams], dtype=np.int32)
+        known = schedule['visitor'].isin(team_index) & schedule['home'].isin(team_index)
+        self.visitor_ids = schedule.loc[known, 'visitor'].map(team_index).to_numpy(dtype=np.int64)
+        self.home_ids = schedule.loc[known, 'home'].map(team_index).to_numpy(dtype=np.int64)
+        self.streak_base = streak_base
+
+
+    def _play(self, state, visitor, home, k, rng, active=None):
+        """
+        Plays one game in every simulation with in-simulation Elo and streak updates.
+        ---
+        Parameters:
+            state: dict of (teams, N) rating/streak matrices, updated in place.
+            visitor, home: int array of shape (N,) (or scalars) of team IDs.
+            k: Elo K factor.
+            rng: numpy Generator.
+            active: optional bool array; simulations where it is False are untouched.
+        ---
+        Returns a bool array of shape (N,), True where the visitor won.
+        """
+        ratings, streaks = state['ratings'], state['streaks']
+        sims = np.arange(ratings.shape[1])
+        if active is not None:
+            sims = sims[active]
+            visitor = visitor[active] if np.ndim(visitor) else visitor
+            home = home[active] if np.ndim(home) else home
+
+        old_visitor = ratings[visitor, sims]
+        old_home = ratings[home, sims]
+        visitor_expected = NBARater.expectedResults(old_visitor, old_home)
+        visitor_won = rng.random(len(sims)) < visitor_expected
+
+        visitor_streak = np.where(visitor_won, streaks[visitor, sims] + 1, 0)
+        home_streak = np.where(visitor_won, 0, streaks[home, sims] + 1)
+        bonus = self._streak_bonus(visitor_streak + home_streak)
+
+        change = k * (visitor_won - visitor_expected) + np.where(visitor_won, bonus, -bonus)
+        ratings[visitor, sims] = np.maximum(old_visitor + change, 0)
+        ratings[home, sims] = np.maximum(old_home - change, 0)
+        streaks[visitor, sims] = visitor_streak
+        streaks[home, sims] = home_streak
+
+        if active is None:
+            return visitor_won
+        out = np.zeros(len(active), dtype=bool)
+        out[active] = visitor_won
+        return out
+
+
+    def _streak_bonus(self, win_streak):
+        """Vectorized NBARater.win_streak_bonus: zero below a streak of 3."""
+        return np.where(win_streak >= 3, self.streak_base ** (win_streak - 2.0) - 1, 0.0)
+
+
+    def _series(self, state, high, low, rng, best_of=7):
+        """
+        Plays a best-of-7 series in every simulation; `high` holds home court
+        (games 1, 2, 5 and 7). Returns the winner's team ID per simulation.
+        """
+        needed = best_of // 2 + 1
+        high_wins = np.zeros(len(high), dtype=np.int64)
+        low_wins = np.zeros(len(high), dtype=np.int64)
+        for game in range(best_of):
+            active = (high_wins < needed) & (low_wins < needed)
+            if not active.any():
+                break
+            if game in (0, 1, 4, 6):
+                visitor_won = self._play(state, low, high, K_PLAYOFF, rng, active)
+                high_won = ~visitor_won
+            else:
+                visitor_won = self._play(state, high, low, K_PLAYOFF, rng, active)
+                high_won = visitor_won
+            high_wins += active & high_won
+            low_wins += active & ~high_won
+        return np.where(high_wins >= needed, high, low)
+
+
+    def simulate(self, n_sims, seed=None):
+        """
+        Plays out the remaining regular season, the play-in and the playoff bracket.
+        ---
+        Parameters:
+            n_sims: number of simulated seasons.
+            seed: optional seed or numpy SeedSequence.
+        ---
+        Returns a dict of per-team count arrays (indexed like self.teams): wins
+        (summed over simulations), seeds (teams x 15 seed histogram), play_in,
+        and one entry per PLAYOFF_ROUNDS stage; plus n_sims.
+        """
+        rng = np.random.default_rng(seed)
+        n_teams = len(self.teams)
+        state = {
+            'ratings': np.repeat(self.ratings[:, None], n_sims, axis=1),
+            'streaks': np.repeat(self.win_streaks[:, None], n_sims, axis=1),
+        }
+        wins = np.repeat(self.wins[:, None], n_sims, axis=1)
+        sims = np.arange(n_sims)
+
+        # Regular season: one vectorized step per remaining game. Each team's
+        # ratings/streaks/wins are contiguous rows, so a game is a handful of
+        # in-place ufuncs over the N simulations
+        ratings, streaks = state['ratings'], state['streaks']
+        max_streak = int(self.win_streaks.max(initial=0)) + len(self.visitor_ids) + 1
+        streak_bonus = self._streak_bonus(np.arange(max_streak))
+        visitor_expected = np.empty(n_sims)
+        change = np.empty(n_sims)
+        for visitor, home in zip(self.visitor_ids.tolist(), self.home_ids.tolist()):
+            old_visitor, old_home = ratings[visitor], ratings[home]
+            # NBARater.expectedResult rearranged to 1 / (1 + 10 ** ((home + HCA - visitor) / 400))
+            np.subtract(old_home, old_visitor, out=visitor_expected)
+            visitor_expected += HOME_ADVANTAGE
+            visitor_expected *= np.log(10) / 400
+            np.exp(visitor_expected, out=visitor_expected)
+            visitor_expected += 1
+            np.reciprocal(visitor_expected, out=visitor_expected)
+            visitor_won = rng.random(n_sims) < visitor_expected
+
+            visitor_streak, home_streak = streaks[visitor], streaks[home]
+            visitor_streak += 1
+            visitor_streak *= visitor_won
+            home_streak += 1
+            home_streak *= ~visitor_won
+            bonus = streak_bonus[visitor_streak + home_streak]
+
+            np.subtract(visitor_won, visitor_expected, out=change)
+            change *= K_REGULAR
+            change += np.where(visitor_won, bonus, -bonus)
+            old_visitor += change
+            old_home -= change
+            np.maximum(old_visitor, 0, out=old_visitor)
+            np.maximum(old_home, 0, out=old_home)
+            wins[visitor] += visitor_won
+            wins[home] += ~visitor_won
+
+        # Random fractional tiebreak so equal records are ordered uniformly at random
+        standing = wins + rng.random(wins.shape)
+
+        counts = {
+            'wins': wins.sum(axis=1),
+            'seeds': np.zeros((n_teams, 15), dtype=np.int64),
+            'play_in': np.zeros(n_teams, dtype=np.int64),
+            **{stage: np.zeros(n_teams, dtype=np.int64) for stage in PLAYOFF_ROUNDS},
+            'n_sims': n_sims,
+        }
+
+        def tally(stage, team_ids):
+            np.add.at(counts[stage], team_ids.ravel(), 1)
+
+        def series(a, b):
+            # Home court goes to the better regular-season record
+            a_home = standing[a, sims] > standing[b, sims]
+            return self._series(state, np.where(a_home, a, b), np.where(a_home, b, a), rng)
+
+        champions = []
+        for members in self.conferences.values():
+            # seeded[s] = team ID holding seed s + 1 in each simulation
+            order = np.argsort(-standing[members], axis=0)
+            seeded = members[order]
+            for s in range(len(members)):
+                np.add.at(counts['seeds'][:, s], seeded[s], 1)
+            tally('play_in', seeded[6:10])
+
+            # Play-in: 7 hosts 8 for the 7th seed; 9 hosts 10; the 7/8 loser hosts
+            # the 9/10 winner for the 8th seed
+            won_78 = self._play(state, seeded[7], seeded[6], K_REGULAR, rng)
+            seed7 = np.where(won_78, seeded[7], seeded[6])
+            loser_78 = np.where(won_78, seeded[6], seeded[7])
+            won_910 = self._play(state, seeded[9], seeded[8], K_REGULAR, rng)
+            winner_910 = np.where(won_910, seeded[9], seeded[8])
+            seed8 = np.where(self._play(state, winner_910, loser_78, K_REGULAR, rng), winner_910, loser_78)
+
+            bracket = [seeded[0], seed8, seeded[3], seeded[4], seeded[2], seeded[5], seeded[1], seed7]
+            tally('playoffs', np.stack(bracket))
+            for stage in PLAYOFF_ROUNDS[1:-1]:
+                bracket = [series(bracket[i], bracket[i + 1]) for i in range(0, len(bracket), 2)]
+                tally(stage, np.stack(bracket))
+            champions.append(bracket[0])
+
+        tally('champion', series(*champions))
+        return counts
+
+
+    def run(self, n_sims, workers=1, seed=None, pool=None):
+        """
+        Runs simulate() split across a process pool and merges the counts.
+        ---
+        Parameters:
+            n_sims: total number of simulated seasons.
+            workers: number of processes (None = all cores, 1 = in-process).
+            seed: optional seed; each worker gets an independent child stream.
+            pool: optional executor to run the parts on (e.g. one kept across
+                calls); by default a process pool is started for this run.
+        ---
+        Returns the merged counts dict (see simulate()).
+        """
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1:
+            return self.simulate(n_sims, seed)
+        sizes = [size for size in np.array_split(np.arange(n_sims), workers) if len(size)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        if pool is not None:
+            parts = list(pool.map(self.simulate, [len(size) for size in sizes], seeds))
+        else:
+            with ProcessPoolExecutor(max_workers=len(sizes)) as pool:
+                parts = list(pool.map(self.simulate, [len(size) for size in sizes], seeds))
+        return {key: sum(part[key] for part in parts) for key in parts[0]}
@@ -4,7 +4,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .database import init_db
-from .routers import elo, standings, matchup, games, upcoming, refresh, meta
+from .routers import elo, standings, matchup, games, upcoming, refresh, meta, odds, probabilities
 from .routers.upcoming import refresh_upcoming_db, _is_stale
 
 
@@ -18,6 +18,7 @@ async def lifespan(app: FastAPI):
     await init_db()
     asyncio.create_task(_startup_refresh())  # fire-and-forget, non-blocking
     yield
+    odds.shutdown_pool()
 
 
 app = FastAPI(title="NBA ELO API", lifespan=lifespan)
@@ -37,3 +38,5 @@ app.include_router(games.router,      prefix="/api")
 app.include_router(upcoming.router,   prefix="/api")
 app.include_router(refresh.router,    prefix="/api")
 app.include_router(meta.router,       prefix="/api")
+app.include_router(odds.router,       prefix="/api")
+app.include_router(probabilities.router, prefix="/api")
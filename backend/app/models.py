@@ -46,3 +46,11 @@ class UpcomingGameDB(Base):
     r_v        = Column(Float, nullable=False)
     r_h        = Column(Float, nullable=False)
     scraped_at = Column(DateTime(timezone=True), nullable=False)  # UTC
+
+
+class RatingsVersion(Base):
+    __tablename__ = "ratings_version"
+
+    id         = Column(Integer, primary_key=True)    # a single row, id 1
+    version    = Column(String, nullable=False)       # fresh token on every migration
+    updated_at = Column(DateTime(timezone=True), nullable=False)  # UTC
@@ -0,0 +1,72 @@
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .team_meta import TEAM_META
+from backend.NBARater import NBARater
+from backend.RatingIndex import RatingIndex
+
+# Latest ratings and everything derived from them, rebuilt once per ratings version
+_snapshot: dict = {}
+# Full as-of index, loaded lazily (it scans all of elo_history) once per ratings version
+_index: dict = {}
+
+
+async def ratings_version(db: AsyncSession) -> tuple:
+    """Cheap fingerprint of elo_history: the token every migration writes to ratings_version.
+
+    MAX(id) and MAX(date) are kept for databases last migrated before the
+    version row existed; alone they can repeat after a rebuild or a rewrite of
+    old games, so they never serve as the key on their own.
+    """
+    result = await db.execute(text(
+        "SELECT (SELECT version FROM ratings_version WHERE id = 1), MAX(id), MAX(date) FROM elo_history"
+    ))
+    return tuple(result.one())
+
+
+async def latest_ratings(db: AsyncSession) -> dict[str, float]:
+    """Latest ELO per team via PostgreSQL DISTINCT ON."""
+    result = await db.execute(
+        text("""
+            SELECT DISTINCT ON (team) team, elo
+            FROM elo_history
+            ORDER BY team, date DESC
+        """)
+    )
+    return {row.team: row.elo for row in result}
+
+
+async def current_snapshot(db: AsyncSession) -> dict:
+    """Latest ratings plus the pairwise win-probability matrix, cached per ratings version.
+
+    Keys: version, ratings (team -> elo), teams (sorted current franchises),
+    positions (team -> row/column) and prob_visitor, where prob_visitor[i, j] is the
+    probability that teams[i] wins at teams[j].
+    """
+    version = await ratings_version(db)
+    if _snapshot.get("version") != version:
+        ratings = await latest_ratings(db)
+        teams = sorted(team for team in ratings if team in TEAM_META)
+        elos = np.array([ratings[team] for team in teams], dtype=np.float64)
+        _snapshot.clear()
+        _snapshot.update(
+            version=version,
+            ratings=ratings,
+            teams=teams,
+            positions={team: i for i, team in enumerate(teams)},
+            prob_visitor=NBARater.expectedResults(elos[:, None], elos[None, :]),
+        )
+    return _snapshot
+
+
+async def rating_index(db: AsyncSession) -> RatingIndex:
+    """As-of RatingIndex over all of elo_history, cached per ratings version."""
+    version = await ratings_version(db)
+    if _index.get("version") != version:
+        result = await db.execute(text("SELECT team, date, elo FROM elo_history ORDER BY id"))
+        rows = result.all()
+        teams, dates, elos = zip(*rows) if rows else ((), (), ())
+        _index.clear()
+        _index.update(version=version, index=RatingIndex.from_rows(teams, dates, elos))
+    return _index["index"]
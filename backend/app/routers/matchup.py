@@ -1,9 +1,13 @@
+from datetime import date
+from typing import Optional
+
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_, and_, text
+from sqlalchemy import select, or_, and_
 
 from ..database import get_db
 from ..models import Game, EloHistory
+from ..ratings import current_snapshot, rating_index
 from ..schemas import MatchupResponse, GameRow, EloDataPoint
 from ..team_meta import TEAM_META, logo_url, team_primary
 from backend.NBARater import NBARater
@@ -37,6 +41,7 @@ async def get_matchup(
     visitor: str = Query(...),
     home: str = Query(...),
     h2h_filter: int = Query(10),
+    as_of: Optional[date] = Query(None),
     db: AsyncSession = Depends(get_db),
 ):
     if visitor == home:
@@ -44,23 +49,25 @@ async def get_matchup(
     if visitor not in TEAM_META or home not in TEAM_META:
         raise HTTPException(status_code=404, detail="Unknown team name.")
 
-    # Current ELO for both teams
-    elo_result = await db.execute(
-        text("""
-            SELECT DISTINCT ON (team) team, elo
-            FROM elo_history
-            WHERE team IN (:v, :h)
-            ORDER BY team, date DESC
-        """),
-        {"v": visitor, "h": home},
-    )
-    elos = {row.team: row.elo for row in elo_result}
-    r_v = elos.get(visitor, 1200.0)
-    r_h = elos.get(home, 1200.0)
-    prob_v = NBARater.expectedResult(r_v, r_h)
+    if as_of is None:
+        # Current ELO for both teams, from the per-version ratings snapshot
+        snapshot = await current_snapshot(db)
+        r_v = snapshot["ratings"].get(visitor, 1200.0)
+        r_h = snapshot["ratings"].get(home, 1200.0)
+        positions = snapshot["positions"]
+        if visitor in positions and home in positions:
+            prob_v = float(snapshot["prob_visitor"][positions[visitor], positions[home]])
+        else:
+            prob_v = NBARater.expectedResult(r_v, r_h)
+    else:
+        # Time travel: ratings after every game on or before as_of
+        index = await rating_index(db)
+        r_v = index.rating(visitor, as_of, default=1200.0)
+        r_h = index.rating(home, as_of, default=1200.0)
+        prob_v = NBARater.expectedResult(r_v, r_h)
 
-    # H2H game log (all time, ascending)
-    h2h_result = await db.execute(
+    # H2H game log (all time, or up to as_of; ascending)
+    h2h_query = (
         select(Game)
         .where(
             or_(
@@ -70,6 +77,9 @@ async def get_matchup(
         )
         .order_by(Game.date)
     )
+    if as_of is not None:
+        h2h_query = h2h_query.where(Game.date <= as_of.isoformat())
+    h2h_result = await db.execute(h2h_query)
     seen: set[tuple] = set()
     h2h_all = []
     for g in h2h_result.scalars().all():
@@ -93,14 +103,20 @@ async def get_matchup(
     b_wins = len(h2h) - a_wins
 
     # Full ELO history for chart
-    elo_hist_result = await db.execute(
-        select(EloHistory)
-        .where(EloHistory.team.in_([visitor, home]))
-        .order_by(EloHistory.team, EloHistory.date)
-    )
-    elo_hist_rows = elo_hist_result.scalars().all()
-    elo_v = [EloDataPoint(date=r.date, elo=r.elo) for r in elo_hist_rows if r.team == visitor]
-    elo_h = [EloDataPoint(date=r.date, elo=r.elo) for r in elo_hist_rows if r.team == home]
+    if as_of is None:
+        elo_hist_result = await db.execute(
+            select(EloHistory)
+            .where(EloHistory.team.in_([visitor, home]))
+            .order_by(EloHistory.team, EloHistory.date)
+        )
+        elo_hist_rows = elo_hist_result.scalars().all()
+        elo_v = [EloDataPoint(date=r.date, elo=r.elo) for r in elo_hist_rows if r.team == visitor]
+        elo_h = [EloDataPoint(date=r.date, elo=r.elo) for r in elo_hist_rows if r.team == home]
+    else:
+        elo_v, elo_h = (
+            [EloDataPoint(date=str(d), elo=float(e)) for d, e in zip(*index.history(team, until=as_of))]
+            for team in (visitor, home)
+        )
 
     return MatchupResponse(
         visitor=visitor,
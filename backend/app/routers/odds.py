@@ -0,0 +1,158 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timezone
+
+import pandas as pd
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_db
+from ..models import Game
+from ..ratings import current_snapshot
+from ..schemas import OddsResponse, TeamOdds
+from ..team_meta import CONFERENCES, logo_url, get_current_season
+from backend.NBAScraper import NBAScraper, ScheduleUnavailable
+from backend.SeasonSimulator import SeasonSimulator, PLAYOFF_ROUNDS
+from backend.teams import normalize
+
+router = APIRouter()
+
+# (ratings version, day, sims) -> OddsResponse; the remaining schedule only changes daily
+_cache: dict[tuple, OddsResponse] = {}
+_schedule_cache: dict[date, pd.DataFrame] = {}
+_lock = asyncio.Lock()  # one simulation at a time
+_schedule_lock = asyncio.Lock()
+SCHEDULE_RETRY_AFTER = 60  # seconds clients are asked to wait after a failed schedule scrape
+SIM_SIZES = (1000, 10000, 50000, 200000)  # sims requested are rounded up to one of these
+SIM_WORKERS = min(os.cpu_count() or 1, 4)
+_pool: ProcessPoolExecutor | None = None
+
+
+def _simulation_pool() -> ProcessPoolExecutor:
+    """Process pool shared by every simulation, started on first use."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=SIM_WORKERS)
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+async def _remaining_schedule(db: AsyncSession, season: int) -> pd.DataFrame:
+    """Unplayed regular-season games of `season`; empty once its playoffs have begun.
+
+    Raises a 503 when some month page could not be fetched: simulating the
+    rest of the schedule would understate every team's games left, so nothing
+    is cached and the next request tries again.
+    """
+    today = date.today()
+    if today not in _schedule_cache:
+        # One scrape per day; concurrent cold requests wait for it rather than repeat it
+        async with _schedule_lock:
+            if today not in _schedule_cache:
+                loop = asyncio.get_event_loop()
+                try:
+                    df = await loop.run_in_executor(
+                        None, lambda: NBAScraper().scrape_upcoming(days=366, season=season))
+                except ScheduleUnavailable as e:
+                    raise HTTPException(status_code=503, detail=f"Remaining schedule unavailable: {e}",
+                                        headers={"Retry-After": str(SCHEDULE_RETRY_AFTER)})
+                df["visitor"] = normalize(df["visitor"]).astype(object)
+                df["home"] = normalize(df["home"]).astype(object)
+                _schedule_cache.clear()
+                _schedule_cache[today] = df
+    df = _schedule_cache[today]
+    # Playoff games already played bound the regular season even when the
+    # page with the "Playoffs" separator is behind today
+    playoff_start = await db.scalar(
+        select(func.min(Game.date)).where(Game.season == season, Game.notes == "Playoffs")
+    )
+    return df[df["date"] < playoff_start].reset_index(drop=True) if playoff_start else df
+
+
+async def _season_state(db: AsyncSession, season: int):
+    """Regular-season W/L for `season` and current win streaks (rater semantics)."""
+    result = await db.execute(
+        select(Game.season, Game.visitor, Game.home, Game.result, Game.notes)
+        .where(Game.season >= season - 1, Game.result.isnot(None))
+        .order_by(Game.date)
+    )
+    records: dict[str, list[int]] = {}
+    streaks: dict[str, int] = {}
+    for g in result:
+        winner, loser = (g.visitor, g.home) if g.result == "visitor" else (g.home, g.visitor)
+        streaks[winner] = streaks.get(winner, 0) + 1
+        streaks[loser] = 0
+        if g.season == season and g.notes != "Playoffs":
+            records.setdefault(winner, [0, 0])[0] += 1
+            records.setdefault(loser, [0, 0])[1] += 1
+    return {team: tuple(wl) for team, wl in records.items()}, streaks
+
+
+@router.get("/odds", response_model=OddsResponse)
+async def get_odds(
+    sims: int = Query(50000, ge=100, le=200000),
+    db: AsyncSession = Depends(get_db),
+):
+    # Requests are served from a few fixed run sizes, so arbitrary sims values
+    # share cached results instead of each starting a run
+    sims = next(size for size in SIM_SIZES if size >= sims)
+    snapshot = await current_snapshot(db)
+    key = (snapshot["version"], date.today(), sims)
+    if key in _cache:
+        return _cache[key]
+
+    season = get_current_season()
+    ratings = snapshot["ratings"]
+    records, streaks = await _season_state(db, season)
+    schedule = await _remaining_schedule(db, season)
+
+    async with _lock:
+        # Another request may have run the same simulation while this one waited
+        if key in _cache:
+            return _cache[key]
+
+        simulator = SeasonSimulator(ratings, streaks, records, schedule, CONFERENCES)
+        loop = asyncio.get_event_loop()
+        counts = await loop.run_in_executor(
+            None, lambda: simulator.run(sims, workers=SIM_WORKERS, pool=_simulation_pool()))
+
+        conference_of = {team: conf for conf, members in CONFERENCES.items() for team in members}
+        teams = []
+        for i, team in enumerate(simulator.teams):
+            projected_wins = counts["wins"][i] / sims
+            games_left = int((simulator.visitor_ids == i).sum() + (simulator.home_ids == i).sum())
+            teams.append(TeamOdds(
+                team=team,
+                conference=conference_of[team],
+                logo_url=logo_url(team),
+                elo=round(float(simulator.ratings[i]), 1),
+                wins=int(simulator.wins[i]),
+                losses=int(simulator.losses[i]),
+                projected_wins=round(float(projected_wins), 1),
+                projected_losses=round(float(simulator.wins[i] + simulator.losses[i] + games_left - projected_wins), 1),
+                seed_probs=[float(c) / sims for c in counts["seeds"][i]],
+                play_in=float(counts["play_in"][i]) / sims,
+                **{stage: float(counts[stage][i]) / sims for stage in PLAYOFF_ROUNDS},
+            ))
+        teams.sort(key=lambda t: (t.conference, -t.champion, -t.projected_wins))
+
+        response = OddsResponse(
+            season=season,
+            sims=sims,
+            games_remaining=len(simulator.visitor_ids),
+            generated_at=datetime.now(timezone.utc).isoformat(),
+            teams=teams,
+        )
+        # Results for older ratings versions or days are never served again
+        for stale in [k for k in _cache if k[:2] != key[:2]]:
+            del _cache[stale]
+        _cache[key] = response
+        return response
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_db
+from ..ratings import current_snapshot
+from ..schemas import ProbabilityMatrix
+
+router = APIRouter()
+
+# Serialized response for the snapshot version it was built from
+_response: dict = {}
+
+
+@router.get("/probabilities", response_model=ProbabilityMatrix)
+async def get_probabilities(db: AsyncSession = Depends(get_db)):
+    snapshot = await current_snapshot(db)
+    if _response.get("version") != snapshot["version"]:
+        matrix = snapshot["prob_visitor"].tolist()
+        for i in range(len(matrix)):
+            matrix[i][i] = None
+        _response.clear()
+        _response.update(
+            version=snapshot["version"],
+            body=ProbabilityMatrix(
+                teams=snapshot["teams"],
+                ratings=[snapshot["ratings"][team] for team in snapshot["teams"]],
+                prob_visitor=matrix,
+            ),
+        )
+    return _response["body"]
@@ -9,23 +9,24 @@ _refresh_running = False
 async def _run_refresh():
     global _refresh_running
     _refresh_running = True
+    upcoming = None
     try:
         from backend.NBAScraper import NBAScraper
-        from backend.migrate import migrate_season
+        from backend.migrate import migrate_incremental
 
         today = date.today()
         season = today.year if today.month >= 10 else today.year - 1
 
+        # One pass over the season's pages yields both the completed games and
+        # the upcoming ones, so refresh_upcoming_db needs no second download
         loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            None,
-            lambda: NBAScraper().data_years(beginning=season, end=season, force=True),
-        )
-        await migrate_season(season)
+        upcoming = await loop.run_in_executor(None, lambda: NBAScraper().refresh_season(season))
+        # Only games changed by the refresh (usually last night's) are replayed and rewritten
+        await migrate_incremental()
     finally:
         _refresh_running = False
         from backend.app.routers.upcoming import refresh_upcoming_db
-        await refresh_upcoming_db()
+        await refresh_upcoming_db(upcoming)
 
 
 @router.post("/refresh")
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, text
+from sqlalchemy import select
 
 from ..database import get_db
 from ..models import Game
+from ..ratings import current_snapshot, rating_index
 from ..schemas import StandingRow
 from ..team_meta import TEAM_META, logo_url, get_current_season
 
@@ -11,18 +15,17 @@ router = APIRouter()
 
 
 @router.get("/standings", response_model=list[StandingRow])
-async def get_standings(db: AsyncSession = Depends(get_db)):
-    current_season = get_current_season()
-
-    # Latest ELO per team via PostgreSQL DISTINCT ON
-    elo_result = await db.execute(
-        text("""
-            SELECT DISTINCT ON (team) team, elo
-            FROM elo_history
-            ORDER BY team, date DESC
-        """)
-    )
-    current_elos: dict[str, float] = {row.team: row.elo for row in elo_result}
+async def get_standings(
+    as_of: Optional[date] = Query(None),
+    db: AsyncSession = Depends(get_db),
+):
+    if as_of is None:
+        current_season = get_current_season()
+        current_elos = (await current_snapshot(db))["ratings"]
+    else:
+        # Time travel: ratings after every game on or before as_of
+        current_season = as_of.year if as_of.month >= 10 else as_of.year - 1
+        current_elos = (await rating_index(db)).ratings_on(as_of)
 
     # Season-start ELO: elo_before on each team's first game this season
     games_result = await db.execute(
@@ -1,5 +1,6 @@
 import asyncio
 from datetime import datetime, timezone, date as date_type
+import pandas as pd
 from fastapi import APIRouter
 from sqlalchemy import text, delete
 
@@ -9,6 +10,7 @@ from ..schemas import UpcomingGame
 from ..team_meta import logo_url
 from backend.NBARater import NBARater
 from backend.NBAScraper import NBAScraper
+from backend.teams import normalize
 
 router = APIRouter()
 
@@ -25,10 +27,6 @@ async def _get_current_elos() -> dict[str, float]:
         return {row.team: row.elo for row in result}
 
 
-def _map(name: str) -> str:
-    return NBARater.map_team_names(name)
-
-
 async def _is_stale() -> bool:
     today = date_type.today().isoformat()
     async with AsyncSessionLocal() as session:
@@ -77,31 +75,32 @@ async def _read_from_db() -> list[UpcomingGame]:
     ]
 
 
-async def refresh_upcoming_db() -> list[UpcomingGame]:
-    loop = asyncio.get_event_loop()
-    scraper = NBAScraper()
-    df = await loop.run_in_executor(None, lambda: scraper.scrape_upcoming(days=7))
+async def refresh_upcoming_db(df: pd.DataFrame | None = None) -> list[UpcomingGame]:
+    """Rebuilds upcoming_games from `df` (date, visitor, home), scraping it when not given."""
+    if df is None:
+        loop = asyncio.get_event_loop()
+        scraper = NBAScraper()
+        df = await loop.run_in_executor(None, lambda: scraper.scrape_upcoming(days=7))
 
     current_elos = await _get_current_elos()
 
-    def get_elo(raw_name: str) -> float:
-        return current_elos.get(_map(raw_name), 1200.0)
+    # Normalize whole name columns at once (one lookup per distinct name)
+    v_names = normalize(df["visitor"]).astype(object).tolist()
+    h_names = normalize(df["home"]).astype(object).tolist()
 
     now = datetime.now(timezone.utc)
     games: list[UpcomingGame] = []
     db_rows: list[UpcomingGameDB] = []
 
-    for _, row in df.iterrows():
-        v_name = _map(row["visitor"])
-        h_name = _map(row["home"])
-        r_v = get_elo(row["visitor"])
-        r_h = get_elo(row["home"])
+    for row, v_name, h_name in zip(df.itertuples(index=False), v_names, h_names):
+        r_v = current_elos.get(v_name, 1200.0)
+        r_h = current_elos.get(h_name, 1200.0)
         prob_v = NBARater.expectedResult(r_v, r_h)
 
         game = UpcomingGame(
-            date=row["date"],
-            visitor=row["visitor"],
-            home=row["home"],
+            date=row.date,
+            visitor=row.visitor,
+            home=row.home,
             v_logo=logo_url(v_name),
             h_logo=logo_url(h_name),
             prob_v=prob_v,
@@ -91,3 +91,35 @@ class TeamMeta(BaseModel):
 class EraInfo(BaseModel):
     id: str
     label: str
+
+
+class TeamOdds(BaseModel):
+    team: str
+    conference: str
+    logo_url: str
+    elo: float
+    wins: int
+    losses: int
+    projected_wins: float
+    projected_losses: float
+    seed_probs: list[float]     # index 0 → 1st seed
+    play_in: float              # finished 7th–10th
+    playoffs: float             # reached the first round (top 6 or via play-in)
+    second_round: float
+    conf_finals: float
+    finals: float
+    champion: float
+
+
+class OddsResponse(BaseModel):
+    season: int
+    sims: int
+    games_remaining: int
+    generated_at: str
+    teams: list[TeamOdds]
+
+
+class ProbabilityMatrix(BaseModel):
+    teams: list[str]
+    ratings: list[float]
+    prob_visitor: list[list[Optional[float]]]   # [visitor][home]; home gets 1 - p
@@ -1,36 +1,44 @@
 from datetime import date
 
+from backend.teams import FRANCHISES, CONFERENCES
+
+# (abbrev, primary, secondary) per franchise, in backend.teams.FRANCHISES order
+_TEAM_STYLE = [
+    ("atl",  "#E03A3E", "#C1D32F"),
+    ("bos",  "#007A33", "#BA9653"),
+    ("bkn",  "#000000", "#AAAAAA"),
+    ("cha",  "#00788C", "#1D1160"),
+    ("chi",  "#CE1141", "#000000"),
+    ("cle",  "#860038", "#FDBB30"),
+    ("dal",  "#00538C", "#002F5F"),
+    ("den",  "#0E2240", "#FEC524"),
+    ("det",  "#C8102E", "#006BB6"),
+    ("gsw",  "#1D428A", "#FFC72C"),
+    ("hou",  "#CE1141", "#000000"),
+    ("ind",  "#002D62", "#FDBB30"),
+    ("lac",  "#C8102E", "#1D428A"),
+    ("lal",  "#552583", "#FDB927"),
+    ("mem",  "#5D76A9", "#12173F"),
+    ("mia",  "#98002E", "#F9A01B"),
+    ("mil",  "#00471B", "#EEE1C6"),
+    ("min",  "#0C2340", "#236192"),
+    ("no",   "#0C2340", "#C8102E"),
+    ("nyk",  "#006BB6", "#F58426"),
+    ("okc",  "#007AC1", "#EF3B24"),
+    ("orl",  "#0077C0", "#C4CED4"),
+    ("phi",  "#006BB6", "#ED174C"),
+    ("phx",  "#1D1160", "#E56020"),
+    ("por",  "#E03A3E", "#000000"),
+    ("sac",  "#5A2D81", "#63727A"),
+    ("sas",  "#000000", "#C4CED4"),
+    ("tor",  "#CE1141", "#000000"),
+    ("utah", "#002B5C", "#F9A01B"),
+    ("wsh",  "#002B5C", "#E31837"),
+]
+
 TEAM_META: dict[str, dict[str, str]] = {
-    "Atlanta Hawks":           {"abbrev": "atl",  "primary": "#E03A3E", "secondary": "#C1D32F"},
-    "Boston Celtics":          {"abbrev": "bos",  "primary": "#007A33", "secondary": "#BA9653"},
-    "Brooklyn Nets":           {"abbrev": "bkn",  "primary": "#000000", "secondary": "#AAAAAA"},
-    "Charlotte Hornets":       {"abbrev": "cha",  "primary": "#00788C", "secondary": "#1D1160"},
-    "Chicago Bulls":           {"abbrev": "chi",  "primary": "#CE1141", "secondary": "#000000"},
-    "Cleveland Cavaliers":     {"abbrev": "cle",  "primary": "#860038", "secondary": "#FDBB30"},
-    "Dallas Mavericks":        {"abbrev": "dal",  "primary": "#00538C", "secondary": "#002F5F"},
-    "Denver Nuggets":          {"abbrev": "den",  "primary": "#0E2240", "secondary": "#FEC524"},
-    "Detroit Pistons":         {"abbrev": "det",  "primary": "#C8102E", "secondary": "#006BB6"},
-    "Golden State Warriors":   {"abbrev": "gsw",  "primary": "#1D428A", "secondary": "#FFC72C"},
-    "Houston Rockets":         {"abbrev": "hou",  "primary": "#CE1141", "secondary": "#000000"},
-    "Indiana Pacers":          {"abbrev": "ind",  "primary": "#002D62", "secondary": "#FDBB30"},
-    "Los Angeles Clippers":    {"abbrev": "lac",  "primary": "#C8102E", "secondary": "#1D428A"},
-    "Los Angeles Lakers":      {"abbrev": "lal",  "primary": "#552583", "secondary": "#FDB927"},
-    "Memphis Grizzlies":       {"abbrev": "mem",  "primary": "#5D76A9", "secondary": "#12173F"},
-    "Miami Heat":              {"abbrev": "mia",  "primary": "#98002E", "secondary": "#F9A01B"},
-    "Milwaukee Bucks":         {"abbrev": "mil",  "primary": "#00471B", "secondary": "#EEE1C6"},
-    "Minnesota Timberwolves":  {"abbrev": "min",  "primary": "#0C2340", "secondary": "#236192"},
-    "New Orleans Pelicans":    {"abbrev": "no",   "primary": "#0C2340", "secondary": "#C8102E"},
-    "New York Knicks":         {"abbrev": "nyk",  "primary": "#006BB6", "secondary": "#F58426"},
-    "Oklahoma City Thunder":   {"abbrev": "okc",  "primary": "#007AC1", "secondary": "#EF3B24"},
-    "Orlando Magic":           {"abbrev": "orl",  "primary": "#0077C0", "secondary": "#C4CED4"},
-    "Philadelphia 76ers":      {"abbrev": "phi",  "primary": "#006BB6", "secondary": "#ED174C"},
-    "Phoenix Suns":            {"abbrev": "phx",  "primary": "#1D1160", "secondary": "#E56020"},
-    "Portland Trail Blazers":  {"abbrev": "por",  "primary": "#E03A3E", "secondary": "#000000"},
-    "Sacramento Kings":        {"abbrev": "sac",  "primary": "#5A2D81", "secondary": "#63727A"},
-    "San Antonio Spurs":       {"abbrev": "sas",  "primary": "#000000", "secondary": "#C4CED4"},
-    "Toronto Raptors":         {"abbrev": "tor",  "primary": "#CE1141", "secondary": "#000000"},
-    "Utah Jazz":               {"abbrev": "utah", "primary": "#002B5C", "secondary": "#F9A01B"},
-    "Washington Wizards":      {"abbrev": "wsh",  "primary": "#002B5C", "secondary": "#E31837"},
+    name: {"abbrev": abbrev, "primary": primary, "secondary": secondary}
+    for name, (abbrev, primary, secondary) in zip(FRANCHISES, _TEAM_STYLE, strict=True)
 }
 
 ERAS = [
@@ -0,0 +1,9 @@
+"""
+Benchmarks for the rater, SQLite ingest and Postgres load.
+
+Run from the project root:
+    uv run python -m backend.bench --suite quick
+"""
+from .league import synthetic_league, team_names
+
+__all__ = ["synthetic_league", "team_names"]
@@ -0,0 +1,104 @@
+"""
+Deterministic synthetic leagues for benchmarks.
+
+The same (n_teams, n_seasons, seed) always yields the same schedule and
+results, so timings from different runs and commits are comparable.
+"""
+import numpy as np
+import pandas as pd
+
+from backend.NBARater import HOME_ADVANTAGE
+from backend.teams import FRANCHISES
+
+# Columns produced by NBAScraper.get_data (modern layout)
+SCHEDULE_COLUMNS = [
+    'Date', 'Start Time (ET)', 'Visitor', 'Visitor Points', 'Home', 'Home Points',
+    'Box Score', 'Overtime', 'Attendance', 'Arena', 'Notes',
+]
+
+
+def team_names(n_teams):
+    """The real franchises for a 30-team league, otherwise 'Team 0001', 'Team 0002', ..."""
+    if n_teams == len(FRANCHISES):
+        return list(FRANCHISES)
+    return [f"Team {i:04d}" for i in range(1, n_teams + 1)]
+
+
+def synthetic_league(n_teams=30, n_seasons=1, games_per_team=82, playoff_teams=16,
+                     start_year=2000, seed=0):
+    """
+    Generates a league history shaped like scraped schedule data.
+    Each regular-season round pairs every team once (a random permutation), so
+    every team plays games_per_team games; results follow hidden strengths that
+    drift between seasons. Each season ends with knockout playoff rounds of
+    five-game series among the strongest teams, noted 'Playoffs'.
+    ---
+    Parameters:
+        n_teams: number of teams (even; 30 uses the real franchise names).
+        n_seasons: number of seasons.
+        games_per_team: regular-season games per team.
+        playoff_teams: teams in the playoff bracket (a power of two, at most n_teams).
+        start_year: year the first season starts.
+        seed: random seed.
+    ---
+    Returns a pandas DataFrame in date order with SCHEDULE_COLUMNS plus Win
+    (1.0 for a visitor win), ready for NBARater.eloSimulator and insert_season.
+    """
+    if n_teams % 2:
+        raise ValueError("n_teams must be even")
+    rng = np.random.default_rng(seed)
+    names = np.array(team_names(n_teams), dtype=object)
+    playoff_teams = min(playoff_teams, 1 << (n_teams.bit_length() - 1))
+    strength = rng.normal(0, 100, n_teams)
+
+    frames = []
+    for season in range(start_year, start_year + n_seasons):
+        strength = 0.7 * strength + rng.normal(0, 70, n_teams)
+        opening = np.datetime64(f'{season}-10-20')
+
+        # Regular season: one round per two days, every team plays once per round
+        pairs = np.argsort(rng.random((games_per_team, n_teams)), axis=1).reshape(games_per_team, -1, 2)
+        visitors, homes = pairs[..., 0].ravel(), pairs[..., 1].ravel()
+        days = np.repeat(np.arange(games_per_team) * 2, n_teams // 2)
+        notes = np.full(len(visitors), '', dtype=object)
+
+        # Playoffs: knockout rounds of five games, home court alternating
+        bracket = np.argsort(-strength)[:playoff_teams]
+        day = games_per_team * 2 + 7
+        po_visitors, po_homes, po_days = [], [], []
+        while len(bracket) > 1:
+            high, low = bracket[: len(bracket) // 2], bracket[len(bracket) // 2:][::-1]
+            for game in range(5):
+                po_visitors.append(low if game % 2 == 0 else high)
+                po_homes.append(high if game % 2 == 0 else low)
+                po_days.append(np.full(len(high), day + 2 * game))
+            upset = rng.random(len(high)) < 0.3
+            bracket = np.where(upset, low, high)
+            day += 14
+        if po_visitors:
+            visitors = np.concatenate([visitors, *po_visitors])
+            homes = np.concatenate([homes, *po_homes])
+            days = np.concatenate([days, *po_days])
+            notes = np.concatenate([notes, np.full(len(visitors) - len(notes), 'Playoffs', dtype=object)])
+
+        edge = (strength[visitors] - strength[homes] - HOME_ADVANTAGE) / 400
+        visitor_won = rng.random(len(visitors)) < 1 / (1 + 10 ** -edge)
+        loser_points = rng.integers(85, 120, len(visitors))
+        winner_points = loser_points + rng.integers(1, 25, len(visitors))
+        frames.append(pd.DataFrame({
+            'Date': (opening + days).astype(str),
+            'Start Time (ET)': '7:30p',
+            'Visitor': names[visitors],
+            'Visitor Points': np.where(visitor_won, winner_points, loser_points),
+            'Home': names[homes],
+            'Home Points': np.where(visitor_won, loser_points, winner_points),
+            'Box Score': 'Box Score',
+            'Overtime': '',
+            'Attendance': rng.integers(10_000, 21_000, len(visitors)).astype(str),
+            'Arena': '',
+            'Notes': notes,
+            'Win': visitor_won.astype(float),
+        }))
+
+    df = pd.concat(frames, ignore_index=True)
+    return df.sort_values('Date', kind='stable', ignore_index=True)
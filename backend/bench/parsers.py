@@ -0,0 +1,246 @@
+"""
+Schedule-parser benchmark: NBAScraper.parse_schedule (lxml, schedule table
+only) against the original BeautifulSoup parser, on saved pages.
+
+Pages come from the scraper's HTTP cache (data/http_cache) or a directory of
+.html files; with neither, pages are rendered from a synthetic league in both
+the modern and pre-2008 layouts. Each parser runs in a fresh process so its
+peak RSS is its own, and both parsers' output is checked for equality.
+
+Run from the project root:
+    uv run python -m backend.bench.parsers
+    uv run python -m backend.bench.parsers --pages saved_pages/ --repeat 5
+"""
+import argparse
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import bs4
+import pandas as pd
+
+from backend.NBAScraper import parse_schedule
+from backend.fetch import CACHE_DIR
+from .league import synthetic_league
+from .runner import _peak_rss_mb
+
+PARSERS = {'lxml': parse_schedule}
+
+
+def parse_schedule_bs4(html_content, start_playoff=None, end_playoff=None):
+    """
+    The original BeautifulSoup schedule parser, kept as the baseline for
+    NBAScraper.parse_schedule (builds the whole tree, then walks it per row).
+    ---
+    Parameters:
+        html_content: string, the page HTML
+        start_playoff: datetime, start of playoffs
+        end_playoff: datetime, end of playoffs
+    ---
+    Returns a DataFrame containing the data.
+    """
+    # create soup object and get only 'tr' tags
+    page = bs4.BeautifulSoup(html_content, features='lxml')
+
+    # Try modern div chain first; fall back to any schedule table for older pages
+    try:
+        rows = (page
+                .find('body', class_='bbr')
+                .find('div', {'id': 'wrap'})
+                .find('div', {'id': 'content'})
+                .find('div', {'id': 'all_schedule'})
+                .find('div', {'id': 'div_schedule'})
+                .find('tbody')
+                .find_all('tr'))
+    except AttributeError:
+        table = page.find('table', {'id': 'schedule'}) or page.find('table')
+        rows = table.find('tbody').find_all('tr') if table else []
+
+    # collect data
+    date, start, visitor, visitor_pts, home, home_pts, box_score, ot, attend, arena, notes = [], [], [], [], [], [], [], [], [], [], []
+    for game in rows:
+        ths = game.find_all('th')
+        tds = game.find_all('td')
+
+        # Skip header/separator rows (no date th or no tds)
+        if not ths or not tds:
+            continue
+        try:
+            game_date = datetime.strptime(ths[0].text.strip(), '%a, %b %d, %Y')
+        except ValueError:
+            continue
+
+        # Detect format: modern pages (2008+) have 11 TDs with start time at TD[0];
+        # old pages (pre-2008) have 10 TDs with visitor team at TD[0].
+        is_modern = len(tds) >= 11
+
+        if is_modern:
+            start_time   = tds[0].text
+            visitor_team = tds[1].text
+            v_pts        = tds[2].text
+            home_team    = tds[3].text
+            h_pts        = tds[4].text
+            box_td       = tds[5]
+            ot_val       = tds[6].text
+            attend_val   = tds[7].text
+            arena_val    = tds[8].text
+            note_val     = tds[9].text
+        else:
+            start_time   = ''
+            visitor_team = tds[0].text
+            v_pts        = tds[1].text
+            home_team    = tds[2].text
+            h_pts        = tds[3].text
+            box_td       = tds[4]
+            ot_val       = tds[5].text
+            attend_val   = tds[6].text
+            arena_val    = tds[7].text if len(tds) > 7 else ''
+            note_val     = tds[8].text if len(tds) > 8 else ''
+
+        box_a = box_td.find('a')
+        box_url = ('https://www.basketball-reference.com/' + box_a.get('href')) if box_a else ''
+
+        # change note to 'Playoffs' if playoffs have started
+        if start_playoff and start_playoff <= game_date <= end_playoff:
+            note_val = 'Playoffs'
+
+        date.append(game_date)
+        start.append(start_time)
+        visitor.append(visitor_team)
+        visitor_pts.append(v_pts)
+        home.append(home_team)
+        home_pts.append(h_pts)
+        box_score.append(box_url)
+        ot.append(ot_val)
+        attend.append(attend_val)
+        arena.append(arena_val)
+        notes.append(note_val)
+
+    # create DataFrame
+    data = {'Date': date,
+            'Start Time (ET)': start,
+            'Visitor': visitor,
+            'Visitor Points': visitor_pts,
+            'Home': home,
+            'Home Points': home_pts,
+            'Box Score': box_score,
+            'Overtime': ot,
+            'Attendance': attend,
+            'Arena': arena,
+            'Notes': notes}
+    return pd.DataFrame(data)
+
+
+PARSERS['bs4'] = parse_schedule_bs4
+
+
+def render_page(games, modern=True):
+    """Renders schedule rows (SCHEDULE_COLUMNS-shaped DataFrame) as a basketball-reference style page."""
+    rows = []
+    for game in games.itertuples(index=False):
+        date = pd.Timestamp(game.Date)
+        cells = [f'<a href="/teams/{game.Visitor[:3].upper()}/x.html">{game.Visitor}</a>', game[3],
+                 f'<a href="/teams/{game.Home[:3].upper()}/x.html">{game.Home}</a>', game[5],
+                 f'<a href="/boxscores/{date:%Y%m%d}0{game.Home[:3].upper()}.html">Box Score</a>',
+                 game.Overtime, game.Attendance]
+        cells = ([game[1]] + cells + ['2:15', game.Arena, game.Notes]) if modern else (cells + [game.Arena, game.Notes])
+        rows.append(f'<tr><th scope="row" class="left" data-stat="date_game"><a href="/boxscores/">'
+                    f'{date:%a, %b} {date.day}, {date.year}</a></th>'
+                    + ''.join(f'<td class="left">{cell}</td>' for cell in cells) + '</tr>')
+        if len(rows) % 20 == 0:
+            rows.append('<tr class="thead"><th colspan="12" class="left">Playoffs</th></tr>')
+    filler = ''.join(f'<div class="nav"><a href="/x{i}.html">link {i}</a></div>' for i in range(400))
+    return ('<html><head><title>Schedule</title></head><body class="bbr"><div id="wrap">'
+            f'<div id="header">{filler}</div><div id="content"><div id="all_schedule">'
+            '<div id="div_schedule"><table id="schedule" class="stats_table"><thead><tr><th>Date</th>'
+            '</tr></thead><tbody>' + ''.join(rows) + '</tbody></table></div></div></div>'
+            f'<div id="footer">{filler}</div></div></body></html>')
+
+
+def synthetic_pages(n_pages=18, games_per_page=230, seed=0):
+    """Deterministic month pages from a synthetic league, half in each layout."""
+    df = synthetic_league(30, 1 + n_pages // 9, seed=seed)
+    pages = []
+    for i in range(n_pages):
+        chunk = df.iloc[i * games_per_page % len(df):][:games_per_page]
+        pages.append(render_page(chunk, modern=i % 2 == 0))
+    return pages
+
+
+def load_pages(pages_dir=None, cache_dir=CACHE_DIR):
+    """Saved month pages from a directory of .html files or the HTTP cache; [] if none."""
+    if pages_dir is not None:
+        return [path.read_text(errors='replace') for path in sorted(Path(pages_dir).glob('*.html'))]
+    pages = []
+    for entry_path in sorted((Path(cache_dir) / 'urls').glob('*.json')):
+        entry = json.loads(entry_path.read_text())
+        if '_games-' in entry['url']:
+            body = Path(cache_dir) / 'objects' / entry['body_hash'][:2] / entry['body_hash']
+            pages.append(body.read_bytes().decode(entry.get('encoding') or 'utf-8', errors='replace'))
+    return pages
+
+
+def run_parser(name, pages, repeat=1):
+    """Times one parser over every page (best of `repeat`) in the current process."""
+    parse = PARSERS[name]
+    playoffs = (datetime(1900, 1, 1), datetime(1900, 1, 2))
+    rss_before = _peak_rss_mb()
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        frames = [parse(page, *playoffs) for page in pages]
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    rows = sum(len(frame) for frame in frames)
+    return {
+        'parser': name,
+        'pages': len(pages),
+        'rows': rows,
+        'seconds': round(best, 4),
+        'pages_per_s': round(len(pages) / best, 1),
+        'rows_per_s': round(rows / best, 1),
+        'peak_rss_delta_mb': round(_peak_rss_mb() - rss_before, 1),
+        'output': pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(),
+    }
+
+
+def _run_isolated(name, pages, repeat):
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(run_parser, name, pages, repeat).result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the lxml schedule parser against the bs4 baseline.")
+    parser.add_argument('--pages', type=Path, help='Directory of saved .html month pages')
+    parser.add_argument('--cache', type=Path, default=CACHE_DIR, help='HTTP cache to read saved pages from')
+    parser.add_argument('--repeat', type=int, default=3, help='Time each parser this many times and keep the best')
+    parser.add_argument('--output', type=Path, help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages, args.cache)
+    source = f'{len(pages)} saved page(s)'
+    if not pages:
+        pages = synthetic_pages()
+        source = f'{len(pages)} synthetic page(s) (no saved pages found)'
+    print(f'Parsing {source}, {sum(map(len, pages)) / 1e6:.1f} MB of HTML')
+
+    results = [_run_isolated(name, pages, args.repeat) for name in ('bs4', 'lxml')]
+    outputs = [result.pop('output') for result in results]
+    for r in results:
+        print(f"  {r['parser']:<5} {r['seconds']:8.3f}s  {r['pages_per_s']:>8,.1f} pages/s  "
+              f"{r['rows_per_s']:>10,.0f} rows/s  peak RSS +{r['peak_rss_delta_mb']:.1f} MiB")
+    print(f"Speedup: {results[0]['seconds'] / results[1]['seconds']:.1f}x")
+    identical = outputs[0].equals(outputs[1])
+    print(f"Outputs identical: {identical}")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps({'source': source, 'identical': identical, 'results': results}, indent=2))
+        print(f'Wrote {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Local stand-in for basketball-reference.com and Wikipedia that serves
+responses recorded by `python -m backend.NBAScraper --record`.
+
+Requests are matched on their Host header and path, so a Fetcher whose host
+overrides point here (ReplayServer.route) sees the recorded pages under their
+original URLs. Latency, jitter and injected 429s are configurable to exercise
+the scraper's rate limiting and retries without touching the live sites.
+
+Run from the project root:
+    uv run python -m backend.bench.replay --archive data/http_archive.jsonl.gz --port 8765 --rate-429 0.05
+"""
+import argparse
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from backend.fetch import ARCHIVE_PATH, ResponseArchive
+
+# Recorded headers that no longer describe the stored (decoded) body or this connection
+_DROPPED_HEADERS = {'connection', 'content-encoding', 'content-length', 'keep-alive', 'transfer-encoding'}
+
+
+class ReplayServer:
+    def __init__(self, archive=ARCHIVE_PATH, host='127.0.0.1', port=0, latency=0.0, jitter=0.0,
+                 rate_429=0.0, retry_after=0.0, seed=0):
+        """
+        Threaded HTTP server replaying a ResponseArchive.
+        ---
+        Parameters:
+            archive: archive path, or a dict of URL -> FetchResult.
+            host: interface to bind.
+            port: port to bind (0 picks a free one; see base_url).
+            latency: seconds added before every response.
+            jitter: extra uniformly random delay of up to this many seconds.
+            rate_429: probability of answering a request with 429 instead.
+            retry_after: Retry-After seconds sent with injected 429s.
+            seed: random seed for jitter and 429 injection.
+        """
+        responses = archive if isinstance(archive, dict) else ResponseArchive(archive).load()
+        self.responses = {(urlsplit(url).netloc, self._target(url)): result for url, result in responses.items()}
+        self.hosts = sorted({netloc for netloc, _ in self.responses})
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'served': 0, 'not_modified': 0, 'rate_limited': 0, 'missing': 0}
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+
+    @staticmethod
+    def _target(url):
+        parts = urlsplit(url)
+        return parts.path + (f'?{parts.query}' if parts.query else '')
+
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+
+    def start(self):
+        """Serves in a background thread; returns self."""
+        self._thread = threading.Thread(target=self._server.serve_forever, name='replay-server', daemon=True)
+        self._thread.start()
+        return self
+
+
+    def serve_forever(self):
+        """Serves in the calling thread until interrupted."""
+        self._server.serve_forever()
+
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+    def __enter__(self):
+        return self.start()
+
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+    def route(self, fetcher):
+        """Points a Fetcher's requests for every recorded host at this server."""
+        for netloc in self.hosts:
+            fetcher.hosts[netloc] = self.base_url
+
+
+    def _decide(self):
+        """Delay and whether to inject a 429, for one request."""
+        with self._lock:
+            self.stats['requests'] += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            throttle = self.rate_429 > 0 and self._random.random() < self.rate_429
+        return delay, throttle
+
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+
+    def _handler(self):
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                delay, throttle = replay._decide()
+                if delay:
+                    time.sleep(delay)
+                if throttle:
+                    replay._count('rate_limited')
+                    return self._send(429, b'', {'Retry-After': f'{replay.retry_after:g}'})
+
+                result = replay.responses.get((self.headers.get('Host', ''), self.path))
+                if result is None:
+                    replay._count('missing')
+                    return self._send(404, b'', {})
+                etag = result.headers.get('ETag')
+                if etag and self.headers.get('If-None-Match') == etag:
+                    replay._count('not_modified')
+                    return self._send(304, b'', {'ETag': etag})
+                replay._count('served')
+                headers = {name: value for name, value in result.headers.items()
+                           if name.lower() not in _DROPPED_HEADERS}
+                self._send(result.status_code, result.content, headers)
+
+            def _send(self, status, body, headers):
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a recorded HTTP archive as a local stand-in for the scraped sites.")
+    parser.add_argument('--archive', type=str, default=str(ARCHIVE_PATH), help='Archive written by NBAScraper --record')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind')
+    parser.add_argument('--port', type=int, default=8765, help='Port to bind')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added before every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random delay of up to this many seconds')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Probability of answering with 429 instead')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After seconds sent with injected 429s')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for jitter and 429 injection')
+    args = parser.parse_args()
+
+    server = ReplayServer(args.archive, args.host, args.port, args.latency, args.jitter,
+                          args.rate_429, args.retry_after, args.seed)
+    print(f"Replaying {len(server.responses)} response(s) for {', '.join(server.hosts)} on {server.base_url}")
+    print("Requests must carry the original Host header (see Fetcher.hosts). Ctrl-C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    print(server.stats)
+
+
+if __name__ == '__main__':
+    main()
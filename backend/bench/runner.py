@@ -0,0 +1,251 @@
+"""
+Benchmark runner (the entry point of `python -m backend.bench`).
+
+Each (benchmark, teams, seasons) case runs in a fresh process so its peak RSS is
+its own. Results are written as JSON; pass --baseline with an earlier results
+file to flag throughput or memory regressions (exit status 1 if any).
+
+Run from the project root:
+    uv run python -m backend.bench --suite quick
+    uv run python -m backend.bench --suite full --postgres --baseline data/bench/before.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from .league import synthetic_league, team_names
+
+BENCHMARKS = ["rater", "sqlite", "postgres"]
+SUITES = {
+    "quick": [(30, 1), (30, 10), (300, 10)],
+    "full": [(30, 1), (30, 10), (30, 100), (300, 10), (3000, 1), (3000, 10)],
+}
+OUTPUT_DIR = Path("data") / "bench"
+BENCH_SCHEMA = "nba_elo_bench"
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process so far, in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _bench_rater(df, n_teams):
+    from backend.NBARater import NBARater
+
+    rater = NBARater(teams=team_names(n_teams))
+    t0 = time.perf_counter()
+    rater.eloSimulator(df)
+    return time.perf_counter() - t0
+
+
+def _bench_sqlite(df, n_teams):
+    from backend.NBAScraper import init_db, insert_season
+
+    seasons = pd.to_datetime(df["Date"])
+    seasons = seasons.dt.year.where(seasons.dt.month >= 10, seasons.dt.year - 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = init_db(Path(tmp) / "bench.db")
+        # Synthetic names are not in the franchise registry; keep its warnings quiet
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            for season, season_df in df.groupby(seasons, sort=True):
+                insert_season(conn, int(season), season_df.reset_index(drop=True))
+            elapsed = time.perf_counter() - t0
+        conn.close()
+    return elapsed
+
+
+def _bench_postgres(df, n_teams):
+    """Loads games and elo_history the way migrate does, into a scratch schema."""
+    from sqlalchemy import text
+
+    from backend.NBARater import NBARater
+    from backend.app.database import engine, Base
+    from backend.migrate import _create_indexes, _drop_indexes, _elo_rows, _game_rows, _load
+
+    rater = NBARater(teams=team_names(n_teams))
+    log = rater.rateBatch(df, keep_history=False)
+    games = df.rename(columns={"Visitor Points": "visitor_points", "Home Points": "home_points"})
+
+    async def load():
+        try:
+            return await _load_schema()
+        finally:
+            await engine.dispose()
+
+    async def _load_schema():
+        async with engine.connect() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE"))
+            await conn.execute(text(f"CREATE SCHEMA {BENCH_SCHEMA}"))
+            await conn.execute(text(f"SET search_path TO {BENCH_SCHEMA}"))
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.commit()
+            try:
+                # Row building is part of the load, as in migrate
+                t0 = time.perf_counter()
+                await _drop_indexes(conn)
+                await _load(conn, _game_rows(games, log), _elo_rows(log))
+                await _create_indexes(conn)
+                await conn.commit()
+                return time.perf_counter() - t0
+            finally:
+                await conn.execute(text(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE"))
+                await conn.commit()
+
+    return asyncio.run(load())
+
+
+_RUNNERS = {"rater": _bench_rater, "sqlite": _bench_sqlite, "postgres": _bench_postgres}
+_UNITS = {"rater": "games_per_s", "sqlite": "rows_per_s", "postgres": "rows_per_s"}
+
+
+def run_case(bench, n_teams, n_seasons, seed=0, repeat=1):
+    """
+    Runs one benchmark case in the current process; with repeat > 1 the fastest
+    of that many runs is kept.
+    ---
+    Returns a result dict: bench, teams, seasons, rows, seconds, the throughput
+    metric, generate_s, and peak RSS before and after the timed section.
+    """
+    t0 = time.perf_counter()
+    df = synthetic_league(n_teams, n_seasons, seed=seed)
+    generate_s = time.perf_counter() - t0
+    rss_before = _peak_rss_mb()
+    result = {"bench": bench, "teams": n_teams, "seasons": n_seasons, "rows": len(df),
+              "generate_s": round(generate_s, 4), "rss_input_mb": round(rss_before, 1)}
+    try:
+        seconds = min(_RUNNERS[bench](df, n_teams) for _ in range(repeat))
+    except Exception as e:
+        # Postgres may be absent or unreachable; a failure anywhere else is a real error
+        if bench != "postgres":
+            raise
+        return {**result, "skipped": f"{type(e).__name__}: {e}"}
+    metric = _UNITS[bench]
+    rows = len(df) * (3 if bench == "postgres" else 1)  # game row + two elo_history rows
+    return {
+        **result,
+        "seconds": round(seconds, 4),
+        metric: round(rows / seconds, 1) if seconds else None,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def _run_isolated(bench, n_teams, n_seasons, seed, repeat):
+    """Runs a case in a fresh spawned process so peak RSS is not shared."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(run_case, bench, n_teams, n_seasons, seed, repeat).result()
+
+
+def compare(results, baseline, threshold=0.1):
+    """
+    Flags cases whose throughput dropped, or whose peak RSS grew, by more than
+    threshold (a fraction) relative to a baseline results list.
+    ---
+    Returns a list of human-readable regression messages.
+    """
+    before = {(r["bench"], r["teams"], r["seasons"]): r for r in baseline}
+    regressions = []
+    for r in results:
+        old = before.get((r["bench"], r["teams"], r["seasons"]))
+        if old is None or "skipped" in r or "skipped" in old:
+            continue
+        metric = _UNITS[r["bench"]]
+        label = f"{r['bench']} {r['teams']} teams x {r['seasons']} seasons"
+        if old.get(metric) and r[metric] < old[metric] * (1 - threshold):
+            regressions.append(f"{label}: {metric} {old[metric]:,.0f} -> {r[metric]:,.0f} "
+                               f"({r[metric] / old[metric] - 1:+.1%})")
+        if old.get("peak_rss_mb") and r["peak_rss_mb"] > old["peak_rss_mb"] * (1 + threshold):
+            regressions.append(f"{label}: peak RSS {old['peak_rss_mb']:.0f} MiB -> {r['peak_rss_mb']:.0f} MiB "
+                               f"({r['peak_rss_mb'] / old['peak_rss_mb'] - 1:+.1%})")
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the rater, SQLite ingest and Postgres load.")
+    parser.add_argument("--suite", choices=SUITES, default="quick", help="Preset league sizes")
+    parser.add_argument("--teams", help="Comma-separated team counts (overrides --suite; crossed with --seasons)")
+    parser.add_argument("--seasons", help="Comma-separated season counts (overrides --suite; crossed with --teams)")
+    parser.add_argument("--bench", default="rater,sqlite",
+                        help=f"Comma-separated benchmarks from {BENCHMARKS} (default rater,sqlite)")
+    parser.add_argument("--postgres", action="store_true", help="Also run the Postgres load benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic league seed")
+    parser.add_argument("--repeat", type=int, default=1, help="Time each case this many times and keep the best")
+    parser.add_argument("--output", type=Path, help="Results JSON path (default data/bench/<timestamp>.json)")
+    parser.add_argument("--baseline", type=Path, help="Earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative slowdown / RSS growth reported as a regression (default 0.1)")
+    args = parser.parse_args()
+
+    if args.teams or args.seasons:
+        teams = [int(x) for x in (args.teams or "30").split(",")]
+        seasons = [int(x) for x in (args.seasons or "1").split(",")]
+        cases = list(itertools.product(teams, seasons))
+    else:
+        cases = SUITES[args.suite]
+    benches = args.bench.split(",")
+    if args.postgres and "postgres" not in benches:
+        benches.append("postgres")
+    unknown = set(benches) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    results = []
+    for bench, (n_teams, n_seasons) in itertools.product(benches, cases):
+        r = _run_isolated(bench, n_teams, n_seasons, args.seed, args.repeat)
+        results.append(r)
+        label = f"{bench:<9}{n_teams:>6} teams x {n_seasons:>3} seasons ({r['rows']:>9,} games)"
+        if "skipped" in r:
+            print(f"{label}: skipped ({r['skipped']})")
+        else:
+            metric = _UNITS[bench]
+            print(f"{label}: {r['seconds']:8.3f}s  {r[metric]:>12,.0f} {metric.replace('_per_s', '/s')}  "
+                  f"peak RSS {r['peak_rss_mb']:,.0f} MiB")
+
+    output = args.output or OUTPUT_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": results,
+    }, indent=2))
+    print(f"Wrote {output}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text())["results"], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline} (threshold {args.threshold:.0%})")
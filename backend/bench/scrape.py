@@ -0,0 +1,128 @@
+"""
+Offline scrape benchmark: a full backfill through ScrapePipeline against a
+ReplayServer serving a recorded archive, so fetch/parse/write throughput and
+429 retry behavior are measured at full speed without the live sites.
+
+The HTTP cache is bypassed (every page is requested from the replay server)
+and the basketball-reference rate limit is lifted unless --interval is given.
+
+Record an archive once, then replay it:
+    uv run python -m backend.NBAScraper --beginning 2015 --end 2023 --no-cache --record
+    uv run python -m backend.bench.scrape --latency 0.05 --rate-429 0.02
+"""
+import argparse
+import json
+import re
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from backend.NBAScraper import BBALL_REF_HOST
+from backend.ScrapePipeline import ScrapePipeline
+from backend.fetch import ARCHIVE_PATH, ResponseArchive, fetcher, robots
+from .replay import ReplayServer
+
+
+def archived_seasons(urls):
+    """Season start years with at least one month page among the archived URLs."""
+    return sorted({int(match.group(1)) - 1 for url in urls
+                   if (match := re.search(r'/NBA_(\d{4})_games-\w+\.html$', url))})
+
+
+def run_backfill(responses, seasons, latency=0.0, jitter=0.0, rate_429=0.0, retry_after=0.0,
+                 interval=None, concurrency=2, seed=0):
+    """
+    Scrapes `seasons` into a scratch SQLite DB from a replay of `responses`.
+    ---
+    Parameters:
+        responses: dict of URL -> FetchResult, as loaded from a ResponseArchive.
+        seasons: season start years.
+        latency, jitter, rate_429, retry_after, seed: see ReplayServer.
+        interval: seconds between basketball-reference requests (None: unlimited).
+        concurrency: seasons fetched at once.
+    ---
+    Returns a dict with the pipeline report, HTTP and server counters, and the rows written.
+    """
+    saved = (fetcher.cache, dict(fetcher.hosts), dict(fetcher.buckets))
+    with ReplayServer(responses, latency=latency, jitter=jitter, rate_429=rate_429,
+                      retry_after=retry_after, seed=seed) as server, tempfile.TemporaryDirectory() as tmp:
+        try:
+            fetcher.cache = None
+            server.route(fetcher)
+            # Load robots.txt from the replay first: it publishes its Crawl-delay,
+            # which is then replaced by the benchmark's own interval
+            robots.policy(f'https://{BBALL_REF_HOST}/')
+            fetcher.buckets.pop(BBALL_REF_HOST, None)
+            if interval:
+                fetcher.limit(BBALL_REF_HOST, interval)
+            http_before = dict(fetcher.stats)
+
+            db_path = Path(tmp) / 'bench.db'
+            t0 = time.perf_counter()
+            report = ScrapePipeline(db_path, concurrency=concurrency, retry_backoff=0.0).run(seasons)
+            wall = time.perf_counter() - t0
+            conn = sqlite3.connect(db_path)
+            rows = conn.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+            pages = dict(conn.execute("SELECT state, COUNT(*) FROM crawl_frontier GROUP BY state").fetchall())
+            conn.close()
+        finally:
+            fetcher.cache, fetcher.hosts, fetcher.buckets = saved
+    return {
+        'seasons': len(seasons),
+        'wall_s': round(wall, 3),
+        'rows': rows,
+        'rows_per_s': round(rows / wall, 1) if wall else None,
+        'pages': pages,
+        'pipeline': report,
+        'http': {key: fetcher.stats[key] - http_before.get(key, 0) for key in fetcher.stats},
+        'server': server.stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark a full scrape offline against a replayed archive.")
+    parser.add_argument('--archive', type=Path, default=ARCHIVE_PATH, help='Archive written by NBAScraper --record')
+    parser.add_argument('--beginning', type=int, help='First season start year (default: first archived)')
+    parser.add_argument('--end', type=int, help='Last season start year (default: last archived)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds the server adds to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random delay of up to this many seconds')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Probability of a 429 instead of the page')
+    parser.add_argument('--retry-after', type=float, default=0.0, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--interval', type=float, help='Seconds between basketball-reference requests (default: none)')
+    parser.add_argument('--concurrency', type=int, default=2, help='Seasons fetched at once')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for jitter and 429 injection')
+    parser.add_argument('--output', type=Path, help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    responses = ResponseArchive(args.archive).load()
+    seasons = archived_seasons(responses)
+    if args.beginning is not None or args.end is not None:
+        seasons = [s for s in seasons if (args.beginning or s) <= s <= (args.end or s)]
+    if not seasons:
+        raise SystemExit(f"No schedule pages for the requested seasons in {args.archive}")
+    print(f"Replaying {len(responses)} response(s): seasons {seasons[0]}-{seasons[0] + 1} "
+          f"to {seasons[-1]}-{seasons[-1] + 1}")
+
+    result = run_backfill(responses, seasons, args.latency, args.jitter, args.rate_429, args.retry_after,
+                          args.interval, args.concurrency, args.seed)
+    print(f"  {result['seasons']} season(s), {result['rows']:,} rows in {result['wall_s']:.2f}s "
+          f"({result['rows_per_s']:,.0f} rows/s)")
+    for stage in ('fetch', 'parse', 'write'):
+        stats = result['pipeline'][stage]
+        print(f"  {stage:<6} {stats['items']:>5} items, busy {stats['busy_s']:.2f}s, "
+              f"{stats['items_per_s'] or 0:,.1f}/s")
+    http, server = result['http'], result['server']
+    print(f"  HTTP: {http['network']} request(s), {http['rate_limited']} rate limited; "
+          f"server: {server['served']} served, {server['rate_limited']} 429s injected, {server['missing']} missing")
+    print(f"  Pages: {result['pages']}")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        params = {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()}
+        args.output.write_text(json.dumps({'params': params, 'result': result}, indent=2))
+        print(f'Wrote {args.output}')
+
+
+if __name__ == '__main__':
+    main()
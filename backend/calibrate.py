@@ -0,0 +1,255 @@
+"""
+Walk-forward calibration of the Elo model parameters.
+
+Reads the SQLite games table once, splits it into season folds and evaluates a
+parameter grid out of sample: every prediction for fold season S is made from
+ratings built only from games before it. The grid is spread over a process
+pool and configurations that are clearly dominated are dropped between folds.
+
+Run from the project root:
+    uv run python -m backend.calibrate --workers 4
+"""
+import argparse
+import itertools
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from backend.NBARater import NBARater, HOME_ADVANTAGE, REVERSION_FACTOR, _encode_games, _sweep_kernel
+
+SQLITE_PATH = Path("data") / "nba.db"
+PARAM_NAMES = ["home_advantage", "reversion_factor", "k_regular", "k_playoff", "streak_base"]
+DEFAULT_GRID = {
+    "home_advantage": "50:150:25",
+    "reversion_factor": "0,0.25,0.3333333333333333,0.5",
+    "k_regular": "16:40:8",
+    "k_playoff": "32,48,64",
+    "streak_base": "1.0,1.05,1.1",
+}
+
+# Encoded games, set once per worker process by _init_worker
+_GAMES = None
+
+
+def load_games(db_path=SQLITE_PATH) -> pd.DataFrame:
+    """Reads every completed game from SQLite in date order, shaped for NBARater."""
+    conn = sqlite3.connect(str(db_path))
+    df = pd.read_sql(
+        "SELECT date, visitor, home, visitor_points, home_points, notes FROM games "
+        "WHERE visitor_points IS NOT NULL AND home_points IS NOT NULL "
+        "ORDER BY date ASC",
+        conn,
+    )
+    conn.close()
+    df["Win"] = (df["visitor_points"] > df["home_points"]).astype(float)
+    df["Date"] = df["date"]
+    df["Visitor"] = df["visitor"]
+    df["Home"] = df["home"]
+    df["Notes"] = df["notes"].fillna("")
+    return df
+
+
+def parse_values(spec: str) -> np.ndarray:
+    """Parses 'a,b,c' or an inclusive 'start:stop:step' range into a float array."""
+    if ":" in spec:
+        start, stop, step = (float(x) for x in spec.split(":"))
+        return np.arange(start, stop + step / 2, step)
+    return np.array([float(x) for x in spec.split(",")])
+
+
+def build_grid(specs: dict[str, str]) -> dict[str, np.ndarray]:
+    """Cartesian product of the per-parameter value lists, as one array per parameter."""
+    values = [parse_values(specs[name]) for name in PARAM_NAMES]
+    product = np.array(list(itertools.product(*values)), dtype=np.float64).reshape(-1, len(PARAM_NAMES))
+    return {name: np.ascontiguousarray(product[:, i]) for i, name in enumerate(PARAM_NAMES)}
+
+
+def _init_worker(games):
+    global _GAMES
+    _GAMES = games
+
+
+def _advance(start, stop, params, ratings, streaks, current_season):
+    """Pool task: advances one chunk of configurations over games[start:stop]."""
+    games = {key: values[start:stop] for key, values in _GAMES.items()}
+    out = _sweep_kernel(games, params, ratings, streaks, current_season)
+    return ratings, streaks, out
+
+
+def calibrate(df, grid, workers=None, burn_in=5, min_folds=3, prune_margin=0.005, verbose=True):
+    """Runs the walk-forward search.
+
+    The first `burn_in` seasons only warm up the ratings; every later season is a
+    fold. After `min_folds` folds, configurations whose mean fold log-loss trails
+    the current best by more than `prune_margin` are dropped.
+
+    Returns a dict with the ranked report (DataFrame), the walk-forward
+    selection results per fold and timing information.
+    """
+    workers = workers or os.cpu_count() or 1
+    timings = {"workers": workers}
+
+    t0 = time.perf_counter()
+    team_names = list(NBARater().teams)
+    games = _encode_games(df, {team: i for i, team in enumerate(team_names)})
+    timings["encode_s"] = time.perf_counter() - t0
+
+    seasons = np.unique(games["seasons"])
+    if len(seasons) <= burn_in:
+        raise ValueError(f"Need more than {burn_in} seasons of games, found {len(seasons)}")
+    bounds = np.searchsorted(games["seasons"], seasons)
+    segments = [(0, int(bounds[burn_in]), None)]  # burn-in, not scored
+    segments += [
+        (int(bounds[i]), int(bounds[i + 1]) if i + 1 < len(seasons) else len(games["seasons"]), int(seasons[i]))
+        for i in range(burn_in, len(seasons))
+    ]
+
+    n_configs = len(grid["home_advantage"])
+    alive = np.arange(n_configs)
+    ratings = np.full((len(team_names), n_configs), 1200.0)
+    streaks = [0] * len(team_names)
+    current_season = None
+    fold_loss = np.full((len(segments) - 1, n_configs), np.nan)
+    fold_brier = np.full((len(segments) - 1, n_configs), np.nan)
+    selections = []
+    timings["folds"] = []
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(games,)) as pool:
+        for fold, (start, stop, season) in enumerate(segments, start=-1):
+            t_fold = time.perf_counter()
+            chunks = [c for c in np.array_split(alive, min(workers, len(alive))) if len(c)]
+            futures = [
+                pool.submit(
+                    _advance, start, stop,
+                    {name: grid[name][chunk] for name in PARAM_NAMES},
+                    np.ascontiguousarray(ratings[:, chunk]), list(streaks), current_season,
+                )
+                for chunk in chunks
+            ]
+            for chunk, future in zip(chunks, futures):
+                chunk_ratings, streaks, out = future.result()
+                ratings[:, chunk] = chunk_ratings
+                current_season = out["current_season"]
+                if season is not None:
+                    n_games = max(int(out["games"].sum()), 1)
+                    fold_loss[fold, chunk] = out["log_loss"].sum(axis=0) / n_games
+                    fold_brier[fold, chunk] = out["brier"].sum(axis=0) / n_games
+
+            elapsed = time.perf_counter() - t_fold
+            if season is None:
+                timings["burn_in_s"] = elapsed
+                continue
+
+            # Walk-forward selection: the config leading on folds before this one
+            # is what we would have picked; its loss on this fold is out of sample
+            if fold > 0:
+                prior = np.nanmean(fold_loss[:fold, alive], axis=0)
+                pick = alive[np.argmin(prior)]
+                selections.append({
+                    "season": season,
+                    "selected": int(pick),
+                    "log_loss": float(fold_loss[fold, pick]),
+                    "best_in_hindsight": float(np.nanmin(fold_loss[fold, alive])),
+                })
+
+            n_before = len(alive)
+            if fold + 1 >= min_folds:
+                mean_loss = np.nanmean(fold_loss[: fold + 1, alive], axis=0)
+                alive = alive[mean_loss <= mean_loss.min() + prune_margin]
+            timings["folds"].append({
+                "season": season,
+                "configs": n_before,
+                "games": stop - start,
+                "seconds": elapsed,
+                "config_games_per_s": n_before * (stop - start) / elapsed if elapsed else None,
+            })
+            if verbose:
+                print(f"  Fold {season}-{season + 1}: {n_before} configs, {elapsed:.2f}s, "
+                      f"{n_before - len(alive)} pruned")
+
+    timings["total_s"] = time.perf_counter() - t0
+
+    folds_run = np.sum(~np.isnan(fold_loss), axis=0)
+    report = pd.DataFrame(grid)
+    report["log_loss"] = np.nanmean(fold_loss, axis=0)
+    report["brier"] = np.nanmean(fold_brier, axis=0)
+    report["folds"] = folds_run
+    report["survived"] = False
+    report.loc[alive, "survived"] = True
+    report = report.sort_values(["survived", "folds", "log_loss"], ascending=[False, False, True])
+    return {"report": report, "selections": selections, "timings": timings}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward calibration of Elo parameters from data/nba.db.")
+    for name in PARAM_NAMES:
+        parser.add_argument(f"--{name.replace('_', '-')}", default=DEFAULT_GRID[name],
+                            help=f"Values for {name}: 'a,b,c' or 'start:stop:step' (default {DEFAULT_GRID[name]})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Process pool size")
+    parser.add_argument("--burn-in", type=int, default=5, help="Seasons used only to warm up ratings")
+    parser.add_argument("--min-folds", type=int, default=3, help="Folds evaluated before pruning starts")
+    parser.add_argument("--prune-margin", type=float, default=0.005,
+                        help="Drop configs whose mean log-loss trails the best by more than this")
+    parser.add_argument("--top", type=int, default=15, help="Rows of the ranked report to print")
+    parser.add_argument("--scaling", action="store_true",
+                        help="Repeat the search with 1, 2, 4, ... up to --workers processes and report speedup")
+    parser.add_argument("--json", type=Path, help="Also write the report and timings to this JSON file")
+    args = parser.parse_args()
+
+    t_load = time.perf_counter()
+    df = load_games(SQLITE_PATH)
+    load_s = time.perf_counter() - t_load
+    grid = build_grid({name: getattr(args, name) for name in PARAM_NAMES})
+    n_configs = len(grid["home_advantage"])
+    print(f"Loaded {len(df)} games in {load_s:.2f}s; searching {n_configs} configurations "
+          f"(current model: home_advantage={HOME_ADVANTAGE}, reversion_factor={REVERSION_FACTOR:.3f})")
+
+    result = calibrate(df, grid, workers=args.workers, burn_in=args.burn_in,
+                       min_folds=args.min_folds, prune_margin=args.prune_margin)
+    result["timings"]["load_s"] = load_s
+
+    print("\nRanked configurations (mean out-of-sample fold log-loss):")
+    print(result["report"].head(args.top).to_string(index=False))
+
+    if result["selections"]:
+        oos = np.mean([s["log_loss"] for s in result["selections"]])
+        hindsight = np.mean([s["best_in_hindsight"] for s in result["selections"]])
+        print(f"\nWalk-forward selected config log-loss: {oos:.5f} (best in hindsight: {hindsight:.5f})")
+
+    timings = result["timings"]
+    print(f"\nTimings: load {load_s:.2f}s, encode {timings['encode_s']:.2f}s, "
+          f"burn-in {timings['burn_in_s']:.2f}s, total {timings['total_s']:.2f}s "
+          f"with {timings['workers']} worker(s)")
+
+    scaling = []
+    if args.scaling:
+        workers = 1
+        while workers <= args.workers:
+            run = calibrate(df, grid, workers=workers, burn_in=args.burn_in, min_folds=args.min_folds,
+                            prune_margin=args.prune_margin, verbose=False)
+            scaling.append({"workers": workers, "total_s": run["timings"]["total_s"]})
+            workers *= 2
+        print("\nScaling:")
+        for row in scaling:
+            print(f"  {row['workers']:>3} worker(s): {row['total_s']:.2f}s "
+                  f"(speedup {scaling[0]['total_s'] / row['total_s']:.2f}x)")
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps({
+            "report": result["report"].to_dict(orient="records"),
+            "selections": result["selections"],
+            "timings": timings,
+            "scaling": scaling,
+        }, indent=2, default=float))
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
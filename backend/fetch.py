@@ -0,0 +1,542 @@
+"""
+Shared HTTP fetch layer for the scrapers.
+
+Requests go through pooled keep-alive sessions (one per thread, since
+requests.Session is not thread-safe) instead of a fresh connection per page.
+Successful responses are kept in an on-disk cache: bodies are stored once under
+the SHA-256 of their content, and a per-URL entry records the body hash plus the
+ETag / Last-Modified validators used for conditional GETs. Pages that can no
+longer change (closed seasons) are served straight from the cache with no
+network traffic at all.
+
+Network requests can be rate limited per host with a token bucket. Waiting for a
+token never holds a lock, so a slow host does not stall others, and the same
+bucket serves threaded callers (fetch) and asyncio tasks (fetch_async).
+RobotsPolicy caches each host's parsed robots.txt and publishes its Crawl-delay
+to that host's bucket.
+
+For offline runs, a ResponseArchive records every response a Fetcher returns
+(record mode), and host overrides send a host's requests to a local stand-in
+instead, such as the replay server in backend.bench.replay.
+"""
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import requests
+from requests.adapters import HTTPAdapter
+from tqdm import tqdm
+
+CACHE_DIR = Path('data') / 'http_cache'
+ARCHIVE_PATH = Path('data') / 'http_archive.jsonl.gz'
+# max_age for pages that never change once published
+IMMUTABLE = math.inf
+ROBOTS_TTL = 24 * 60 * 60  # seconds a parsed robots.txt is trusted
+ROBOTS_RETRY = 5 * 60  # seconds before retrying a robots.txt that could not be fetched
+
+
+@dataclass
+class FetchResult:
+    """The parts of a response the scrapers use, whether it came from the network or the cache."""
+    url: str
+    status_code: int
+    content: bytes
+    encoding: str = 'utf-8'
+    headers: dict = field(default_factory=dict)
+    from_cache: bool = False
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error for url: {self.url}")
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=1):
+        """
+        Thread-safe token bucket. A caller reserves a token under a short lock and
+        then sleeps outside it; the token count may go negative, which queues
+        later callers behind earlier reservations in arrival order.
+        ---
+        Parameters:
+            rate: tokens added per second (1 / minimum interval).
+            capacity: burst size.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+
+    def reserve(self):
+        """Takes a token; returns the seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+
+    def set_rate(self, rate):
+        """Changes the refill rate without losing reservations already handed out."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.rate = rate
+
+
+    def pause(self, seconds):
+        """Delays every not-yet-reserved token by `seconds` (e.g. after a 429)."""
+        with self._lock:
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+    def acquire(self):
+        """Blocks the calling thread until a token is available."""
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+
+
+    async def acquire_async(self):
+        """Waits for a token without blocking the event loop."""
+        wait = self.reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+
+class ResponseCache:
+    def __init__(self, directory=CACHE_DIR):
+        """
+        Content-addressed on-disk response cache.
+        ---
+        Parameters:
+            directory: cache root; holds objects/<body sha256> and urls/<url sha256>.json.
+        """
+        self.directory = Path(directory)
+
+
+    @staticmethod
+    def _digest(data):
+        return hashlib.sha256(data).hexdigest()
+
+
+    def _entry_path(self, url):
+        return self.directory / 'urls' / f"{self._digest(url.encode())}.json"
+
+
+    def _object_path(self, body_hash):
+        return self.directory / 'objects' / body_hash[:2] / body_hash
+
+
+    @staticmethod
+    def _write_atomic(path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+
+    def get(self, url):
+        """
+        Looks up a URL's cache entry.
+        ---
+        Returns a (metadata dict, body bytes) tuple, or None on a miss.
+        """
+        try:
+            entry = json.loads(self._entry_path(url).read_text())
+            body = self._object_path(entry['body_hash']).read_bytes()
+        except (OSError, ValueError, KeyError):
+            return None
+        return entry, body
+
+
+    def put(self, url, response):
+        """
+        Stores a 200 response's body and validators; returns the metadata dict.
+        The body the URL's entry pointed to before is deleted when no other
+        entry refers to it, so pages that keep changing (the current season's)
+        do not pile up old versions.
+        """
+        try:
+            previous = json.loads(self._entry_path(url).read_text())['body_hash']
+        except (OSError, ValueError, KeyError):
+            previous = None
+        body_hash = self._digest(response.content)
+        obj = self._object_path(body_hash)
+        if not obj.exists():
+            self._write_atomic(obj, response.content)
+        entry = {
+            'url': url,
+            'body_hash': body_hash,
+            'encoding': response.encoding or 'utf-8',
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': time.time(),
+        }
+        self._write_atomic(self._entry_path(url), json.dumps(entry).encode())
+        if previous is not None and previous != body_hash and not self._referenced(previous):
+            # An entry written meanwhile for the same body just sees a miss and refetches
+            self._object_path(previous).unlink(missing_ok=True)
+        return entry
+
+
+    def _referenced(self, body_hash):
+        """Whether any URL entry points to the given body."""
+        for path in (self.directory / 'urls').glob('*.json'):
+            try:
+                if json.loads(path.read_text()).get('body_hash') == body_hash:
+                    return True
+            except (OSError, ValueError):
+                continue
+        return False
+
+
+    def touch(self, url, entry):
+        """Marks an entry as revalidated now (after a 304)."""
+        entry = {**entry, 'fetched_at': time.time()}
+        self._write_atomic(self._entry_path(url), json.dumps(entry).encode())
+        return entry
+
+
+class ResponseArchive:
+    def __init__(self, path=ARCHIVE_PATH):
+        """
+        Append-only, gzip-compressed JSON-lines log of responses with their
+        headers. Each record is its own gzip member, so a run can be stopped at
+        any point and later runs keep appending to the same file.
+        ---
+        Parameters:
+            path: archive file.
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+
+    def record(self, result):
+        """Appends a FetchResult."""
+        line = json.dumps({
+            'url': result.url,
+            'status_code': result.status_code,
+            'encoding': result.encoding,
+            'headers': result.headers,
+            'body': base64.b64encode(result.content).decode('ascii'),
+            'recorded_at': time.time(),
+        }).encode() + b'\n'
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(self.path, 'ab') as f:
+                f.write(line)
+
+
+    def load(self):
+        """
+        Reads the archive back.
+        ---
+        Returns a dict of URL -> FetchResult; the latest record of a URL wins.
+        """
+        responses = {}
+        with gzip.open(self.path, 'rb') as f:
+            for line in f:
+                record = json.loads(line)
+                responses[record['url']] = FetchResult(
+                    record['url'], record['status_code'], base64.b64decode(record['body']),
+                    record['encoding'], record['headers'])
+        return responses
+
+
+class Fetcher:
+    def __init__(self, cache=None, pool_size=10, timeout=30):
+        """
+        Pooled, caching HTTP client shared by the scrapers.
+        ---
+        Parameters:
+            cache: ResponseCache, or None to disable caching.
+            pool_size: keep-alive connections kept per host in each session.
+            timeout: request timeout in seconds.
+        """
+        self.cache = cache
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        # host -> TokenBucket; hosts without one are not rate limited
+        self.buckets = {}
+        # host -> base URL (e.g. 'http://127.0.0.1:8765') its requests are sent to instead
+        self.hosts = {}
+        # ResponseArchive every returned response is recorded to, or None
+        self.archive = None
+        # seconds to wait after the n-th 429 without a Retry-After header: retry_wait * n
+        self.retry_wait = 10
+        self.stats = {'network': 0, 'not_modified': 0, 'cache_hits': 0, 'rate_limited': 0}
+
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+
+    def limit(self, host, interval):
+        """Allows at most one network request per `interval` seconds to `host`."""
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            self.buckets[host] = TokenBucket(1 / interval)
+        else:
+            bucket.set_rate(1 / interval)
+
+
+    def _bucket(self, url):
+        return self.buckets.get(urlsplit(url).netloc)
+
+
+    def _backoff(self, url, attempt, response):
+        self._count('rate_limited')
+        try:
+            wait = float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            wait = self.retry_wait * (attempt + 1)
+        tqdm.write(f"  Rate limited (429) by {urlsplit(url).netloc}, waiting {wait:g}s before retry...")
+        return wait
+
+
+    def _route(self, url, headers):
+        """The URL to request: unchanged, or pointed at the host's override with the original Host header."""
+        parts = urlsplit(url)
+        base = self.hosts.get(parts.netloc)
+        if base is None:
+            return url
+        headers['Host'] = parts.netloc
+        return base.rstrip('/') + parts._replace(scheme='', netloc='').geturl()
+
+
+    def _recorded(self, result):
+        if self.archive is not None:
+            self.archive.record(result)
+        return result
+
+
+    def session(self):
+        """This thread's keep-alive session, created on first use."""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            self._local.session = session
+        return session
+
+
+    def cached(self, url, max_age=None):
+        """
+        Serves a URL from the cache without touching the network.
+        ---
+        Parameters:
+            url: string, the URL.
+            max_age: seconds a cached copy stays usable without revalidation
+                (IMMUTABLE for pages that never change); None never serves blind.
+        ---
+        Returns a FetchResult, or None if there is no fresh-enough copy.
+        """
+        if self.cache is None or max_age is None:
+            return None
+        hit = self.cache.get(url)
+        if hit is None:
+            return None
+        entry, body = hit
+        if time.time() - entry['fetched_at'] > max_age:
+            return None
+        self._count('cache_hits')
+        return FetchResult(url, 200, body, entry['encoding'], from_cache=True)
+
+
+    def get(self, url, headers=None):
+        """
+        GETs a URL over the pooled session. When a cached copy exists the request
+        is conditional (If-None-Match / If-Modified-Since) and a 304 is answered
+        from the cache; new 200 responses are stored.
+        ---
+        Parameters:
+            url: string, the URL.
+            headers: optional dict of extra request headers.
+        ---
+        Returns a FetchResult.
+        """
+        headers = dict(headers or {})
+        hit = self.cache.get(url) if self.cache is not None else None
+        if hit is not None:
+            entry, _ = hit
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = self.session().get(self._route(url, headers), headers=headers, timeout=self.timeout)
+        self._count('network')
+        if response.status_code == 304 and hit is not None:
+            self._count('not_modified')
+            entry, body = hit
+            self.cache.touch(url, entry)
+            return FetchResult(url, 200, body, entry['encoding'], dict(response.headers), from_cache=True)
+        if response.status_code == 200 and self.cache is not None:
+            self.cache.put(url, response)
+        return FetchResult(url, response.status_code, response.content,
+                           response.encoding or 'utf-8', dict(response.headers))
+
+
+    def fetch(self, url, headers=None, max_age=None, retries=3, limited=True):
+        """
+        cached() if a fresh copy exists, otherwise get() once the host's rate
+        limit allows it. A 429 pauses the whole host and is retried.
+        ---
+        Parameters:
+            url: string, the URL.
+            headers: optional dict of extra request headers.
+            max_age: see cached().
+            retries: attempts before giving up on 429s.
+            limited: if False, skip the host's rate limit (e.g. for robots.txt).
+        ---
+        Returns a FetchResult (a 429 one if every attempt was rate limited).
+        """
+        cached = self.cached(url, max_age)
+        if cached is not None:
+            return self._recorded(cached)
+        bucket = self._bucket(url) if limited else None
+        for attempt in range(retries):
+            if bucket is not None:
+                bucket.acquire()
+            response = self.get(url, headers)
+            if response.status_code != 429:
+                break
+            wait = self._backoff(url, attempt, response)
+            if bucket is not None:
+                bucket.pause(wait)
+            else:
+                time.sleep(wait)
+        return self._recorded(response)
+
+
+    async def fetch_async(self, url, headers=None, max_age=None, retries=3, limited=True):
+        """
+        Asyncio version of fetch(): rate-limit waits are awaited and the blocking
+        request runs in a worker thread, so other hosts and tasks keep going.
+        """
+        cached = await asyncio.to_thread(self.cached, url, max_age)
+        if cached is not None:
+            return await asyncio.to_thread(self._recorded, cached)
+        bucket = self._bucket(url) if limited else None
+        for attempt in range(retries):
+            if bucket is not None:
+                await bucket.acquire_async()
+            response = await asyncio.to_thread(self.get, url, headers)
+            if response.status_code != 429:
+                break
+            wait = self._backoff(url, attempt, response)
+            if bucket is not None:
+                bucket.pause(wait)
+            else:
+                await asyncio.sleep(wait)
+        return await asyncio.to_thread(self._recorded, response)
+
+
+class RobotsPolicy:
+    def __init__(self, fetcher, ttl=ROBOTS_TTL, user_agent='*'):
+        """
+        Per-host robots.txt cache backed by urllib.robotparser.
+        ---
+        Parameters:
+            fetcher: Fetcher used to download robots.txt (outside the rate limit).
+            ttl: seconds a parsed policy is reused before it is reloaded.
+            user_agent: user-agent token matched against robots.txt groups.
+        """
+        self.fetcher = fetcher
+        self.ttl = ttl
+        self.user_agent = user_agent
+        # host -> (expires at, RobotFileParser)
+        self._policies = {}
+        self._lock = threading.Lock()
+        # host -> interval to fall back to when robots.txt sets no Crawl-delay
+        self.default_intervals = {}
+
+
+    def _load(self, scheme, host):
+        """Fetches and parses a host's robots.txt; returns (parser, seconds it stays valid)."""
+        parser = RobotFileParser(f"{scheme}://{host}/robots.txt")
+        try:
+            response = self.fetcher.fetch(parser.url, max_age=self.ttl, limited=False)
+        except requests.RequestException:
+            # Unreachable: assume everything is disallowed for now (RFC 9309)
+            parser.disallow_all = True
+            return parser, ROBOTS_RETRY
+        if response.status_code in (401, 403):
+            parser.disallow_all = True
+        elif 400 <= response.status_code < 500:
+            parser.allow_all = True
+        elif response.status_code >= 500:
+            parser.disallow_all = True
+            return parser, ROBOTS_RETRY
+        else:
+            parser.parse(response.text.splitlines())
+        return parser, self.ttl
+
+
+    def policy(self, url):
+        """The parsed robots.txt for a URL's host, loading it if missing or expired."""
+        parts = urlsplit(url)
+        with self._lock:
+            cached = self._policies.get(parts.netloc)
+        if cached is not None and cached[0] > time.time():
+            return cached[1]
+
+        parser, ttl = self._load(parts.scheme or 'https', parts.netloc)
+        with self._lock:
+            self._policies[parts.netloc] = (time.time() + ttl, parser)
+        self._publish_delay(parts.netloc, parser)
+        return parser
+
+
+    def _publish_delay(self, host, parser):
+        """Sets the host's rate limit to its Crawl-delay / Request-rate, else its default interval."""
+        intervals = []
+        delay = parser.crawl_delay(self.user_agent)
+        if delay:
+            intervals.append(float(delay))
+        rate = parser.request_rate(self.user_agent)
+        if rate and rate.requests:
+            intervals.append(rate.seconds / rate.requests)
+        interval = max(intervals) if intervals else self.default_intervals.get(host)
+        if interval:
+            self.fetcher.limit(host, interval)
+
+
+    def allowed(self, url):
+        """True if robots.txt lets user_agent fetch url."""
+        return self.policy(url).can_fetch(self.user_agent, url)
+
+
+    def crawl_delay(self, url):
+        """The Crawl-delay declared for a URL's host, or None."""
+        return self.policy(url).crawl_delay(self.user_agent)
+
+
+# Shared by NBAScraper and PlayoffScraper
+fetcher = Fetcher(ResponseCache(CACHE_DIR))
+robots = RobotsPolicy(fetcher)
@@ -3,181 +3,519 @@ Migrate SQLite data to PostgreSQL and pre-compute ELO history.
 
 Run from the project root:
     uv run python -m backend.migrate
+
+Rows are loaded with the binary COPY protocol; a full rebuild drops the
+secondary indexes first and builds them once the data is in.
+
+Pass --stream to read, rate and write games in bounded batches so peak memory
+stays flat regardless of how much history is loaded, or --incremental to only
+replay and rewrite games from the earliest one changed since the last migration.
+Pass --swap for a full rebuild into shadow tables that replace the live ones in
+a single transaction once loaded and checked, so the API never sees them empty.
 """
+import argparse
 import asyncio
 import sqlite3
+import time
+import uuid
+from datetime import datetime, timezone
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
-from sqlalchemy import insert
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Float, MetaData, bindparam, delete, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import CreateIndex, CreateTable, DropIndex
 
 from backend.app.database import engine, Base
-from backend.app.models import Game, EloHistory
-from backend.NBARater import NBARater
+from backend.app.models import Game, EloHistory, RatingsVersion
+from backend.NBARater import REVERSION_FACTOR, NBARater, save_checkpoints, load_checkpoint
+from backend.NBAScraper import init_db
 
 SQLITE_PATH = Path("data") / "nba.db"
-CHUNK = 1000
+STREAM_BATCH = 5000
+COMPLETED_GAMES = (
+    "SELECT date, visitor, home, visitor_points, home_points, notes, row_hash FROM games "
+    "WHERE visitor_points IS NOT NULL AND home_points IS NOT NULL "
+    "ORDER BY date ASC"
+)
+# Completed games as of the last migration, keyed like games and compared by row hash
+MIGRATED_GAMES = """
+    CREATE TABLE IF NOT EXISTS migrated_games (
+        date        TEXT NOT NULL,
+        visitor     TEXT NOT NULL,
+        home        TEXT NOT NULL,
+        row_hash    TEXT,
+        PRIMARY KEY (date, visitor, home)
+    )
+"""
+GAME_COLUMNS = (
+    "date", "season", "visitor", "home", "visitor_points", "home_points", "notes", "result",
+    "visitor_elo_before", "visitor_elo_after", "home_elo_before", "home_elo_after",
+    "visitor_delta", "home_delta", "win_prob_visitor",
+)
+ELO_COLUMNS = ("team", "date", "elo")
+# Tables written with COPY; their secondary indexes are built after a full load
+LOADED_TABLES = (Game.__table__, EloHistory.__table__)
+SHADOW_SUFFIX = "_new"  # migrate_swap loads into e.g. games_new, then renames it to games
+MAX_SHRINK = 0.01  # largest fraction of live games a rebuild may lose before the swap is refused
+CONTINUITY_TOLERANCE = 1e-6  # Elo points
+SWAP_LOCK_TIMEOUT = "5s"  # give up on the swap rather than queue readers behind it
 
 
-async def migrate(drop_first: bool = True) -> None:
-    # (Re)create tables
-    async with engine.begin() as conn:
-        if drop_first:
-            await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
+def _prep_games(df: pd.DataFrame) -> pd.DataFrame:
+    """Adds the columns NBARater.eloSimulator expects to raw SQLite game rows."""
+    df["Win"] = (df["visitor_points"] > df["home_points"]).astype(float)
+    df["Date"] = df["date"]
+    df["Visitor"] = df["visitor"]
+    df["Home"] = df["home"]
+    df["Notes"] = df["notes"].fillna("")
+    return df
+
+
+def _iter_game_days(cursor: sqlite3.Cursor, batch_size: int):
+    """Yields DataFrames of roughly batch_size games from a date-ordered cursor.
+
+    A batch never splits a date: the trailing day of each fetch is carried into
+    the next one, because the rater skips games on or before its last date.
+    """
+    columns = [col[0] for col in cursor.description]
+    carry = []
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        rows = carry + rows
+        cut = len(rows)
+        while cut and rows[cut - 1][0] == rows[-1][0]:
+            cut -= 1
+        carry = rows[cut:]
+        if cut:
+            yield _prep_games(pd.DataFrame.from_records(rows[:cut], columns=columns))
+    if carry:
+        yield _prep_games(pd.DataFrame.from_records(carry, columns=columns))
+
+
+def _game_rows(games: pd.DataFrame, log: pd.DataFrame):
+    """Game rows in GAME_COLUMNS order, zipped column-wise from raw game rows and their rater log."""
+    return zip(
+        log["date"].tolist(), log["season"].astype(int).tolist(), log["visitor"].tolist(), log["home"].tolist(),
+        games["visitor_points"].astype(int).tolist(), games["home_points"].astype(int).tolist(),
+        [notes or None for notes in log["notes"].tolist()], log["result"].tolist(),
+        log["visitor_before"].tolist(), log["visitor_after"].tolist(),
+        log["home_before"].tolist(), log["home_after"].tolist(),
+        log["visitor_delta"].tolist(), log["home_delta"].tolist(),
+        log["win_prob_visitor"].tolist(),
+    )
+
+
+def _elo_rows(log: pd.DataFrame):
+    """EloHistory rows in ELO_COLUMNS order: each game's visitor, then its home team."""
+    teams = np.column_stack([log["visitor"].to_numpy(object), log["home"].to_numpy(object)]).ravel()
+    elos = np.column_stack([log["visitor_after"].to_numpy(float), log["home_after"].to_numpy(float)]).ravel()
+    return zip(teams.tolist(), np.repeat(log["date"].to_numpy(object), 2).tolist(), elos.tolist())
+
+
+def _stage_migrated(conn: sqlite3.Connection, games: pd.DataFrame) -> None:
+    """Stages the keys and row hashes of games being loaded, for _commit_migrated."""
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS migrating_games (date, visitor, home, row_hash)")
+    conn.executemany(
+        "INSERT INTO temp.migrating_games VALUES (?, ?, ?, ?)",
+        zip(games["date"].tolist(), games["visitor"].tolist(), games["home"].tolist(), games["row_hash"].tolist()),
+    )
 
+
+def _commit_migrated(conn: sqlite3.Connection, since: str) -> None:
+    """Replaces migrated_games from `since` on with the staged games, once Postgres has committed them."""
+    conn.execute(MIGRATED_GAMES)
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS migrating_games (date, visitor, home, row_hash)")
+    conn.execute("DELETE FROM migrated_games WHERE date >= ?", (since,))
+    conn.execute("INSERT OR REPLACE INTO migrated_games SELECT * FROM temp.migrating_games")
+    conn.execute("DROP TABLE temp.migrating_games")
+    conn.commit()
+
+
+def _earliest_change(conn: sqlite3.Connection) -> str | None:
+    """Date of the earliest completed game added, changed or removed since the last migration, if any."""
+    completed = (
+        "SELECT date, visitor, home, row_hash FROM games "
+        "WHERE visitor_points IS NOT NULL AND home_points IS NOT NULL"
+    )
+    migrated = "SELECT date, visitor, home, row_hash FROM migrated_games"
+    (since,) = conn.execute(
+        f"SELECT MIN(date) FROM ("
+        f"SELECT date FROM ({completed} EXCEPT {migrated}) "
+        f"UNION ALL SELECT date FROM ({migrated} EXCEPT {completed}))"
+    ).fetchone()
+    return since
+
+
+async def _copy_rows(conn: AsyncConnection, table: str, columns: tuple[str, ...], rows) -> int:
+    """Loads rows into a table with the binary COPY protocol; returns the row count.
+
+    The COPY runs on conn's asyncpg connection, inside the transaction that the
+    statements already executed on conn have opened.
+    """
+    raw = await conn.get_raw_connection()
+    status = await raw.driver_connection.copy_records_to_table(table, records=rows, columns=list(columns))
+    return int(status.split()[-1])  # "COPY <n>"
+
+
+async def _drop_indexes(conn: AsyncConnection) -> None:
+    """Drops the secondary indexes of the bulk-loaded tables (see _create_indexes)."""
+    for table in LOADED_TABLES:
+        for index in table.indexes:
+            await conn.execute(DropIndex(index, if_exists=True))
+
+
+async def _create_indexes(conn: AsyncConnection, tables=LOADED_TABLES) -> None:
+    """Builds the secondary indexes of the bulk-loaded tables and refreshes their planner statistics."""
+    for table in tables:
+        for index in table.indexes:
+            await conn.execute(CreateIndex(index))
+        await conn.execute(text(f"ANALYZE {table.name}"))
+
+
+async def _load(conn: AsyncConnection, game_rows, elo_rows, tables=LOADED_TABLES) -> tuple[int, int]:
+    """COPYs game and ELO history rows; returns how many of each were loaded."""
+    games_table, elo_table = tables
+    n_games = await _copy_rows(conn, games_table.name, GAME_COLUMNS, game_rows)
+    n_elo = await _copy_rows(conn, elo_table.name, ELO_COLUMNS, elo_rows)
+    return n_games, n_elo
+
+
+async def _bump_version(conn: AsyncConnection) -> None:
+    """Gives the ratings a new version, so API caches keyed on it (backend.app.ratings) are rebuilt."""
+    await conn.run_sync(RatingsVersion.__table__.create, checkfirst=True)
+    values = {"version": uuid.uuid4().hex, "updated_at": datetime.now(timezone.utc)}
+    await conn.execute(
+        insert(RatingsVersion).values(id=1, **values)
+        .on_conflict_do_update(index_elements=[RatingsVersion.id], set_=values)
+    )
+
+
+def _shadow_tables():
+    """Copies of the bulk-loaded tables named with SHADOW_SUFFIX, their indexes named to match."""
+    metadata = MetaData(naming_convention=Base.metadata.naming_convention)
+    return tuple(table.to_metadata(metadata, name=table.name + SHADOW_SUFFIX) for table in LOADED_TABLES)
+
+
+def _continuity_query(games_table: str):
+    """Counts the games of games_table whose Elo before does not follow from the team's previous game.
+
+    Each team's rating going into a game is the one it left its previous game
+    with, pulled toward the mean once for every season started in between.
+    The binds are typed: asyncpg would otherwise infer 1 - $1 as an integer.
+    """
+    return text(f"""
+        WITH seasons AS (
+            SELECT season, ROW_NUMBER() OVER (ORDER BY season) AS ordinal
+            FROM (SELECT DISTINCT season FROM {games_table}) AS played
+        ), appearances AS (
+            SELECT id, date, season, visitor AS team, visitor_elo_before AS before, visitor_elo_after AS after
+            FROM {games_table}
+            UNION ALL
+            SELECT id, date, season, home, home_elo_before, home_elo_after FROM {games_table}
+        ), chained AS (
+            SELECT before, ordinal, LAG(after) OVER w AS prev_after, LAG(ordinal) OVER w AS prev_ordinal
+            FROM appearances JOIN seasons USING (season)
+            WINDOW w AS (PARTITION BY team ORDER BY date, id)
+        )
+        SELECT COUNT(*) FROM chained
+        WHERE prev_after IS NOT NULL AND (before IS NULL OR ABS(
+            before - (1200 + (prev_after - 1200) * POWER(1 - :reversion, ordinal - prev_ordinal))
+        ) > :tolerance)
+    """).bindparams(
+        bindparam("reversion", REVERSION_FACTOR, type_=Float),
+        bindparam("tolerance", CONTINUITY_TOLERANCE, type_=Float),
+    )
+
+
+async def _check_shadow(conn: AsyncConnection, shadows, n_games: int, n_elo: int) -> list[str]:
+    """Sanity checks on loaded shadow tables before they go live; returns the problems found."""
+    games_new, elo_new = (table.name for table in shadows)
+    problems = []
+    (games_count,) = (await conn.execute(text(f"SELECT COUNT(*) FROM {games_new}"))).one()
+    (elo_count,) = (await conn.execute(text(f"SELECT COUNT(*) FROM {elo_new}"))).one()
+    if games_count == 0 or games_count != n_games:
+        problems.append(f"{games_new} has {games_count} rows, {n_games} were loaded")
+    if elo_count != 2 * games_count or elo_count != n_elo:
+        problems.append(f"{elo_new} has {elo_count} rows for {games_count} games ({n_elo} loaded)")
+
+    live = Game.__tablename__
+    if (await conn.execute(text(f"SELECT to_regclass('{live}')"))).scalar() is not None:
+        (live_count,) = (await conn.execute(text(f"SELECT COUNT(*) FROM {live}"))).one()
+        if games_count < live_count * (1 - MAX_SHRINK):
+            problems.append(f"{games_new} has {games_count} games, {live} has {live_count}")
+
+    breaks = (await conn.execute(_continuity_query(games_new))).scalar()
+    if breaks:
+        problems.append(f"{breaks} rating(s) in {games_new} do not follow from the team's previous game")
+    return problems
+
+
+async def _swap_shadow(conn: AsyncConnection, shadows) -> None:
+    """Replaces the live tables with their shadows, renaming indexes and sequences to the live names."""
+    await conn.execute(text(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}'"))
+    for live, shadow in zip(LOADED_TABLES, shadows):
+        # Dropping the old table first frees its index and sequence names
+        await conn.execute(text(f"DROP TABLE IF EXISTS {live.name}"))
+        await conn.execute(text(f"ALTER TABLE {shadow.name} RENAME TO {live.name}"))
+        await conn.execute(text(f"ALTER INDEX {shadow.name}_pkey RENAME TO {live.name}_pkey"))
+        await conn.execute(text(f"ALTER SEQUENCE {shadow.name}_id_seq RENAME TO {live.name}_id_seq"))
+        live_indexes = {tuple(index.columns.keys()): index.name for index in live.indexes}
+        for index in shadow.indexes:
+            await conn.execute(text(f"ALTER INDEX {index.name} RENAME TO {live_indexes[tuple(index.columns.keys())]}"))
+
+
+def _rate_all(conn_sqlite: sqlite3.Connection) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Rates every completed game from scratch for a full rebuild; returns the games and their log."""
     # Read raw games from SQLite
-    conn_sqlite = sqlite3.connect(str(SQLITE_PATH))
     df = pd.read_sql(
         "SELECT * FROM games "
         "WHERE visitor_points IS NOT NULL AND home_points IS NOT NULL "
         "ORDER BY date ASC",
         conn_sqlite,
     )
-    conn_sqlite.close()
 
     # Prep for ELO simulation
-    df["Win"] = (df["visitor_points"] > df["home_points"]).astype(float)
-    df["Date"] = df["date"]
-    df["Visitor"] = df["visitor"]
-    df["Home"] = df["home"]
-    df["Notes"] = df["notes"].fillna("")
+    _prep_games(df)
 
     rater = NBARater()
     rater.eloSimulator(df)
-    game_log = rater.getGameLog()
 
-    # Build game records (merge scraped data with computed ELO columns)
-    game_records = []
-    for i, row in game_log.iterrows():
-        orig = df.iloc[i]
-        game_records.append({
-            "date": row["date"],
-            "season": int(row["season"]),
-            "visitor": row["visitor"],
-            "home": row["home"],
-            "visitor_points": (
-                int(orig["visitor_points"]) if pd.notna(orig["visitor_points"]) else None
-            ),
-            "home_points": (
-                int(orig["home_points"]) if pd.notna(orig["home_points"]) else None
-            ),
-            "notes": str(row["notes"]) if pd.notna(row["notes"]) and row["notes"] else None,
-            "result": row["result"],
-            "visitor_elo_before": float(row["visitor_before"]),
-            "visitor_elo_after": float(row["visitor_after"]),
-            "home_elo_before": float(row["home_before"]),
-            "home_elo_after": float(row["home_after"]),
-            "visitor_delta": float(row["visitor_delta"]),
-            "home_delta": float(row["home_delta"]),
-            "win_prob_visitor": float(row["win_prob_visitor"]),
-        })
-
-    # Bulk insert games
-    async with AsyncSession(engine) as session:
-        for i in range(0, len(game_records), CHUNK):
-            await session.execute(insert(Game), game_records[i : i + CHUNK])
-        await session.commit()
-    print(f"Inserted {len(game_records)} games")
-
-    # Build ELO history records (one row per team per game)
-    elo_records = []
-    for _, row in game_log.iterrows():
-        elo_records.append({"team": row["visitor"], "date": row["date"], "elo": float(row["visitor_after"])})
-        elo_records.append({"team": row["home"],    "date": row["date"], "elo": float(row["home_after"])})
-
-    async with AsyncSession(engine) as session:
-        for i in range(0, len(elo_records), CHUNK):
-            await session.execute(insert(EloHistory), elo_records[i : i + CHUNK])
-        await session.commit()
-    print(f"Inserted {len(elo_records)} ELO history entries")
+    # Full rebuild: every previous checkpoint is superseded
+    save_checkpoints(conn_sqlite, rater.checkpoints, clear_from="")
+    _stage_migrated(conn_sqlite, df)
+    return df, rater.getGameLog()
+
+
+async def migrate(drop_first: bool = True) -> None:
+    conn_sqlite = init_db(SQLITE_PATH)
+    df, game_log = _rate_all(conn_sqlite)
+
+    # (Re)create the tables and COPY the rated games in one transaction,
+    # building the indexes once the rows are in
+    t0 = time.perf_counter()
+    async with engine.begin() as conn:
+        if drop_first:
+            await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await _drop_indexes(conn)
+        n_games, n_elo = await _load(conn, _game_rows(df, game_log), _elo_rows(game_log))
+        await _create_indexes(conn)
+        await _bump_version(conn)
+    _commit_migrated(conn_sqlite, "")
+    conn_sqlite.close()
+    print(f"Inserted {n_games} games and {n_elo} ELO history entries in {time.perf_counter() - t0:.1f}s")
+
+
+async def migrate_swap() -> None:
+    """Full rebuild that keeps the live tables serving until the new data is ready.
+
+    Games and ELO history are COPYed into shadow tables (games_new,
+    elo_history_new) that are then indexed and sanity-checked: row counts
+    against the load and the live table, and every team's rating chain. Only
+    then are they swapped in for the live tables, with their indexes, in one
+    short transaction; readers never see missing or partial data. If a check
+    fails nothing is swapped and the live tables are left as they were.
+    """
+    conn_sqlite = init_db(SQLITE_PATH)
+    df, game_log = _rate_all(conn_sqlite)
+    shadows = _shadow_tables()
+
+    t0 = time.perf_counter()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        for shadow in shadows:
+            await conn.execute(text(f"DROP TABLE IF EXISTS {shadow.name}"))
+            await conn.execute(CreateTable(shadow))
+        n_games, n_elo = await _load(conn, _game_rows(df, game_log), _elo_rows(game_log), shadows)
+        await _create_indexes(conn, shadows)
+        problems = await _check_shadow(conn, shadows, n_games, n_elo)
+        if problems:
+            raise RuntimeError("Shadow tables failed sanity checks, live tables kept: " + "; ".join(problems))
+    loaded = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    async with engine.begin() as conn:
+        await _swap_shadow(conn, shadows)
+        await _bump_version(conn)
+    _commit_migrated(conn_sqlite, "")
+    conn_sqlite.close()
+    print(f"Loaded {n_games} games and {n_elo} ELO history entries into shadow tables in {loaded:.1f}s; "
+          f"swapped them in in {time.perf_counter() - t0:.3f}s")
+
+
+async def migrate_stream(drop_first: bool = True, batch_size: int = STREAM_BATCH) -> None:
+    """Full rebuild that streams games from SQLite to Postgres.
+
+    Rows come off a SQLite cursor in date order, pass through the rater one batch
+    of whole game days at a time (team histories and the game log are not kept)
+    and are COPYed to Postgres before the next batch is read, so memory is
+    bounded by batch_size rather than by the size of the games table.
+    """
+    conn_sqlite = init_db(SQLITE_PATH)
+    # Full rebuild: every previous checkpoint is superseded
+    save_checkpoints(conn_sqlite, [], clear_from="")
+    cursor = conn_sqlite.execute(COMPLETED_GAMES)
+
+    rater = NBARater()
+    n_games = n_elo = 0
+    t0 = time.perf_counter()
+    async with engine.begin() as conn:
+        if drop_first:
+            await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await _drop_indexes(conn)
+        for games in _iter_game_days(cursor, batch_size):
+            log = rater.rateBatch(games, keep_history=False)
+            batch_games, batch_elo = await _load(conn, _game_rows(games, log), _elo_rows(log))
+            n_games += batch_games
+            n_elo += batch_elo
+            _stage_migrated(conn_sqlite, games)
+
+            # Flush season-boundary checkpoints as they are produced
+            save_checkpoints(conn_sqlite, rater.checkpoints)
+            rater.checkpoints.clear()
+        await _create_indexes(conn)
+        await _bump_version(conn)
+
+    save_checkpoints(conn_sqlite, [rater.getState()])
+    _commit_migrated(conn_sqlite, "")
+    conn_sqlite.close()
+    print(f"Inserted {n_games} games and {n_elo} ELO history entries in {time.perf_counter() - t0:.1f}s")
 
 
 async def migrate_season(season: int) -> None:
     """Re-compute and replace a single season's data in Postgres.
 
-    Runs the full ELO simulation (history is sequential) but only deletes and
-    re-inserts records for the given season, leaving prior seasons untouched.
+    Resumes the ELO simulation from the latest rater checkpoint before the
+    season (falling back to a full replay when none exists) and only deletes
+    and re-loads records for the given season, leaving prior seasons untouched.
     """
-    from sqlalchemy import delete as sa_delete
-
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
-    conn_sqlite = sqlite3.connect(str(SQLITE_PATH))
+    # Season date bounds: Oct 1 of season year → Sep 30 of next year
+    season_start = f"{season}-10-01"
+    season_end = f"{season + 1}-09-30"
+
+    conn_sqlite = init_db(SQLITE_PATH)
+    state = load_checkpoint(conn_sqlite, before=season_start)
     df = pd.read_sql(
         "SELECT * FROM games "
-        "WHERE visitor_points IS NOT NULL AND home_points IS NOT NULL "
+        "WHERE visitor_points IS NOT NULL AND home_points IS NOT NULL AND date > ? "
         "ORDER BY date ASC",
         conn_sqlite,
+        params=(state["last_date"] if state else "",),
     )
-    conn_sqlite.close()
 
-    df["Win"] = (df["visitor_points"] > df["home_points"]).astype(float)
-    df["Date"] = df["date"]
-    df["Visitor"] = df["visitor"]
-    df["Home"] = df["home"]
-    df["Notes"] = df["notes"].fillna("")
+    _prep_games(df)
 
-    rater = NBARater()
+    rater = NBARater.fromState(state) if state else NBARater()
     rater.eloSimulator(df)
     game_log = rater.getGameLog()
 
-    season_mask = game_log["season"] == season
-    season_log = game_log[season_mask]
-    season_indices = season_log.index.tolist()
-
-    game_records = []
-    for i in season_indices:
-        row = game_log.iloc[i]
-        orig = df.iloc[i]
-        game_records.append({
-            "date": row["date"],
-            "season": int(row["season"]),
-            "visitor": row["visitor"],
-            "home": row["home"],
-            "visitor_points": int(orig["visitor_points"]) if pd.notna(orig["visitor_points"]) else None,
-            "home_points": int(orig["home_points"]) if pd.notna(orig["home_points"]) else None,
-            "notes": str(row["notes"]) if pd.notna(row["notes"]) and row["notes"] else None,
-            "result": row["result"],
-            "visitor_elo_before": float(row["visitor_before"]),
-            "visitor_elo_after": float(row["visitor_after"]),
-            "home_elo_before": float(row["home_before"]),
-            "home_elo_after": float(row["home_after"]),
-            "visitor_delta": float(row["visitor_delta"]),
-            "home_delta": float(row["home_delta"]),
-            "win_prob_visitor": float(row["win_prob_visitor"]),
-        })
-
-    elo_records = []
-    for _, row in season_log.iterrows():
-        elo_records.append({"team": row["visitor"], "date": row["date"], "elo": float(row["visitor_after"])})
-        elo_records.append({"team": row["home"],    "date": row["date"], "elo": float(row["home_after"])})
+    # Replayed checkpoints replace those computed from the old season data
+    save_checkpoints(conn_sqlite, rater.checkpoints, clear_from=season_start)
+    conn_sqlite.close()
 
-    # Season date bounds: Oct 1 of season year → Sep 30 of next year
-    season_start = f"{season}-10-01"
-    season_end = f"{season + 1}-09-30"
+    season_mask = (game_log["season"] == season).to_numpy()
+    season_log = game_log[season_mask]
 
-    async with AsyncSession(engine) as session:
-        await session.execute(sa_delete(Game).where(Game.season == season))
-        await session.execute(
-            sa_delete(EloHistory).where(
+    # The deletes open the transaction the COPY joins, so readers never see the season missing
+    async with engine.begin() as conn:
+        await conn.execute(delete(Game).where(Game.season == season))
+        await conn.execute(
+            delete(EloHistory).where(
                 EloHistory.date >= season_start,
                 EloHistory.date <= season_end,
             )
         )
-        await session.commit()
+        n_games, n_elo = await _load(conn, _game_rows(df[season_mask], season_log), _elo_rows(season_log))
+        await _bump_version(conn)
+
+    print(f"Season {season}: replaced {n_games} games, {n_elo} ELO entries")
+
+
+async def migrate_incremental() -> None:
+    """Bring Postgres up to date with the games changed in SQLite since the last migration.
+
+    Row hashes of completed games are compared with those recorded by the last
+    migration (migrated_games); the earliest game added, changed or removed
+    bounds the work. The rater resumes from the latest checkpoint before that
+    date, and only games and ELO history from that date on are rewritten, in
+    one transaction. Without a previous migration this is a full rebuild
+    through shadow tables (see migrate_swap).
+    """
+    conn_sqlite = init_db(SQLITE_PATH)
+    migrated = conn_sqlite.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'migrated_games'"
+    ).fetchone()
+    # No usable checkpoint at all means the model constants changed since
+    if not migrated or load_checkpoint(conn_sqlite) is None:
+        conn_sqlite.close()
+        print("No previous migration to continue from; running a full rebuild")
+        # The API may be serving (refresh runs this), so rebuild without emptying the live tables
+        await migrate_swap()
+        return
+
+    t0 = time.perf_counter()
+    since = _earliest_change(conn_sqlite)
+    if since is None:
+        conn_sqlite.close()
+        print("Postgres is up to date")
+        return
+
+    state = load_checkpoint(conn_sqlite, before=since)
+    df = pd.read_sql(
+        "SELECT * FROM games "
+        "WHERE visitor_points IS NOT NULL AND home_points IS NOT NULL AND date > ? "
+        "ORDER BY date ASC",
+        conn_sqlite,
+        params=(state["last_date"] if state else "",),
+    )
+    _prep_games(df)
+
+    rater = NBARater.fromState(state) if state else NBARater()
+    # Games between the checkpoint and `since` are replayed for their ratings only
+    affected = (df["date"] >= since).to_numpy()
+    log = rater.rateBatch(df, keep_history=False)[affected] if len(df) else None
+    games = df[affected]
+    _stage_migrated(conn_sqlite, games)
 
-    async with AsyncSession(engine) as session:
-        for i in range(0, len(game_records), CHUNK):
-            await session.execute(insert(Game), game_records[i : i + CHUNK])
-        for i in range(0, len(elo_records), CHUNK):
-            await session.execute(insert(EloHistory), elo_records[i : i + CHUNK])
-        await session.commit()
+    async with engine.begin() as conn:
+        await conn.execute(delete(Game).where(Game.date >= since))
+        await conn.execute(delete(EloHistory).where(EloHistory.date >= since))
+        n_games, n_elo = (await _load(conn, _game_rows(games, log), _elo_rows(log))
+                          if len(games) else (0, 0))
+        await _bump_version(conn)
 
-    print(f"Season {season}: replaced {len(game_records)} games, {len(elo_records)} ELO entries")
+    save_checkpoints(conn_sqlite, rater.checkpoints + [rater.getState()], clear_from=since)
+    _commit_migrated(conn_sqlite, since)
+    conn_sqlite.close()
+    print(f"Replayed {len(df)} games from {state['last_date'] if state else 'the start'}; "
+          f"rewrote {n_games} games and {n_elo} ELO entries from {since} in {time.perf_counter() - t0:.2f}s")
 
 
 if __name__ == "__main__":
-    asyncio.run(migrate())
+    parser = argparse.ArgumentParser(description="Migrate data/nba.db to Postgres with ELO history.")
+    parser.add_argument("--stream", action="store_true",
+                        help="Read, rate and write games in bounded batches (flat memory)")
+    parser.add_argument("--batch-size", type=int, default=STREAM_BATCH,
+                        help=f"Games per streamed batch (default {STREAM_BATCH})")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only replay and rewrite from the earliest game changed since the last migration")
+    parser.add_argument("--swap", action="store_true",
+                        help="Rebuild into shadow tables and swap them in, keeping the live tables readable")
+    args = parser.parse_args()
+    if args.incremental:
+        asyncio.run(migrate_incremental())
+    elif args.swap:
+        asyncio.run(migrate_swap())
+    elif args.stream:
+        asyncio.run(migrate_stream(batch_size=args.batch_size))
+    else:
+        asyncio.run(migrate())
@@ -0,0 +1,135 @@
+"""
+Canonical franchise registry.
+
+Every current franchise has a stable small-integer ID (its position in
+FRANCHISES) and every historical name maps to one of them. This module is the
+single source of team names for the rater, scraper ingest and API.
+"""
+import numpy as np
+import pandas as pd
+
+# (current name, conference); a franchise's ID is its position in this list
+_FRANCHISES = [
+    ("Atlanta Hawks", "East"),
+    ("Boston Celtics", "East"),
+    ("Brooklyn Nets", "East"),
+    ("Charlotte Hornets", "East"),
+    ("Chicago Bulls", "East"),
+    ("Cleveland Cavaliers", "East"),
+    ("Dallas Mavericks", "West"),
+    ("Denver Nuggets", "West"),
+    ("Detroit Pistons", "East"),
+    ("Golden State Warriors", "West"),
+    ("Houston Rockets", "West"),
+    ("Indiana Pacers", "East"),
+    ("Los Angeles Clippers", "West"),
+    ("Los Angeles Lakers", "West"),
+    ("Memphis Grizzlies", "West"),
+    ("Miami Heat", "East"),
+    ("Milwaukee Bucks", "East"),
+    ("Minnesota Timberwolves", "West"),
+    ("New Orleans Pelicans", "West"),
+    ("New York Knicks", "East"),
+    ("Oklahoma City Thunder", "West"),
+    ("Orlando Magic", "East"),
+    ("Philadelphia 76ers", "East"),
+    ("Phoenix Suns", "West"),
+    ("Portland Trail Blazers", "West"),
+    ("Sacramento Kings", "West"),
+    ("San Antonio Spurs", "West"),
+    ("Toronto Raptors", "East"),
+    ("Utah Jazz", "West"),
+    ("Washington Wizards", "East"),
+]
+
+FRANCHISES = [name for name, _ in _FRANCHISES]
+CONFERENCES = {
+    conf: [name for name, c in _FRANCHISES if c == conf]
+    for conf in ("East", "West")
+}
+
+# Historical name -> current name
+NAME_CHANGES = {
+    'Charlotte Bobcats': 'Charlotte Hornets',
+    'New Orleans Hornets': 'New Orleans Pelicans',
+    'New Jersey Americans': 'Brooklyn Nets',
+    'New York Nets': 'Brooklyn Nets',
+    'New Jersey Nets': 'Brooklyn Nets',
+    'Seattle SuperSonics': 'Oklahoma City Thunder',
+    'Vancouver Grizzlies': 'Memphis Grizzlies',
+    'Washington Bullets': 'Washington Wizards',
+    'Chicago Zephyrs': 'Washington Wizards',
+    'Capital Bullets': 'Washington Wizards',
+    'Baltimore Bullets': 'Washington Wizards',
+    'Chicago Packers': 'Washington Wizards',
+    'New Orleans/Oklahoma City Hornets': 'New Orleans Pelicans',
+    'New Orleans/OKC Hornets': 'New Orleans Pelicans',
+    'Philadelphia Warriors': 'Golden State Warriors',
+    'San Francisco Warriors': 'Golden State Warriors',
+    'Fort Wayne Pistons': 'Detroit Pistons',
+    'Minneapolis Lakers': 'Los Angeles Lakers',
+    'Rochester Royals': 'Sacramento Kings',
+    'Syracuse Nationals': 'Philadelphia 76ers',
+    'Tri-Cities Blackhawks': 'Atlanta Hawks',
+    'St. Louis Hawks': 'Atlanta Hawks',
+    'Milwaukee Hawks': 'Atlanta Hawks',
+    'Buffalo Braves': 'Los Angeles Clippers',
+    'San Diego Clippers': 'Los Angeles Clippers',
+    'Cincinnati Royals': 'Sacramento Kings',
+    'Kansas City-Omaha Kings': 'Sacramento Kings',
+    'Kansas City Kings': 'Sacramento Kings',
+    'Denver Rockets': 'Denver Nuggets',
+    'San Diego Rockets': 'Houston Rockets',
+    'Dallas Chaparrals': 'San Antonio Spurs',
+    'Texas Chapparals': 'San Antonio Spurs',
+    'New Orleans Jazz': 'Utah Jazz',
+}
+
+# Every known name (current or historical) -> franchise ID
+TEAM_IDS = {name: i for i, name in enumerate(FRANCHISES)}
+TEAM_IDS.update({old: TEAM_IDS[new] for old, new in NAME_CHANGES.items()})
+
+
+def canonical_name(team_name):
+    """Maps a historical team name to its current name; unknown names pass through."""
+    return NAME_CHANGES.get(team_name, team_name)
+
+
+def encode(names, strict=True):
+    """
+    Maps a column of team names (current or historical) to franchise IDs.
+    Dictionary lookups run once per unique name, not once per row.
+    ---
+    Parameters:
+        names: array-like or pandas Series of team names.
+        strict: if True, raise KeyError on an unknown name; otherwise map it to -1.
+    ---
+    Returns a numpy int64 array of franchise IDs.
+    """
+    codes, uniques = pd.factorize(pd.Series(names, dtype=object), use_na_sentinel=False)
+    if strict:
+        lookup = np.array([TEAM_IDS[name] for name in uniques], dtype=np.int64)
+    else:
+        lookup = np.array([TEAM_IDS.get(name, -1) for name in uniques], dtype=np.int64)
+    return lookup[codes] if len(lookup) else np.zeros(0, dtype=np.int64)
+
+
+def normalize(names):
+    """
+    Normalizes a whole column of team names to current franchise names.
+    ---
+    Parameters:
+        names: array-like or pandas Series of team names.
+    ---
+    Returns a pandas Categorical Series over FRANCHISES (NaN for unknown names),
+    keeping the input index when given a Series.
+    """
+    index = names.index if isinstance(names, pd.Series) else None
+    ids = encode(names, strict=False)
+    return pd.Series(pd.Categorical.from_codes(ids, categories=FRANCHISES), index=index)
+
+
+def unknown_names(names):
+    """Returns the sorted distinct names in a column that map to no franchise."""
+    uniques = pd.unique(pd.Series(names, dtype=object).dropna())
+    return sorted(name for name in uniques if name not in TEAM_IDS)
@@ -0,0 +1,18 @@
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from backend.migrate import CONTINUITY_TOLERANCE, REVERSION_FACTOR, _continuity_query
+
+
+def test_continuity_query_binds_floats_for_asyncpg():
+    # An untyped $1 next to an integer literal is inferred as an integer by Postgres
+    compiled = _continuity_query("games_new").compile(dialect=asyncpg.dialect())
+    sql = str(compiled)
+    assert "POWER(1 - $1::FLOAT," in sql
+    assert "> $2::FLOAT" in sql
+    assert compiled.params == {"reversion": REVERSION_FACTOR, "tolerance": CONTINUITY_TOLERANCE}
+
+
+def test_continuity_query_reads_the_given_table():
+    sql = str(_continuity_query("games_new").compile(dialect=asyncpg.dialect()))
+    assert "FROM games_new" in sql
+    assert "FROM games\n" not in sql